@@ -6,7 +6,7 @@ PySnip Web Interface - Enhanced Version
 A web-based catalog and execution interface for the PySnip tool collection.
 """
 
-from flask import Flask, render_template, request, jsonify, abort, send_from_directory, session, g
+from flask import Flask, render_template, request, jsonify, abort, send_from_directory, send_file, session, g, Response, redirect
 import os
 import sys
 import json
@@ -15,13 +15,31 @@ import shlex
 import logging
 from datetime import datetime
 from functools import wraps
+from collections import OrderedDict
+from urllib.parse import quote
 import time
+import threading
+import hmac
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import werkzeug.exceptions
 
 # Import utility modules
-from utils.scanner import scan_pysnip_directory, get_tool_details, get_category_details, get_related_tools
-from utils.executor import execute_tool, extract_parameters_from_script
-from utils.doc_parser import extract_docstring
+from utils.scanner import scan_pysnip_directory, get_tool_details, get_category_details, get_related_tools, get_catalog_files
+from utils.executor import execute_tool, get_executor, extract_parameters_from_script
+from utils.highlighter import get_source_renderer
+from utils.guide_renderer import get_guide_renderer
+from utils.catalog_index import CatalogIndex
+from utils.doc_parser import extract_docstring, get_extraction_engine, DETAIL_FULL, DETAIL_SUMMARY, DETAIL_LEVELS, PARSER_VERSION
+from utils.async_executor import execute_tool_on_engine, get_async_engine
+from utils.artifacts import get_artifact_store, receive_uploads
+from utils.output_store import get_output_store
+from utils.workspace import get_workspace_pool
+from utils.environments import get_environment_manager, EnvironmentBuildingException
+from utils.dispatcher import get_dispatcher, worker_error_result, NoWorkersException
+from utils.scheduler import get_scheduler, DurationModel, QueueFullException, QueueTimeoutException
+from utils.result_cache import get_result_cache
+from utils.history import get_history_store
 
 # Configuration
 app = Flask(__name__)
@@ -40,21 +58,32 @@ logging.basicConfig(
 # Global variables
 PYSNIP_ROOT = app.config['PYSNIP_ROOT']
 CATALOG = None  # Will be populated by scanning the directory
+CATALOG_FILES = {}  # Relative path -> kind of every file /raw may serve
+ACTIVE_CONTENT_TYPES = {'text/html', 'text/xml', 'application/xml'}  # /raw types served sandboxed (with any +xml type)
+CATALOG_INDEX = None  # Sorted tool indexes of the current catalog for /api
 LAST_SCAN_TIME = 0
 SCAN_INTERVAL = app.config.get('CATALOG_SCAN_INTERVAL', 3600)  # Rescan interval in seconds
 
-# Cache decorator
+# Cache decorator (least recently used responses beyond ROUTE_CACHE_SIZE are dropped)
 def cached(timeout=300):
     def decorator(f):
-        cache = {}
+        cache = OrderedDict()
+        lock = threading.Lock()
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            key = str(args) + str(kwargs)
+            key = str(args) + str(kwargs) + request.query_string.decode('latin-1')
             now = time.time()
-            if key in cache and now - cache[key]['time'] < timeout:
-                return cache[key]['value']
+            with lock:
+                entry = cache.get(key)
+                if entry and now - entry['time'] < timeout:
+                    cache.move_to_end(key)
+                    return entry['value']
             result = f(*args, **kwargs)
-            cache[key] = {'value': result, 'time': now}
+            with lock:
+                cache[key] = {'value': result, 'time': now}
+                cache.move_to_end(key)
+                while len(cache) > app.config.get('ROUTE_CACHE_SIZE', 256):
+                    cache.popitem(last=False)
             return result
         return decorated_function
     return decorator
@@ -81,13 +110,264 @@ def rate_limit(limit=5, per=60):
         return decorated_function
     return decorator
 
+# Worker authentication decorator
+def require_worker_token(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        expected = app.config.get('WORKER_TOKEN')
+        if not expected:
+            abort(404)  # Worker mode is disabled
+        provided = request.headers.get('X-Worker-Token', '')
+        if not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+            app.logger.warning(f"Rejected worker request from {request.remote_addr}")
+            return jsonify({"error": "Invalid worker token"}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def require_admin_token(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        expected = app.config.get('ADMIN_TOKEN')
+        if not app.config.get('ENABLE_ADMIN') or not expected:
+            return jsonify({"error": "Not found"}), 404  # Admin endpoints are disabled
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+            app.logger.warning(f"Rejected admin request from {request.remote_addr}")
+            return jsonify({"error": "Invalid admin token"}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+# Execution scheduler shared by all requests
+scheduler = get_scheduler({
+    'MAX_CONCURRENT': app.config.get('MAX_CONCURRENT_EXECUTIONS', os.cpu_count() or 1),
+    'MAX_QUEUE_SIZE': app.config.get('EXECUTION_QUEUE_SIZE', 100),
+    'QUEUE_TIMEOUT': app.config.get('EXECUTION_QUEUE_TIMEOUT', 120),
+    'CLIENT_WEIGHTS': app.config.get('CLIENT_WEIGHTS', {}),
+    'MODE': app.config.get('SCHEDULER_MODE', 'fair'),
+    'AGING_RATE': app.config.get('SCHEDULER_AGING_RATE', 1.0)
+})
+
+# Cache for results of deterministic tools
+result_cache = get_result_cache({
+    'TTL': app.config.get('RESULT_CACHE_TTL', 300),
+    'MAX_ENTRIES': app.config.get('RESULT_CACHE_SIZE', 256),
+    'CACHEABLE_TOOLS': app.config.get('CACHEABLE_TOOLS', [])
+})
+
+# Parsed documentation and parameters, kept across restarts
+extraction = get_extraction_engine({
+    'MAX_ENTRIES': app.config.get('PARSE_CACHE_SIZE', 2048),
+    'STORE_DB': app.config.get('PARSE_STORE_DB') if app.config.get('PARSE_STORE_ENABLED', True) else None,
+    'STORE_MAX_ROWS': app.config.get('PARSE_STORE_MAX_ROWS', 10000)
+})
+
+# Highlighted tool sources served in line windows
+source_renderer = get_source_renderer({
+    'MAX_ENTRIES': app.config.get('SOURCE_CACHE_SIZE', 128),
+    'MAX_HIGHLIGHT_SIZE': app.config.get('SOURCE_HIGHLIGHT_MAX_SIZE', 2 * 1024 * 1024),
+    'MAX_WINDOW': app.config.get('SOURCE_WINDOW_MAX_LINES', 2000)
+})
+
+# Markdown guides rendered to HTML, invalidated by catalog scans
+guide_renderer = get_guide_renderer({
+    'MAX_ENTRIES': app.config.get('GUIDE_CACHE_SIZE', 64),
+    'MAX_SIZE': app.config.get('GUIDE_MAX_SIZE', 1024 * 1024)
+})
+
+# Server-side execution history
+history = get_history_store(app.config.get('HISTORY_DB'), {
+    'STATS_WINDOW': app.config.get('HISTORY_STATS_WINDOW', 200),
+    'MAX_AGE': app.config.get('HISTORY_MAX_AGE', 30 * 86400),
+    'MAX_ROWS': app.config.get('HISTORY_MAX_ROWS', 100000)
+})
+
+# Per-tool run time predictions and adaptive timeouts for 'duration' mode
+duration_model = DurationModel(history, {
+    'DEFAULT_DURATION': app.config.get('DEFAULT_EXPECTED_DURATION', 5.0),
+    'MIN_SAMPLES': app.config.get('ADAPTIVE_TIMEOUT_MIN_SAMPLES', 20),
+    'TIMEOUT_HEADROOM': app.config.get('ADAPTIVE_TIMEOUT_HEADROOM', 2.0),
+    'MIN_TIMEOUT': app.config.get('ADAPTIVE_TIMEOUT_MIN', 5.0),
+    'MAX_TIMEOUT': app.config.get('MAX_EXECUTION_TIME', 60)
+})
+
+# Complete execution outputs, paged through /outputs
+output_store = None
+if app.config.get('STORE_OUTPUT', True):
+    output_store = get_output_store({
+        'OUTPUT_DIR': app.config.get('OUTPUT_DIR'),
+        'TTL': app.config.get('OUTPUT_TTL', 3600),
+        'MAX_SIZE': app.config.get('OUTPUT_STORE_MAX_SIZE', 64 * 1024 * 1024)
+    })
+
+# Execution backend: blocking subprocesses or the shared asyncio engine
+executor_settings = {
+    'SANDBOX_ENABLED': app.config.get('SANDBOX_ENABLED', True),
+    'SANDBOX_ISOLATE_NETWORK': app.config.get('SANDBOX_ISOLATE_NETWORK', True),
+    'USE_VENV': app.config.get('USE_VENV', False),
+    'VENV_DIR': app.config.get('VENV_DIR'),
+    'WHEELHOUSE': app.config.get('WHEELHOUSE'),
+    'STORE_OUTPUT': output_store is not None,
+    'OUTPUT_DIR': app.config.get('OUTPUT_DIR'),
+    'OUTPUT_PREVIEW_SIZE': app.config.get('OUTPUT_PREVIEW_SIZE', 64 * 1024)
+}
+# Remote workers (see worker.py), enabled by setting WORKER_TOKEN
+dispatcher = None
+if app.config.get('WORKER_TOKEN'):
+    dispatcher = get_dispatcher({
+        'HEARTBEAT_INTERVAL': app.config.get('WORKER_HEARTBEAT_INTERVAL', 5),
+        'HEARTBEAT_TIMEOUT': app.config.get('WORKER_HEARTBEAT_TIMEOUT', 15),
+        'ASSIGN_TIMEOUT': app.config.get('WORKER_ASSIGN_TIMEOUT', 60),
+        'DEFAULT_TIMEOUT': app.config.get('MAX_EXECUTION_TIME', 60)
+    })
+
+def execute_on_workers(full_path, params=None, timeout=None, workspace=None):
+    """Execute a tool on a remote worker (workers use workspaces of their own)"""
+    tool_path = os.path.relpath(full_path, PYSNIP_ROOT)
+    tool_info = get_tool_details(CATALOG, tool_path)
+    try:
+        return dispatcher.run(tool_path, tool_info.get('hash') if tool_info else None, params, timeout)
+    except NoWorkersException as e:
+        return worker_error_result(str(e))
+
+if app.config.get('EXECUTION_ENGINE') == 'workers' and dispatcher:
+    run_tool = execute_on_workers
+elif app.config.get('EXECUTION_ENGINE') == 'asyncio':
+    get_async_engine(executor_settings)
+    run_tool = execute_tool_on_engine
+else:
+    if app.config.get('EXECUTION_ENGINE') == 'workers':
+        app.logger.error("EXECUTION_ENGINE is 'workers' but WORKER_TOKEN is not set, running tools locally")
+    get_executor(executor_settings)
+    run_tool = execute_tool
+
+# Output files of local runs, kept for download
+artifact_store = None
+if app.config.get('ARTIFACTS_ENABLED', True) and run_tool is not execute_on_workers:
+    artifact_store = get_artifact_store({
+        'ARTIFACTS_DIR': app.config.get('ARTIFACTS_DIR'),
+        'TTL': app.config.get('ARTIFACT_TTL', 3600),
+        'MAX_FILES': app.config.get('ARTIFACT_MAX_FILES', 100),
+        'MAX_TOTAL_SIZE': app.config.get('ARTIFACT_MAX_SIZE', 100 * 1024 * 1024)
+    })
+
+def run_scheduled(full_path, tool_path, params, client_id, workspace=None, inputs=None):
+    """
+    Execute a tool once the scheduler grants it a slot.
+    Files the tool writes to its workspace are kept as artifacts of the run.
+    
+    Args:
+        workspace (str): Pool workspace already holding uploaded files, released by the caller
+        inputs (list): Names of the uploaded files, which are not artifacts
+    """
+    # Serve deterministic tools from the result cache
+    cache_key = None
+    tool_info = get_tool_details(CATALOG, tool_path)
+    if (app.config.get('RESULT_CACHE_ENABLED', True) and tool_info and not inputs
+            and tool_info.get('relative_path') == tool_path
+            and result_cache.is_cacheable(tool_info, lambda: extract_docstring(full_path, DETAIL_SUMMARY))):
+        cache_key = result_cache.make_key(tool_info['hash'], params)
+        cached_result = result_cache.get(cache_key)
+        if cached_result is not None:
+            cached_result['cached'] = True
+            cached_result['queue_wait_time'] = 0
+            history.record(tool_path, cached_result)
+            return cached_result
+    
+    lane = 'short' if tool_path in app.config.get('SHORT_TOOLS', []) else 'normal'
+    expected_duration = timeout = None
+    if scheduler.mode == 'duration':
+        expected_duration = duration_model.expected_duration(tool_path)
+        timeout = duration_model.timeout_for(tool_path)
+    
+    # Give the run a workspace of our own so its output files can be collected
+    pooled = None
+    if workspace is None and artifact_store is not None:
+        pooled = workspace = get_workspace_pool().acquire()
+    
+    try:
+        result, wait_time = scheduler.run(
+            lambda: run_tool(full_path, params, timeout, workspace),
+            client_id=client_id,
+            lane=lane,
+            expected_duration=expected_duration
+        )
+        result['queue_wait_time'] = wait_time
+        result['cached'] = False
+        
+        artifacts = []
+        if workspace is not None:
+            execution_id, artifacts = artifact_store.collect(workspace, exclude=inputs)
+        
+        # Runs that produced files are not served from the cache
+        if cache_key and not artifacts:
+            result_cache.put(cache_key, result)
+        
+        if workspace is not None:
+            result['execution_id'] = execution_id
+            result['artifacts'] = [
+                dict(artifact, url=f"/artifacts/{execution_id}/{quote(artifact['name'])}")
+                for artifact in artifacts
+            ]
+    finally:
+        if pooled:
+            get_workspace_pool().release(pooled)
+    
+    history.record(tool_path, result)
+    return result
+
+def validate_invocation(tool_path, params, require_catalog=False):
+    """
+    Validate a tool path and its parameters before execution.
+    
+    Returns:
+        tuple: (full_path, error, status) - error and status are None when valid
+    """
+    if not tool_path:
+        return None, "Tool path is required", 400
+    if not isinstance(params, dict):
+        return None, "Parameters must be an object", 400
+    
+    # Validate tool path
+    full_path = os.path.join(PYSNIP_ROOT, tool_path)
+    if not os.path.exists(full_path) or not os.path.isfile(full_path):
+        return None, "Tool not found", 404
+    
+    if require_catalog:
+        tool_info = get_tool_details(CATALOG, tool_path)
+        if not tool_info or len(tool_path.split('/')) != 3 or os.path.basename(tool_path) not in tool_info.get('all_scripts', []):
+            return None, "Tool not found in catalog", 404
+    
+    # Check for prohibited commands
+    prohibited_commands = app.config.get('PROHIBITED_COMMANDS', [])
+    for param_name, param_value in params.items():
+        if isinstance(param_value, str):
+            for cmd in prohibited_commands:
+                if cmd in param_value:
+                    app.logger.warning(f"Prohibited command detected: {cmd} in {param_value}")
+                    return None, "Prohibited command detected", 403
+    
+    return full_path, None, None
+
 # Initialize or refresh the catalog
 def initialize_catalog():
-    global CATALOG, LAST_SCAN_TIME
+    global CATALOG, CATALOG_FILES, CATALOG_INDEX, LAST_SCAN_TIME
     try:
-        CATALOG = scan_pysnip_directory(PYSNIP_ROOT)
+        CATALOG = scan_pysnip_directory(PYSNIP_ROOT, precompile=app.config.get('PRECOMPILE_TOOLS', True))
+        CATALOG_FILES = get_catalog_files(CATALOG)
+        CATALOG_INDEX = CatalogIndex(CATALOG, {
+            'DEFAULT_PAGE_SIZE': app.config.get('API_PAGE_SIZE', 50),
+            'MAX_PAGE_SIZE': app.config.get('API_MAX_PAGE_SIZE', 500)
+        })
         LAST_SCAN_TIME = time.time()
         app.logger.info(f"Catalog initialized with {len(CATALOG['categories'])} categories")
+        
+        # Parse documentation now rather than on first visit
+        extraction.prewarm(CATALOG)
+        guide_renderer.prewarm(CATALOG)
+        
+        # Build tool environments now rather than on first execution
+        if app.config.get('USE_VENV', False):
+            get_environment_manager().prewarm(CATALOG)
         return CATALOG
     except Exception as e:
         app.logger.error(f"Error initializing catalog: {e}")
@@ -175,43 +455,99 @@ def tool(tool_path):
     
     return render_template('tool.html', tool=tool_info)
 
+@app.route('/guide/<path:tool_path>')
+def guide(tool_path):
+    """Show the Markdown guide of a tool as HTML (other guide formats are served raw)"""
+    tool_info = get_tool_details(CATALOG, tool_path)
+    if not tool_info or not tool_info.get('guide_path'):
+        abort(404)
+    
+    guide_path = tool_info['guide_path']
+    rendered = None
+    if guide_path.endswith('.md'):
+        try:
+            rendered = guide_renderer.render(os.path.join(PYSNIP_ROOT, guide_path), tool_info.get('guide_hash'))
+        except OSError:
+            abort(404)
+    if rendered is None:
+        return redirect(f"/raw/{guide_path}")
+    
+    return render_template('guide.html', tool=tool_info, guide=rendered)
+
 @app.route('/execute', methods=['POST'])
 @rate_limit(limit=10, per=60)  # Limit to 10 executions per minute
 def execute():
-    """Execute a tool with provided parameters"""
-    if not request.is_json:
-        return jsonify({"error": "Request must be JSON"}), 400
+    """
+    Execute a tool with provided parameters.
     
-    data = request.json
-    tool_path = data.get('tool_path')
-    params = data.get('params', {})
+    Accepts JSON, or multipart/form-data with tool_path, params (a JSON object)
+    and file fields. Uploaded files are streamed into the execution workspace.
+    A file field sets the parameter of the same name to the file's name, the
+    'files' field only places its files in the workspace.
+    """
+    workspace = None
+    inputs = []
+    if request.mimetype == 'multipart/form-data':
+        if not app.config.get('ENABLE_EXECUTIONS', True):
+            return jsonify({"error": "Tool execution is disabled"}), 403
+        if artifact_store is None:
+            return jsonify({"error": "File uploads are not supported by this execution engine"}), 400
+        
+        workspace = get_workspace_pool().acquire()
+        try:
+            form, file_params, inputs = receive_uploads(
+                request.stream, request.mimetype, request.content_length, request.mimetype_params, workspace,
+                max_content_length=app.config.get('MAX_CONTENT_LENGTH'),
+                allowed_extensions=app.config.get('ALLOWED_EXTENSIONS')
+            )
+            params = json.loads(form.get('params') or '{}')
+        except werkzeug.exceptions.HTTPException as e:
+            get_workspace_pool().release(workspace)
+            return jsonify({"error": e.description}), e.code
+        except ValueError as e:
+            get_workspace_pool().release(workspace)
+            return jsonify({"error": f"Invalid upload request: {e}"}), 400
+        except Exception:
+            get_workspace_pool().release(workspace)
+            raise
+        
+        tool_path = form.get('tool_path')
+        if isinstance(params, dict):
+            params.update(file_params)
+    elif request.is_json:
+        data = request.json
+        tool_path = data.get('tool_path')
+        params = data.get('params', {})
+    else:
+        return jsonify({"error": "Request must be JSON or multipart/form-data"}), 400
     
-    if not tool_path:
-        return jsonify({"error": "Tool path is required"}), 400
-    
-    # Validate tool path
-    full_path = os.path.join(PYSNIP_ROOT, tool_path)
-    if not os.path.exists(full_path) or not os.path.isfile(full_path):
-        return jsonify({"error": "Tool not found"}), 404
+    try:
+        return _execute_request(tool_path, params, workspace, inputs)
+    finally:
+        if workspace:
+            get_workspace_pool().release(workspace)
+
+def _execute_request(tool_path, params, workspace, inputs):
+    """Validate and run one /execute request"""
+    full_path, error, status = validate_invocation(tool_path, params)
+    if error:
+        return jsonify({"error": error}), status
     
     # Check if tool execution is enabled
     if not app.config.get('ENABLE_EXECUTIONS', True):
         return jsonify({"error": "Tool execution is disabled"}), 403
     
-    # Check for prohibited commands
-    prohibited_commands = app.config.get('PROHIBITED_COMMANDS', [])
-    for param_name, param_value in params.items():
-        if isinstance(param_value, str):
-            for cmd in prohibited_commands:
-                if cmd in param_value:
-                    app.logger.warning(f"Prohibited command detected: {cmd} in {param_value}")
-                    return jsonify({"error": "Prohibited command detected"}), 403
-    
     # Execute the tool and capture output
     app.logger.info(f"Executing tool: {tool_path} with params: {params}")
     try:
-        result = execute_tool(full_path, params)
+        result = run_scheduled(full_path, tool_path, params, request.remote_addr, workspace, inputs)
         return jsonify(result)
+    except (QueueFullException, QueueTimeoutException) as e:
+        app.logger.warning(f"Execution of {tool_path} not scheduled: {e}")
+        return jsonify({"error": str(e)}), 503
+    except EnvironmentBuildingException as e:
+        app.logger.info(f"Execution of {tool_path} deferred: {e}")
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "10"}
     except Exception as e:
         app.logger.error(f"Error executing tool: {e}", exc_info=True)
         return jsonify({
@@ -223,8 +559,166 @@ def execute():
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }), 500
 
+@app.route('/execute/batch', methods=['POST'])
+@rate_limit(limit=10, per=60)  # A batch counts as one request
+def execute_batch():
+    """Execute many tool invocations in parallel, streaming results as NDJSON"""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+    
+    if not app.config.get('ENABLE_EXECUTIONS', True):
+        return jsonify({"error": "Tool execution is disabled"}), 403
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    
+    invocations = data.get('invocations')
+    max_size = app.config.get('BATCH_MAX_SIZE', 100)
+    if not isinstance(invocations, list) or not invocations:
+        return jsonify({"error": "invocations must be a non-empty list"}), 400
+    if len(invocations) > max_size:
+        return jsonify({"error": f"Batch too large (maximum {max_size} invocations)"}), 400
+    
+    # Validate everything before running anything
+    jobs = []
+    errors = []
+    for index, invocation in enumerate(invocations):
+        if not isinstance(invocation, dict):
+            errors.append({"index": index, "error": "Invocation must be an object"})
+            continue
+        tool_path = invocation.get('tool_path')
+        params = invocation.get('params', {})
+        full_path, error, status = validate_invocation(tool_path, params, require_catalog=True)
+        if error:
+            errors.append({"index": index, "tool_path": tool_path, "error": error})
+        else:
+            jobs.append((index, tool_path, full_path, params))
+    
+    if errors:
+        return jsonify({"error": "Invalid batch", "items": errors}), 400
+    
+    client_id = request.remote_addr
+    max_workers = min(app.config.get('BATCH_MAX_WORKERS', scheduler.max_concurrent), len(jobs))
+    app.logger.info(f"Executing batch of {len(jobs)} invocations with {max_workers} workers")
+    
+    def generate():
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pysnip-batch")
+        futures = {
+            pool.submit(run_scheduled, full_path, tool_path, params, client_id): (index, tool_path)
+            for index, tool_path, full_path, params in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                index, tool_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    app.logger.error(f"Error executing {tool_path} in batch: {e}")
+                    result = {
+                        "success": False,
+                        "error": str(e),
+                        "stdout": "",
+                        "stderr": f"ERROR: {str(e)}",
+                        "execution_time": 0,
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    }
+                yield json.dumps({"index": index, "tool_path": tool_path, "result": result}) + "\n"
+        finally:
+            # Stop queued work if the client went away
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/artifacts/<execution_id>')
+def artifact_list(execution_id):
+    """List the files an execution left in its workspace"""
+    if artifact_store is None:
+        abort(404)
+    artifacts = artifact_store.files(execution_id)
+    if artifacts is None:
+        return jsonify({"error": "Execution not found or expired"}), 404
+    
+    for artifact in artifacts:
+        artifact['url'] = f"/artifacts/{execution_id}/{quote(artifact['name'])}"
+    return jsonify({"execution_id": execution_id, "artifacts": artifacts})
+
+@app.route('/artifacts/<execution_id>/<path:name>')
+def artifact_download(execution_id, name):
+    """Download an execution artifact (supports Range and conditional requests)"""
+    if artifact_store is None:
+        abort(404)
+    path = artifact_store.path_for(execution_id, name)
+    if path is None:
+        abort(404)
+    
+    # Served through the WSGI file wrapper (sendfile where the server supports it)
+    return send_file(path, as_attachment=True, conditional=True,
+                     max_age=app.config.get('ARTIFACT_TTL', 3600))
+
+@app.route('/outputs/<output_id>/<stream>')
+def output_page(output_id, stream):
+    """
+    Page through the complete stdout or stderr of an execution.
+    ?line=N&lines=M returns whole lines, ?offset=N&length=M returns a byte range.
+    """
+    if output_store is None:
+        abort(404)
+    
+    if 'offset' in request.args:
+        page = output_store.read_bytes(output_id, stream, request.args.get('offset', 0, type=int),
+                                       request.args.get('length', type=int))
+    else:
+        lines = request.args.get('lines', app.config.get('OUTPUT_PAGE_LINES', 500), type=int)
+        page = output_store.read_lines(output_id, stream, request.args.get('line', 0, type=int),
+                                       min(max(lines, 1), 10000))
+    if page is None:
+        return jsonify({"error": "Output not found or expired"}), 404
+    
+    page.update(output_id=output_id, stream=stream)
+    return jsonify(page)
+
+@app.route('/outputs/<output_id>/<stream>/raw')
+def output_raw(output_id, stream):
+    """Download a complete stored output as text"""
+    if output_store is None:
+        abort(404)
+    chunks = output_store.iter_raw(output_id, stream)
+    if chunks is None:
+        abort(404)
+    
+    return Response(chunks, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename={stream}-{output_id[:8]}.txt'
+    })
+
+@app.route('/raw/<path:file_path>')
+def raw_file(file_path):
+    """
+    Serve a tool script, guide or resource file as-is (supports Range and conditional requests).
+    Only files in the catalog are served. ?download=1 sends the file as an attachment.
+    """
+    kind = CATALOG_FILES.get(file_path)
+    if kind is None:
+        abort(404)
+    if kind == "script" and not app.config.get('ENABLE_SOURCE_VIEW', True):
+        abort(403)
+    
+    full_path = os.path.join(PYSNIP_ROOT, file_path)
+    if not os.path.isfile(full_path):
+        abort(404)
+    
+    # Served through the WSGI file wrapper (sendfile where the server supports it)
+    response = send_file(full_path, as_attachment=request.args.get('download') == '1', conditional=True,
+                         max_age=app.config.get('RAW_FILE_MAX_AGE', 300))
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    # Documents that can run script are rendered without this origin's privileges
+    if response.mimetype in ACTIVE_CONTENT_TYPES or response.mimetype.endswith('+xml'):
+        response.headers['Content-Security-Policy'] = 'sandbox'
+    return response
+
 @app.route('/parameters/<path:tool_path>')
-@cached(timeout=300)  # Cache for 5 minutes
 def get_parameters(tool_path):
     """Get parameters for a tool"""
     full_path = os.path.join(PYSNIP_ROOT, tool_path)
@@ -239,24 +733,30 @@ def get_parameters(tool_path):
         return jsonify({"error": str(e)}), 500
 
 @app.route('/docs/<path:tool_path>')
-@cached(timeout=300)  # Cache for 5 minutes
 def docs(tool_path):
     """Get documentation for a tool"""
     full_path = os.path.join(PYSNIP_ROOT, tool_path)
     if not os.path.exists(full_path):
         return jsonify({"error": "Tool not found"}), 404
     
+    detail = request.args.get('detail', DETAIL_FULL)
+    if detail not in DETAIL_LEVELS:
+        return jsonify({"error": f"detail must be one of: {', '.join(DETAIL_LEVELS)}"}), 400
+    
     try:
-        docstring = extract_docstring(full_path)
+        docstring = extract_docstring(full_path, detail)
         return jsonify(docstring)
     except Exception as e:
         app.logger.error(f"Error extracting docstring: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/source/<path:tool_path>')
-@cached(timeout=300)  # Cache for 5 minutes
 def source(tool_path):
-    """Get source code for a tool"""
+    """
+    Get source code for a tool.
+    With start and/or end, returns that window of lines (1-based, inclusive)
+    as highlighted HTML instead of the plain source.
+    """
     full_path = os.path.join(PYSNIP_ROOT, tool_path)
     if not os.path.exists(full_path):
         return jsonify({"error": "Tool not found"}), 404
@@ -265,6 +765,21 @@ def source(tool_path):
     if not app.config.get('ENABLE_SOURCE_VIEW', True):
         return jsonify({"error": "Source view is disabled"}), 403
     
+    if 'start' in request.args or 'end' in request.args:
+        try:
+            start = int(request.args.get('start', 1))
+            end = int(request.args['end']) if 'end' in request.args else None
+        except ValueError:
+            return jsonify({"error": "start and end must be integers"}), 400
+        if start < 1 or (end is not None and end < start):
+            return jsonify({"error": "Invalid line window"}), 400
+        
+        try:
+            return jsonify(source_renderer.window(full_path, start, end))
+        except Exception as e:
+            app.logger.error(f"Error rendering source code: {e}", exc_info=True)
+            return jsonify({"error": str(e)}), 500
+    
     try:
         with open(full_path, 'r', encoding='utf-8') as f:
             source_code = f.read()
@@ -273,6 +788,73 @@ def source(tool_path):
         app.logger.error(f"Error reading source code: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+# Parts of a tool page that /bundle can return
+BUNDLE_FIELDS = ('docs', 'parameters', 'source', 'related')
+
+@app.route('/bundle/<path:tool_path>')
+def bundle(tool_path):
+    """
+    Get the data of a tool page in one request, from a single parse of the script.
+    ?fields=docs,parameters,source,related selects the parts (default: all).
+    Responses carry an ETag, so an unchanged tool is answered with 304.
+    """
+    # Only scripts of the catalog, never a path built from arbitrary input
+    if CATALOG_FILES.get(tool_path) != 'script':
+        return jsonify({"error": "Tool not found"}), 404
+    tool_info = get_tool_details(CATALOG, tool_path)
+    full_path = os.path.join(PYSNIP_ROOT, tool_path)
+    if not tool_info or not os.path.isfile(full_path):
+        return jsonify({"error": "Tool not found"}), 404
+    
+    fields = [field.strip() for field in request.args.get('fields', ','.join(BUNDLE_FIELDS)).split(',') if field.strip()]
+    unknown = [field for field in fields if field not in BUNDLE_FIELDS]
+    if unknown or not fields:
+        return jsonify({"error": f"fields must be a subset of: {', '.join(BUNDLE_FIELDS)}"}), 400
+    
+    try:
+        result = extraction.extract(full_path)
+    except Exception as e:
+        app.logger.error(f"Error extracting tool data: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    if result["hash"] is None:
+        return jsonify({"error": result["doc"].get("error", "Cannot read tool")}), 500
+    
+    # Related tools come from the catalog, so a rescan changes them too
+    etag = hashlib.md5(
+        f"{result['hash']}:{PARSER_VERSION}:{','.join(fields)}:{LAST_SCAN_TIME if 'related' in fields else ''}".encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    data = {"path": tool_path, "hash": result["hash"]}
+    if 'docs' in fields:
+        data["docs"] = result["doc"]
+    if 'parameters' in fields:
+        data["parameters"] = result["parameters"]
+    if 'source' in fields:
+        if app.config.get('ENABLE_SOURCE_VIEW', True):
+            window = source_renderer.window(full_path, 1, 0)
+            data["source"] = {
+                "size": os.path.getsize(full_path),
+                "total_lines": window["total_lines"],
+                "highlighted": window["highlighted"],
+                "raw_url": f"/raw/{tool_path}"
+            }
+        else:
+            data["source"] = None
+    if 'related' in fields:
+        data["related"] = [
+            {key: related_tool.get(key) for key in ("name", "directory", "relative_path", "complete")}
+            for related_tool in get_related_tools(CATALOG, tool_info["category"], count=6)
+            if related_tool["directory"] != tool_info["directory"]
+        ][:5]
+    
+    response = jsonify(data)
+    response.set_etag(etag)
+    return response
+
 @app.route('/related/<category_name>')
 @cached(timeout=600)  # Cache for 10 minutes
 def related(category_name):
@@ -284,6 +866,152 @@ def related(category_name):
         app.logger.error(f"Error getting related tools: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+def _catalog_response(build):
+    """
+    JSON response of the catalog API with an ETag of the catalog generation and query.
+    build() is only called when the client does not already have the response.
+    """
+    index = CATALOG_INDEX or CatalogIndex(CATALOG or {})
+    etag = hashlib.md5(f"{index.generation}:{request.full_path}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        try:
+            response = jsonify(build(index))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    response.set_etag(etag)
+    return response
+
+def _query_tools(index, category=None):
+    """Tool page of the catalog index from the request arguments"""
+    def flag(name):
+        value = request.args.get(name)
+        if value is None:
+            return None
+        if value.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError(f"{name} must be true or false")
+        return value.lower() in ('true', '1')
+    
+    fields = request.args.get('fields')
+    return index.query(
+        category=category if category is not None else request.args.get('category'),
+        complete=flag('complete'),
+        guide=flag('guide'),
+        search=request.args.get('q'),
+        sort=request.args.get('sort', 'name'),
+        order=request.args.get('order', 'asc'),
+        cursor=request.args.get('cursor'),
+        limit=request.args.get('limit', type=int),
+        fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None
+    )
+
+@app.route('/api/catalog')
+def api_catalog():
+    """Catalog summary with its categories (tools are listed by /api/tools)"""
+    return _catalog_response(lambda index: {
+        "name": index.catalog.get("name"),
+        "description": index.catalog.get("description"),
+        "tools_count": len(index.tools),
+        "generation": index.generation,
+        "categories": index.categories()
+    })
+
+@app.route('/api/tools')
+def api_tools():
+    """
+    Paginated tool listing.
+    Filters: category, complete, guide, q. Sorting: sort (name, category, size,
+    mod_date, complete) and order (asc, desc). Paging: limit and cursor.
+    fields selects the tool fields returned.
+    """
+    return _catalog_response(_query_tools)
+
+@app.route('/api/categories/<name>/tools')
+def api_category_tools(name):
+    """Paginated tools of one category, with the same arguments as /api/tools"""
+    if CATALOG_INDEX is None or not CATALOG_INDEX.has_category(name):
+        return jsonify({"error": "Category not found"}), 404
+    return _catalog_response(lambda index: _query_tools(index, category=name))
+
+@app.route('/api/history')
+@require_admin_token
+def history_list():
+    """Paginated execution history, newest first"""
+    try:
+        page = history.query(
+            tool=request.args.get('tool'),
+            status=request.args.get('status'),
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float),
+            cursor=request.args.get('cursor', type=int),
+            limit=request.args.get('limit', 50, type=int)
+        )
+        return jsonify(page)
+    except Exception as e:
+        app.logger.error(f"Error querying execution history: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/history/stats')
+@require_admin_token
+def history_stats():
+    """Rolling per-tool duration percentiles and failure rates"""
+    return jsonify({"tools": history.tool_stats(request.args.get('tool'))})
+
+@app.route('/workers/register', methods=['POST'])
+@require_worker_token
+def worker_register():
+    """Register a remote worker"""
+    data = request.get_json(silent=True) or {}
+    try:
+        capacity = int(data.get('capacity', 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid capacity"}), 400
+    
+    name = str(data.get('name') or request.remote_addr)
+    info = data.get('info') if isinstance(data.get('info'), dict) else {}
+    info['address'] = request.remote_addr
+    return jsonify(dispatcher.register(name, capacity, info))
+
+@app.route('/workers/<worker_id>/heartbeat', methods=['POST'])
+@require_worker_token
+def worker_heartbeat(worker_id):
+    """Record a worker heartbeat"""
+    data = request.get_json(silent=True) or {}
+    if not dispatcher.heartbeat(worker_id, data.get('load')):
+        return jsonify({"error": "Unknown worker"}), 404
+    return jsonify({"status": "ok"})
+
+@app.route('/workers/<worker_id>/poll', methods=['POST'])
+@require_worker_token
+def worker_poll(worker_id):
+    """Long-poll for the next job of a worker"""
+    try:
+        job = dispatcher.poll(worker_id)
+    except KeyError:
+        return jsonify({"error": "Unknown worker"}), 404
+    if job is None:
+        return '', 204
+    return jsonify(job)
+
+@app.route('/workers/<worker_id>/jobs/<job_id>/result', methods=['POST'])
+@require_worker_token
+def worker_result(worker_id, job_id):
+    """Accept the result of a job from a worker"""
+    data = request.get_json(silent=True) or {}
+    result = data.get('result')
+    if not isinstance(result, dict):
+        return jsonify({"error": "Missing result"}), 400
+    if not dispatcher.complete(worker_id, job_id, result):
+        return jsonify({"error": "Job is not assigned to this worker"}), 404
+    return jsonify({"status": "ok"})
+
+@app.route('/workers')
+@require_worker_token
+def worker_list():
+    """Registered workers and queued jobs"""
+    return jsonify(dispatcher.stats())
+
 @app.route('/random')
 def random_tool():
     """Get a random tool"""
@@ -331,7 +1059,13 @@ def health_check():
         "version": "1.0.0",
         "tools_count": CATALOG.get('tools_count', 0) if CATALOG else 0,
         "categories_count": len(CATALOG.get('categories', [])) if CATALOG else 0,
-        "uptime": time.time() - LAST_SCAN_TIME if LAST_SCAN_TIME else 0
+        "uptime": time.time() - LAST_SCAN_TIME if LAST_SCAN_TIME else 0,
+        "executions": scheduler.stats(),
+        "result_cache": result_cache.stats(),
+        "extraction": extraction.stats(),
+        "source": source_renderer.stats(),
+        "guides": guide_renderer.stats(),
+        "workers": len(dispatcher.stats()["workers"]) if dispatcher else None
     })
 
 if __name__ == '__main__':
@@ -65,21 +65,102 @@ MAX_EXECUTION_TIME = int(os.environ.get('MAX_EXECUTION_TIME', 60))  # Maximum ex
 MAX_OUTPUT_SIZE = int(os.environ.get('MAX_OUTPUT_SIZE', 1024 * 1024))  # Maximum output size in bytes (1MB)
 MAX_MEMORY_USAGE = int(os.environ.get('MAX_MEMORY_USAGE', 512 * 1024 * 1024))  # Maximum memory usage (512MB)
 PROHIBITED_COMMANDS = os.environ.get('PROHIBITED_COMMANDS', 'rm,del,format,mkfs,dd').split(',')
+PRECOMPILE_TOOLS = os.environ.get('PRECOMPILE_TOOLS', 'True').lower() == 'true'  # Cache tool bytecode at scan time
+SANDBOX_ENABLED = os.environ.get('SANDBOX_ENABLED', 'True').lower() == 'true'  # Run tools in Linux namespaces (unshare)
+SANDBOX_ISOLATE_NETWORK = os.environ.get('SANDBOX_ISOLATE_NETWORK', 'True').lower() == 'true'  # No network in sandbox
+USE_VENV = os.environ.get('USE_VENV', 'False').lower() == 'true'  # Per-tool environments for third-party imports
+VENV_DIR = os.environ.get('VENV_DIR', os.path.join(CACHE_DIR, 'envs'))  # Where tool environments are built
+WHEELHOUSE = os.environ.get('WHEELHOUSE')  # Local wheel directory for offline installs
+EXECUTION_ENGINE = os.environ.get('EXECUTION_ENGINE', 'thread').lower()  # 'thread', 'asyncio' or 'workers'
+
+# Execution scheduling settings
+MAX_CONCURRENT_EXECUTIONS = int(os.environ.get('MAX_CONCURRENT_EXECUTIONS', os.cpu_count() or 1))  # Tools running at once
+EXECUTION_QUEUE_SIZE = int(os.environ.get('EXECUTION_QUEUE_SIZE', 100))  # Maximum queued executions
+EXECUTION_QUEUE_TIMEOUT = int(os.environ.get('EXECUTION_QUEUE_TIMEOUT', 120))  # Maximum queue wait in seconds
+SHORT_TOOLS = [t for t in os.environ.get('SHORT_TOOLS', '').split(',') if t]  # Tool paths run in the priority lane
+SCHEDULER_MODE = os.environ.get('SCHEDULER_MODE', 'fair').lower()  # 'fair' or 'duration' (shortest expected first)
+SCHEDULER_AGING_RATE = float(os.environ.get('SCHEDULER_AGING_RATE', 1.0))  # Expected seconds forgiven per second queued
+DEFAULT_EXPECTED_DURATION = float(os.environ.get('DEFAULT_EXPECTED_DURATION', 5.0))  # Assumed run time of new tools
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.environ.get('ADAPTIVE_TIMEOUT_MIN_SAMPLES', 20))  # Runs before history is used
+ADAPTIVE_TIMEOUT_HEADROOM = float(os.environ.get('ADAPTIVE_TIMEOUT_HEADROOM', 2.0))  # Timeout = p99 x headroom
+ADAPTIVE_TIMEOUT_MIN = float(os.environ.get('ADAPTIVE_TIMEOUT_MIN', 5.0))  # Lower bound for adaptive timeouts
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 100))  # Maximum invocations per batch request
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', MAX_CONCURRENT_EXECUTIONS))  # Parallel runs per batch
+CLIENT_WEIGHTS = {  # Fair-share weights per client address, e.g. "10.0.0.5=2,10.0.0.6=0.5"
+    k: float(v) for k, v in (
+        item.split('=', 1) for item in os.environ.get('CLIENT_WEIGHTS', '').split(',') if '=' in item
+    )
+}
+
+# Remote worker settings (worker.py); worker mode is disabled without a token
+WORKER_TOKEN = os.environ.get('WORKER_TOKEN')  # Shared secret workers send in X-Worker-Token
+WORKER_HEARTBEAT_INTERVAL = int(os.environ.get('WORKER_HEARTBEAT_INTERVAL', 5))  # Seconds between heartbeats
+WORKER_HEARTBEAT_TIMEOUT = int(os.environ.get('WORKER_HEARTBEAT_TIMEOUT', 15))  # Silence before a worker is dropped
+WORKER_ASSIGN_TIMEOUT = int(os.environ.get('WORKER_ASSIGN_TIMEOUT', 60))  # Maximum wait for a free worker
+
+# Execution artifact settings (files tools write to their workspace)
+ARTIFACTS_ENABLED = os.environ.get('ARTIFACTS_ENABLED', 'True').lower() == 'true'  # Keep output files for download
+ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR')  # Must share the workspaces' filesystem (None = inside the workspace pool)
+ARTIFACT_TTL = int(os.environ.get('ARTIFACT_TTL', 3600))  # Seconds artifacts stay downloadable
+ARTIFACT_MAX_FILES = int(os.environ.get('ARTIFACT_MAX_FILES', 100))  # Files kept per execution
+ARTIFACT_MAX_SIZE = int(os.environ.get('ARTIFACT_MAX_SIZE', 100 * 1024 * 1024))  # Bytes kept per execution (100MB)
+
+# Execution output store settings (complete stdout/stderr, paged by /outputs)
+STORE_OUTPUT = os.environ.get('STORE_OUTPUT', 'True').lower() == 'true'  # Results carry a preview and an output id
+OUTPUT_DIR = os.environ.get('OUTPUT_DIR', os.path.join(CACHE_DIR, 'outputs'))
+OUTPUT_TTL = int(os.environ.get('OUTPUT_TTL', 3600))  # Seconds stored outputs stay available
+OUTPUT_PREVIEW_SIZE = int(os.environ.get('OUTPUT_PREVIEW_SIZE', 64 * 1024))  # Inline characters per stream
+OUTPUT_STORE_MAX_SIZE = int(os.environ.get('OUTPUT_STORE_MAX_SIZE', 64 * 1024 * 1024))  # Stored bytes per stream
+OUTPUT_PAGE_LINES = int(os.environ.get('OUTPUT_PAGE_LINES', 500))  # Default lines per output page
+
+# Result cache settings for deterministic tools
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 300))  # Cached result lifetime in seconds
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))  # Maximum cached results
+CACHEABLE_TOOLS = [t for t in os.environ.get('CACHEABLE_TOOLS', '').split(',') if t]  # Tool paths always cached
+
+# Parse cache settings for tool documentation and parameters
+PARSE_CACHE_SIZE = int(os.environ.get('PARSE_CACHE_SIZE', 2048))  # File versions kept in memory
+PARSE_STORE_ENABLED = os.environ.get('PARSE_STORE_ENABLED', 'True').lower() == 'true'  # Keep parse results across restarts
+PARSE_STORE_DB = os.environ.get('PARSE_STORE_DB', os.path.join(CACHE_DIR, 'parses.sqlite'))
+PARSE_STORE_MAX_ROWS = int(os.environ.get('PARSE_STORE_MAX_ROWS', 10000))  # Stored file versions
+
+# Source view settings
+SOURCE_CACHE_SIZE = int(os.environ.get('SOURCE_CACHE_SIZE', 128))  # Highlighted files kept in memory
+SOURCE_HIGHLIGHT_MAX_SIZE = int(os.environ.get('SOURCE_HIGHLIGHT_MAX_SIZE', 2 * 1024 * 1024))  # Larger files are shown unhighlighted
+SOURCE_WINDOW_MAX_LINES = int(os.environ.get('SOURCE_WINDOW_MAX_LINES', 2000))  # Most lines per source window request
+RAW_FILE_MAX_AGE = int(os.environ.get('RAW_FILE_MAX_AGE', 300))  # Browser cache lifetime of /raw files (seconds)
+
+# Guide settings
+GUIDE_CACHE_SIZE = int(os.environ.get('GUIDE_CACHE_SIZE', 64))  # Rendered Markdown guides kept in memory
+GUIDE_MAX_SIZE = int(os.environ.get('GUIDE_MAX_SIZE', 1024 * 1024))  # Larger guides are served raw
+
+# Catalog API settings
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))  # Tools per page when no limit is given
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))  # Most tools per page
+
+# Execution history settings
+HISTORY_DB = os.environ.get('HISTORY_DB', os.path.join(CACHE_DIR, 'history.sqlite'))
+HISTORY_STATS_WINDOW = int(os.environ.get('HISTORY_STATS_WINDOW', 200))  # Recent runs per tool in rolling stats
+HISTORY_MAX_AGE = int(os.environ.get('HISTORY_MAX_AGE', 30 * 86400))  # Seconds executions are kept (0 = forever)
+HISTORY_MAX_ROWS = int(os.environ.get('HISTORY_MAX_ROWS', 100000))  # Most executions kept (0 = unlimited)
 
 # User settings
 ENABLE_EXECUTIONS = os.environ.get('ENABLE_EXECUTIONS', 'True').lower() == 'true'
 ENABLE_SOURCE_VIEW = os.environ.get('ENABLE_SOURCE_VIEW', 'True').lower() == 'true'
 ENABLE_ADMIN = os.environ.get('ENABLE_ADMIN', 'False').lower() == 'true'
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')  # Secret admins send in X-Admin-Token (needed with ENABLE_ADMIN)
 
 # Security settings
-ALLOWED_EXTENSIONS = {'py', 'txt', 'csv', 'json', 'md', 'yml', 'yaml', 'ini', 'cfg'}
-MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max upload size
+ALLOWED_EXTENSIONS = {'txt', 'csv', 'json', 'md', 'yml', 'yaml', 'ini', 'cfg'}
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max request (and upload) size
 RATE_LIMIT = int(os.environ.get('RATE_LIMIT', 60))  # requests per minute
 
 # Caching settings
 CATALOG_CACHE_TIME = int(os.environ.get('CATALOG_CACHE_TIME', 3600))  # Cache catalog for 1 hour
 CATALOG_SCAN_INTERVAL = int(os.environ.get('CATALOG_SCAN_INTERVAL', 3600))  # Rescan catalog every hour
 USE_CATALOG_CACHE = os.environ.get('USE_CATALOG_CACHE', 'True').lower() == 'true'
+ROUTE_CACHE_SIZE = int(os.environ.get('ROUTE_CACHE_SIZE', 256))  # Responses kept per cached route
 
 # UI settings
 ITEMS_PER_PAGE = int(os.environ.get('ITEMS_PER_PAGE', 12))
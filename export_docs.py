@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PySnip Documentation Export
+-------------------
+Exports the documentation and command-line parameters of every tool in a
+PySnip directory as JSON Lines, one record per tool. Tools are parsed on a
+process pool and records are written as they are ready.
+
+With --resume, tools whose record in the output file has the same content
+hash and parser version are skipped, and new records are appended, so an
+interrupted export continues where it stopped. When a path appears more
+than once, its last record is the current one.
+
+Usage:
+    python export_docs.py --pysnip-root ~/pysnip --output docs.jsonl --jobs 8
+    python export_docs.py --output docs.jsonl --resume
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.scanner import scan_pysnip_directory
+from utils.doc_parser import get_extraction_engine, PARSER_VERSION
+
+# Set up logger
+logger = logging.getLogger("pysnip.export")
+
+# Tools handed to a pool process at a time
+CHUNK_SIZE = 8
+
+def _init_process(store_db):
+    """Create the extraction engine of a pool process"""
+    get_extraction_engine({'STORE_DB': store_db})
+
+def export_tool(task):
+    """
+    Parse one tool.
+
+    Args:
+        task (tuple): (relative path, full path, catalog tool entry)
+
+    Returns:
+        dict: The JSONL record of the tool
+    """
+    relative_path, full_path, tool = task
+    record = {
+        "path": relative_path,
+        "category": tool.get("category"),
+        "name": tool.get("name"),
+        "parser_version": PARSER_VERSION
+    }
+    try:
+        result = get_extraction_engine().extract(full_path)
+    except Exception as e:
+        logger.error(f"Error parsing {relative_path}: {e}")
+        record.update({"hash": None, "error": str(e)})
+        return record
+
+    record["hash"] = result["hash"]
+    if result["hash"] is None:
+        record["error"] = result["doc"].get("error", "Cannot read file")
+    else:
+        record.update({"doc": result["doc"], "parameters": result["parameters"]})
+    return record
+
+def read_exported(output_path):
+    """
+    Read the current record of every path in an existing export.
+
+    Returns:
+        dict: path -> (hash, parser_version) of records without errors
+    """
+    exported = {}
+    if not os.path.exists(output_path):
+        return exported
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Usually the last line, cut off by an interruption
+                logger.warning(f"Ignoring unreadable line {number} of {output_path}")
+                continue
+            if record.get("error"):
+                exported.pop(record.get("path"), None)
+            else:
+                exported[record.get("path")] = (record.get("hash"), record.get("parser_version"))
+    return exported
+
+def _ends_with_newline(file_path):
+    with open(file_path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def _hash_file(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def export(pysnip_root, output_path, jobs=1, resume=False, store_db=None, rescan=False):
+    """
+    Export the documentation of every catalog tool.
+
+    Args:
+        pysnip_root (str): PySnip tool directory
+        output_path (str): JSONL file to write, or '-' for stdout
+        jobs (int): Number of parsing processes
+        resume (bool): Skip tools already exported with the same content, append the rest
+        store_db (str): Parse store shared with the web app (None = parse everything)
+        rescan (bool): Scan the directory even if the cached catalog is current
+
+    Returns:
+        dict: Counts of exported, skipped and failed tools
+    """
+    catalog = scan_pysnip_directory(pysnip_root, force=rescan, precompile=False)
+    root_path = catalog.get('root_path', pysnip_root)
+
+    exported = read_exported(output_path) if resume and output_path != '-' else {}
+    tasks = []
+    skipped = 0
+    for category in catalog.get('categories', []):
+        for tool in category.get('tools', []):
+            relative_path = tool['relative_path']
+            full_path = os.path.join(root_path, relative_path)
+            previous = exported.get(relative_path)
+            # The catalog hash may predate an edit, so compare against the file itself
+            if previous and previous == (_hash_file(full_path), PARSER_VERSION):
+                skipped += 1
+                continue
+            tasks.append((relative_path, full_path, tool))
+
+    counts = {"exported": 0, "skipped": skipped, "failed": 0}
+    if output_path == '-':
+        output = sys.stdout
+    else:
+        output = open(output_path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and output.tell() and not _ends_with_newline(output_path):
+            output.write('\n')  # Keep a cut-off last line from swallowing the next record
+
+    try:
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_process, initargs=(store_db,)) as pool:
+                records = pool.map(export_tool, tasks, chunksize=CHUNK_SIZE)
+                counts = _write_records(records, output, counts)
+        else:
+            _init_process(store_db)
+            counts = _write_records(map(export_tool, tasks), output, counts)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return counts
+
+def _write_records(records, output, counts):
+    """Write records as they arrive, flushing each so an interrupted export keeps them"""
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        output.flush()
+        counts["failed" if record.get("error") else "exported"] += 1
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Export PySnip tool documentation as JSON Lines")
+    parser.add_argument('--pysnip-root', default=os.environ.get('PYSNIP_ROOT', os.path.expanduser('~/pysnip')),
+                        help='PySnip tool directory')
+    parser.add_argument('-o', '--output', default='-', help="JSONL file to write ('-' for stdout)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parsing processes')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip tools already in the output with the same content and append the rest')
+    parser.add_argument('--parse-store', default=os.environ.get('PARSE_STORE_DB'),
+                        help='Parse store of the web app to reuse and fill (default: $PARSE_STORE_DB)')
+    parser.add_argument('--rescan', action='store_true', help='Scan the directory even if the catalog cache is current')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+
+    if not os.path.isdir(args.pysnip_root):
+        parser.error(f"PySnip directory not found at: {args.pysnip_root}")
+    if args.resume and args.output == '-':
+        parser.error("--resume needs an output file")
+
+    start = time.time()
+    counts = export(args.pysnip_root, args.output, max(1, args.jobs), args.resume, args.parse_store, args.rescan)
+    logger.info(f"Exported {counts['exported']} tools, skipped {counts['skipped']} unchanged, "
+                f"{counts['failed']} failed in {time.time() - start:.1f}s")
+    return 1 if counts['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
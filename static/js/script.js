@@ -116,7 +116,8 @@ function initThemeToggle() {
     
     // Update code highlighting theme based on current theme
     function updateCodeTheme() {
-        const codeBlocks = document.querySelectorAll('pre code');
+        // Source viewer lines come highlighted from the server
+        const codeBlocks = document.querySelectorAll('pre:not(.source-lines) code');
         const darkTheme = appState.currentTheme === 'dark' ? 'atom-one-dark' : 'atom-one-light';
         
         // Update hljs theme if available
@@ -610,12 +611,12 @@ function displayExecutionResult(result, outputContainer, executeStatus) {
     
     // Add stdout if available
     if (result.stdout) {
-        outputHtml += escapeHtml(result.stdout);
+        outputHtml += `<span class="output-stdout">${escapeHtml(result.stdout)}</span>`;
     }
     
     // Add stderr if available
     if (result.stderr) {
-        outputHtml += `\n\n<div class="error">${escapeHtml(result.stderr)}</div>`;
+        outputHtml += `\n\n<div class="error output-stderr">${escapeHtml(result.stderr)}</div>`;
     }
     
     // If no output, show message
@@ -625,6 +626,7 @@ function displayExecutionResult(result, outputContainer, executeStatus) {
     
     // Update output container
     outputContainer.innerHTML = outputHtml;
+    pageStoredOutput(result, outputContainer);
     
     // Scroll to bottom of output
     outputContainer.scrollTop = outputContainer.scrollHeight;
@@ -653,6 +655,72 @@ function displayExecutionResult(result, outputContainer, executeStatus) {
     );
 }
 
+/**
+ * Replace truncated output previews with the stored output, loaded page by page
+ */
+function pageStoredOutput(result, outputContainer) {
+    if (!result.output_id || !result.output) return;
+    
+    ['stdout', 'stderr'].forEach(stream => {
+        const element = outputContainer.querySelector(`.output-${stream}`);
+        // Previews only differ from the stored output when they were cut short
+        if (!element || !result.output[stream] || !(result[stream] || '').endsWith('[OUTPUT TRUNCATED] ...')) return;
+        attachOutputPager(result.output_id, stream, element, outputContainer);
+    });
+}
+
+/**
+ * Lazily append pages of a stored output stream to an element while it is scrolled into view
+ */
+function attachOutputPager(outputId, stream, element, scrollContainer, pageSize = 256 * 1024) {
+    let nextOffset = 0;
+    let loading = false;
+    let done = false;
+    
+    const text = document.createElement('span');
+    const footer = document.createElement('div');
+    footer.className = 'text-muted small';
+    footer.innerHTML = `<span class="output-progress">Loading output...</span>
+        <a href="/outputs/${outputId}/${stream}/raw" class="ms-2">Download full ${stream}</a>`;
+    element.textContent = '';
+    element.appendChild(text);
+    element.appendChild(footer);
+    
+    async function loadPage() {
+        if (loading || done) return;
+        loading = true;
+        try {
+            const response = await fetch(`/outputs/${outputId}/${stream}?offset=${nextOffset}&length=${pageSize}`);
+            const page = await response.json();
+            if (!response.ok) throw new Error(page.error || response.statusText);
+            
+            text.appendChild(document.createTextNode(page.text));
+            nextOffset = page.next_offset;
+            done = page.eof;
+            footer.querySelector('.output-progress').textContent = done
+                ? `${formatFileSize(page.size)} of output`
+                : `Showing ${formatFileSize(nextOffset)} of ${formatFileSize(page.size)}, scroll for more`;
+        } catch (error) {
+            done = true;
+            footer.querySelector('.output-progress').textContent = `Error loading output: ${error.message}`;
+        } finally {
+            loading = false;
+        }
+        loadIfVisible();
+    }
+    
+    function loadIfVisible() {
+        // Fetch the next page once the end of this stream is near the visible area
+        const bottom = element.getBoundingClientRect().bottom;
+        if (!done && bottom <= scrollContainer.getBoundingClientRect().bottom + 200) {
+            loadPage();
+        }
+    }
+    
+    scrollContainer.addEventListener('scroll', loadIfVisible, { passive: true });
+    loadPage();
+}
+
 /**
  * Add execution to history
  */
@@ -884,65 +952,115 @@ function loadSourceCode() {
         </div>
     `;
     
-    // Fetch source code
-    fetch(`/source/${toolPath}`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.error) {
-                sourceContainer.innerHTML = `
-                    <div class="alert alert-warning">
-                        <i class="fas fa-exclamation-triangle me-2"></i>
-                        ${data.error}
-                    </div>
-                `;
-                return;
-            }
-            
-            // Generate source code HTML
-            const sourceHtml = `
-                <div class="source-loaded">
-                    <pre class="source-code"><code class="language-python">${escapeHtml(data.source)}</code></pre>
-                </div>
-            `;
-            
-            // Update container
-            sourceContainer.innerHTML = sourceHtml;
-            
-            // Apply syntax highlighting
-            if (window.hljs) {
-                document.querySelectorAll('.source-loaded pre code').forEach(block => {
-                    hljs.highlightElement(block);
-                });
-            }
-            
-            // Add line numbers
-            addLineNumbers();
-        })
+    // Show the server-highlighted source, fetching only the visible lines
+    attachSourceViewer(toolPath, sourceContainer)
         .catch(error => {
             console.error('Error loading source code:', error);
             sourceContainer.innerHTML = `
-                <div class="alert alert-danger">
-                    <i class="fas fa-exclamation-circle me-2"></i>
-                    Error loading source code: ${error.message}
+                <div class="alert alert-warning">
+                    <i class="fas fa-exclamation-triangle me-2"></i>
+                    ${escapeHtml(error.message)}
                 </div>
             `;
         });
-    
-    // Add line numbers to source code
-    function addLineNumbers() {
-        const sourceCode = document.querySelector('.source-code');
-        if (!sourceCode) return;
-        
-        const codeLines = sourceCode.querySelector('code').innerHTML.split('\n');
-        let numberedCode = '';
-        
-        for (let i = 0; i < codeLines.length; i++) {
-            numberedCode += `<span class="line-number">${i + 1}</span>${codeLines[i]}\n`;
+}
+
+/**
+ * Show a tool source in a virtualized viewer.
+ * Lines come highlighted from the server in blocks, and only the blocks
+ * under the visible area are fetched and rendered.
+ * Resolves once the first block is shown and rejects if it cannot be loaded.
+ */
+async function attachSourceViewer(toolPath, container, blockSize = 200) {
+    const blocks = new Map();    // block index -> array of line HTML
+    const pending = new Set();   // block indexes being fetched
+    let contentHash = null;
+    let totalLines = 0;
+    let lineHeight = 0;
+    let frameRequested = false;
+
+    async function fetchBlock(index) {
+        const start = index * blockSize + 1;
+        const response = await fetch(`/source/${toolPath}?start=${start}&end=${start + blockSize - 1}`);
+        const data = await response.json();
+        if (!response.ok || data.error) throw new Error(data.error || response.statusText);
+
+        if (contentHash !== null && data.hash !== contentHash) {
+            // The file changed since the viewer opened, drop lines of the old version
+            blocks.clear();
         }
-        
-        sourceCode.querySelector('code').innerHTML = numberedCode;
-        sourceCode.classList.add('line-numbers');
+        contentHash = data.hash;
+        totalLines = data.total_lines;
+        blocks.set(index, data.lines);
+        return data;
+    }
+
+    const first = await fetchBlock(0);
+
+    container.innerHTML = `
+        <div class="source-viewer source-loaded">
+            <div class="source-spacer"></div>
+            <pre class="source-lines hljs"><code></code></pre>
+        </div>
+    `;
+    const viewer = container.querySelector('.source-viewer');
+    const spacer = viewer.querySelector('.source-spacer');
+    const lines = viewer.querySelector('.source-lines');
+    const code = lines.querySelector('code');
+
+    if (!first.highlighted) {
+        viewer.title = 'File too large to highlight';
     }
+
+    function scheduleRender() {
+        if (frameRequested) return;
+        frameRequested = true;
+        requestAnimationFrame(render);
+    }
+
+    function loadBlock(index) {
+        if (blocks.has(index) || pending.has(index)) return;
+        pending.add(index);
+        fetchBlock(index)
+            .catch(error => console.error('Error loading source lines:', error))
+            .finally(() => {
+                pending.delete(index);
+                scheduleRender();
+            });
+    }
+
+    function render() {
+        frameRequested = false;
+        if (!lineHeight) {
+            // Every line has the same height, so line positions follow from the scroll offset.
+            // It can only be measured while the viewer is shown.
+            code.innerHTML = '<span class="line-number">0</span>';
+            lineHeight = lines.getBoundingClientRect().height;
+            if (!lineHeight) return;
+        }
+        spacer.style.height = `${totalLines * lineHeight}px`;
+
+        // Render a screen of extra lines on either side to keep scrolling smooth
+        const visible = Math.ceil(viewer.clientHeight / lineHeight);
+        const firstLine = Math.max(0, Math.floor(viewer.scrollTop / lineHeight) - visible);
+        const lastLine = Math.min(totalLines, firstLine + visible * 3);
+
+        let html = '';
+        for (let line = firstLine; line < lastLine; line++) {
+            const index = Math.floor(line / blockSize);
+            const block = blocks.get(index);
+            if (!block) loadBlock(index);
+            const text = block ? (block[line - index * blockSize] || '') : '';
+            html += `<span class="line-number">${line + 1}</span>${text}\n`;
+        }
+        code.innerHTML = html;
+        lines.style.transform = `translateY(${firstLine * lineHeight}px)`;
+    }
+
+    viewer.addEventListener('scroll', scheduleRender, { passive: true });
+    // Also renders when a hidden tab holding the viewer is shown
+    new ResizeObserver(scheduleRender).observe(viewer);
+    render();
 }
 
 /**
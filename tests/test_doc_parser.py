@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the single-pass docstring section parser
+--------------------------------------------------
+parse_docstring_sections() must produce exactly what the per-format
+parsers (DocstringParser._parse_docstring_reference) produce, for PySnip,
+Google, NumPy and plain docstrings alike.
+"""
+
+import os
+import json
+import email
+import random
+import argparse
+
+import pytest
+
+from utils.doc_parser import DocstringParser, SAMPLE_DOCSTRINGS, _harvest_docstrings
+
+# Docstrings at the edges of format detection and section splitting
+EDGE_CASES = [
+    "",
+    "Title only",
+    "Title only\n",
+    "    Indented title\n\n    Indented body\n    ",
+    "Title\n\nKey: value in the summary\nOther: line\n",
+    "Title\n\nParameters\n",
+    "Title\n\nArgs:\n",
+    "Title\n\nArgs:\n    x: first\n\nReturns:\n",
+    "Title\n\nReturns\n-------\n",
+    "Title\n\nNotes\n-----\n\nParameters\n----------\n",
+    "Title\n\n✒ Description:\n",
+    "Title\n\n✒ Description:\n    Text\n\n✒ Key Features:\n",
+    "Title\n-----\nUnderlined title",
+    "Title\n\nExamples:\n    run()\n\n✒ Command-Line Arguments:\n    --flag: A flag\n",
+    "Title\r\n\r\nArgs:\r\n    x: CRLF line endings\r\n",
+]
+
+# Lines mixed into generated docstrings, most of them header-like
+RANDOM_LINES = [
+    "Args:", "Arguments:", "Returns:", "Raises:", "Examples:", "Example:", "Note:", "Notes:",
+    "Parameters", "Returns", "Notes", "See Also", "----------", "-------", "-----", "---",
+    "✒ Metadata:", "✒ Description:", "✒ Key Features:", "✒ Usage Instructions:",
+    "✒ Command-Line Arguments:", "✒ Other Important Information:",
+    "Key: value", "x (int): A value", "name : str", "    indented text", "  - bullet",
+    "Plain sentence.", "", "", "",
+]
+
+@pytest.fixture(scope="module")
+def parser():
+    return DocstringParser()
+
+def assert_same_result(parser, docstring):
+    expected = json.dumps(parser._parse_docstring_reference(docstring), sort_keys=True)
+    assert json.dumps(parser._parse_docstring(docstring), sort_keys=True) == expected, docstring
+
+@pytest.mark.parametrize("docstring", SAMPLE_DOCSTRINGS)
+def test_samples_match_reference(parser, docstring):
+    assert_same_result(parser, docstring)
+
+@pytest.mark.parametrize("docstring", EDGE_CASES)
+def test_edge_cases_match_reference(parser, docstring):
+    assert_same_result(parser, docstring)
+
+def test_stdlib_docstrings_match_reference(parser):
+    paths = [os.path.dirname(json.__file__), os.path.dirname(email.__file__), argparse.__file__, random.__file__]
+    docstrings = _harvest_docstrings(paths)
+    assert len(docstrings) > 100
+    for docstring in docstrings:
+        assert_same_result(parser, docstring)
+
+def test_generated_docstrings_match_reference(parser):
+    rng = random.Random(43)
+    for _ in range(3000):
+        lines = ["Generated title"] + [rng.choice(RANDOM_LINES) for _ in range(rng.randint(0, 14))]
+        indent = rng.choice(["", "    "])
+        assert_same_result(parser, "\n".join(lines[:1] + [indent + line for line in lines[1:]]))
+
+def test_formats_are_split_into_sections(parser):
+    pysnip, google, numpy, plain = (parser._parse_docstring(docstring) for docstring in SAMPLE_DOCSTRINGS[:4])
+
+    assert pysnip["title"] == "Image Resizer"
+    assert "Metadata" in pysnip["sections"]
+    assert pysnip["key_sections"]["Key Features"].startswith("- Keeps aspect ratio")
+
+    assert google["sections"]["Args"].startswith("url (str): Page to fetch")
+
+    assert numpy["sections"]["Parameters"].startswith("values : list of float")
+    assert numpy["sections"]["Notes"] == "The first window - 1 values are dropped."
+
+    assert plain["sections"] == {}
+    assert plain["summary"].startswith('Prints "Hello"')
+
+def test_empty_docstring(parser):
+    assert parser._parse_docstring("") == parser._create_empty_result()
+    assert parser._parse_docstring(None) == parser._create_empty_result()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for uploaded files reaching tool runs
+-------------------------------------------
+Uploads land in the execution workspace, so they must never be importable
+by the tool: Python files are refused, and the workspace is kept off the
+tool's import path.
+"""
+
+import io
+import sys
+
+import pytest
+from werkzeug.exceptions import UnsupportedMediaType
+
+from utils.artifacts import receive_uploads
+from utils.executor import ExecutionManager
+
+BOUNDARY = "pysnipboundary"
+
+def multipart(filename, content):
+    body = (f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+            f"{content}\r\n"
+            f"--{BOUNDARY}--\r\n").encode()
+    return io.BytesIO(body), len(body)
+
+def upload(workspace, filename, content="data", allowed_extensions=None):
+    stream, length = multipart(filename, content)
+    return receive_uploads(stream, "multipart/form-data", length, {"boundary": BOUNDARY},
+                           str(workspace), allowed_extensions=allowed_extensions)
+
+@pytest.mark.parametrize("filename", ["json.py", "json.pyc", "evil.pth", "_json.so", "JSON.PY"])
+def test_importable_uploads_are_refused(tmp_path, filename):
+    with pytest.raises(UnsupportedMediaType):
+        upload(tmp_path, filename, allowed_extensions=None)
+    with pytest.raises(UnsupportedMediaType):
+        upload(tmp_path, filename, allowed_extensions={"py", "pyc", "pth", "so"})
+    assert not any(tmp_path.iterdir())
+
+def test_data_uploads_are_written_to_the_workspace(tmp_path):
+    form, file_params, names = upload(tmp_path, "data.json", '{"a": 1}', allowed_extensions={"json"})
+    assert names == ["data.json"]
+    assert (tmp_path / "data.json").read_text() == '{"a": 1}'
+
+def test_workspace_files_are_not_imported(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "json.py").write_text("print('PWNED')\n")
+    tools = tmp_path / "tools"
+    tools.mkdir()
+    tool = tools / "which_json.py"
+    tool.write_text("import json\nprint(json.__file__)\n")
+
+    executor = ExecutionManager({'SANDBOX_ENABLED': False, 'BYTECODE_CACHE': False, 'PYTHON_PATH': sys.executable})
+    result = executor.execute(str(tool), workspace=str(workspace))
+
+    assert result["success"], result
+    assert "PWNED" not in result["stdout"]
+    assert str(workspace) not in result["stdout"]
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Artifacts module for PySnip Web Interface
+-----------------------------------------
+File inputs and outputs of tool executions. Multipart uploads are streamed
+straight into the execution workspace, and files a tool writes to its
+workspace are moved into an artifact store after the run, keyed by an
+execution id, so they can be downloaded until they expire. The store lives
+on the workspaces' filesystem, so keeping a file is a rename, and expired
+executions are removed by a background thread.
+"""
+
+import os
+import re
+import errno
+import stat
+import time
+import uuid
+import shutil
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from werkzeug.exceptions import UnsupportedMediaType
+from werkzeug.formparser import FormDataParser
+from werkzeug.utils import secure_filename
+
+from utils.workspace import get_workspace_pool
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default artifact settings
+DEFAULT_SETTINGS = {
+    'ARTIFACTS_DIR': None,              # Where artifacts are kept, on the workspaces' filesystem (None = inside the workspace pool)
+    'TTL': 3600,                        # Time (in seconds) artifacts stay downloadable
+    'MAX_FILES': 100,                   # Most files kept from one execution
+    'MAX_TOTAL_SIZE': 100 * 1024 * 1024,  # Most bytes kept from one execution
+    'CLEANUP_INTERVAL': 60,             # Time (in seconds) between background expiry sweeps
+}
+
+# Upload field that only places files in the workspace without setting a parameter
+FILES_FIELD = 'files'
+
+EXECUTION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Files Python could import or load, never accepted as uploads whatever the allowed extensions
+BLOCKED_EXTENSIONS = {'py', 'pyw', 'pyc', 'pyo', 'pyd', 'pth', 'so'}
+
+def receive_uploads(stream, mimetype: str, content_length: Optional[int], options: Dict[str, str],
+                    workspace: str, max_content_length: Optional[int] = None,
+                    max_form_memory_size: Optional[int] = None, allowed_extensions: Optional[Iterable[str]] = None) -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
+    """
+    Parse a multipart request, writing uploaded files directly into a workspace.
+
+    File parts are written to their destination as the request body is read,
+    so uploads are never held in memory. The parser stops with
+    RequestEntityTooLarge once more than max_content_length bytes arrive, and
+    with UnsupportedMediaType on a file with an extension that is not allowed
+    or in BLOCKED_EXTENSIONS.
+
+    Args:
+        stream: Request body stream
+        mimetype (str): Request mimetype (multipart/form-data)
+        content_length (int): Declared request size, if any
+        options (dict): Mimetype options, including the multipart boundary
+        workspace (str): Execution workspace receiving the files
+        max_content_length (int): Largest accepted request body
+        max_form_memory_size (int): Largest accepted size of the non-file fields
+        allowed_extensions (iterable): Accepted file extensions without the dot (None = any)
+
+    Returns:
+        tuple: (form, file_params, input_names) - form fields, parameter -> uploaded
+               file name for every upload field except FILES_FIELD, and the names
+               of all uploaded files in the workspace
+    """
+    allowed = {extension.lower() for extension in allowed_extensions} if allowed_extensions is not None else None
+    taken = set()
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        name = secure_filename(filename or '') or 'upload'
+        stem, ext = os.path.splitext(name)
+        if ext[1:].lower() in BLOCKED_EXTENSIONS or (allowed is not None and ext[1:].lower() not in allowed):
+            raise UnsupportedMediaType(f"File type not allowed: {name}")
+        counter = 1
+        while name in taken:
+            counter += 1
+            name = f"{stem}_{counter}{ext}"
+        taken.add(name)
+        return open(os.path.join(workspace, name), 'w+b')
+
+    parser = FormDataParser(
+        stream_factory=stream_factory,
+        max_form_memory_size=max_form_memory_size,
+        max_content_length=max_content_length,
+        silent=False
+    )
+    _, form, files = parser.parse(stream, mimetype, content_length, options)
+
+    file_params = {}
+    input_names = []
+    for field, storage in files.items(multi=True):
+        storage.stream.close()
+        name = os.path.basename(storage.stream.name)
+        input_names.append(name)
+        if field != FILES_FIELD:
+            file_params[field] = name
+
+    return form.to_dict(), file_params, input_names
+
+class ArtifactStore:
+    """Keeps the output files of tool executions for download"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        # Inside the pool root, which sandboxed tools cannot see
+        workspaces = get_workspace_pool().root
+        self.root = os.path.join(workspaces, "artifacts")
+        configured = self.settings['ARTIFACTS_DIR']
+        if configured:
+            os.makedirs(configured, exist_ok=True)
+            if os.stat(configured).st_dev == os.stat(workspaces).st_dev:
+                self.root = configured
+            else:
+                logger.warning(f"Artifacts directory {configured} is not on the workspace filesystem, using {self.root}")
+        os.makedirs(self.root, exist_ok=True)
+
+        self._thread = threading.Thread(target=self._run, name="pysnip-artifacts", daemon=True)
+        self._thread.start()
+
+    def collect(self, workspace: str, exclude: Optional[Iterable[str]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Move the files a tool left in its workspace into the store.
+        Files are renamed, never copied, so this costs no file I/O.
+
+        Args:
+            workspace (str): Workspace of the finished execution
+            exclude (iterable): Workspace-relative names that are inputs, not outputs
+
+        Returns:
+            tuple: (execution_id, artifacts) - artifacts as dicts with name and size
+        """
+        execution_id = uuid.uuid4().hex
+        target_root = os.path.join(self.root, execution_id)
+        excluded = set(exclude or ())
+        artifacts = []
+        total_size = 0
+
+        for name, path, size in self._regular_files(workspace):
+            if name in excluded:
+                continue
+            if len(artifacts) >= self.settings['MAX_FILES'] or total_size + size > self.settings['MAX_TOTAL_SIZE']:
+                logger.warning(f"Artifact limit reached for execution {execution_id[:8]}, skipping {name}")
+                continue
+
+            target = os.path.join(target_root, name)
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(path, target)
+            except OSError as e:
+                if e.errno == errno.EXDEV:
+                    logger.warning(f"Workspace {workspace} is not on the artifact store's filesystem, not keeping {name}")
+                    break
+                logger.warning(f"Cannot keep artifact {name}: {e}")
+                continue
+
+            artifacts.append({"name": name, "size": size})
+            total_size += size
+
+        return execution_id, artifacts
+
+    def files(self, execution_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        List the artifacts of an execution.
+
+        Returns:
+            list: Artifacts as dicts with name and size, or None if the execution is unknown or expired
+        """
+        execution_dir = self._execution_dir(execution_id)
+        if execution_dir is None:
+            return None
+        return [{"name": name, "size": size} for name, _, size in self._regular_files(execution_dir)]
+
+    def path_for(self, execution_id: str, name: str) -> Optional[str]:
+        """
+        Resolve an artifact to a file on disk.
+
+        Returns:
+            str: Path of the artifact, or None if it does not exist or lies outside its execution
+        """
+        execution_dir = self._execution_dir(execution_id)
+        if execution_dir is None:
+            return None
+
+        path = os.path.realpath(os.path.join(execution_dir, name))
+        if os.path.commonpath([path, execution_dir]) != execution_dir or not os.path.isfile(path):
+            return None
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """Get store counters"""
+        executions = files = size = 0
+        for entry in os.scandir(self.root):
+            if entry.is_dir(follow_symlinks=False):
+                executions += 1
+                for _, _, file_size in self._regular_files(entry.path):
+                    files += 1
+                    size += file_size
+        return {"executions": executions, "files": files, "bytes": size}
+
+    def _execution_dir(self, execution_id):
+        if not EXECUTION_ID_PATTERN.match(execution_id or ''):
+            return None
+        execution_dir = os.path.join(os.path.realpath(self.root), execution_id)
+        try:
+            if time.time() - os.stat(execution_dir).st_mtime > self.settings['TTL']:
+                return None
+        except OSError:
+            return None
+        return execution_dir
+
+    def _regular_files(self, directory):
+        """Regular files below a directory as (relative name, path, size), never following symlinks"""
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield os.path.relpath(path, directory).replace(os.sep, '/'), path, st.st_size
+
+    def _run(self):
+        """Remove expired executions every CLEANUP_INTERVAL"""
+        while True:
+            time.sleep(self.settings['CLEANUP_INTERVAL'])
+            try:
+                self._remove_expired()
+            except Exception as e:
+                logger.warning(f"Error removing expired artifacts: {e}")
+
+    def _remove_expired(self):
+        """Delete the executions older than TTL"""
+        now = time.time()
+        for entry in os.scandir(self.root):
+            try:
+                if entry.is_dir(follow_symlinks=False) and now - entry.stat().st_mtime > self.settings['TTL']:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
+
+# Global store instance
+_store = None
+
+def get_artifact_store(settings=None) -> ArtifactStore:
+    """
+    Get the shared artifact store.
+    Uses a singleton store instance.
+
+    Args:
+        settings (dict): Settings used when the store is first created
+
+    Returns:
+        ArtifactStore: The shared store
+    """
+    global _store
+    if _store is None:
+        _store = ArtifactStore(settings)
+
+    return _store
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async Executor module for PySnip Web Interface
+----------------------------------------------
+Asyncio execution engine for PySnip tools. A single event loop supervises
+every running tool process, so concurrent executions do not each need a
+blocked thread, a communicate() call and a timer.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+from utils.executor import ExecutionManager, READ_CHUNK_SIZE
+from utils.process_control import PROCESS_GROUPS_SUPPORTED
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# How often to check whether a tool exited while descendants keep its pipes open
+EXIT_POLL_INTERVAL = 0.1
+
+class AsyncExecutionManager(ExecutionManager):
+    """Execution manager that runs tools with asyncio subprocesses"""
+
+    async def execute_async(self, tool_path: str, params: Optional[Dict[str, Any]] = None,
+                            timeout: Optional[float] = None, workspace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a PySnip tool with the provided parameters.
+
+        Args:
+            tool_path (str): Path to the PySnip tool
+            params (dict): Parameters to pass to the tool
+            timeout (float): Time limit for this run (None = MAX_EXECUTION_TIME)
+            workspace (str): Pool workspace owned by the caller (None = fresh workspace)
+
+        Returns:
+            dict: Execution results, same schema as ExecutionManager.execute()
+
+        Raises:
+            EnvironmentBuildingException: If the tool's environment is still being built
+        """
+        if not os.path.exists(tool_path):
+            return self._create_error_result(f"Tool not found at: {tool_path}")
+
+        # Reading requirements and scanning imports touches the disk, so keep it off the loop
+        loop = asyncio.get_running_loop()
+        cmd, cmd_display = await loop.run_in_executor(None, self._build_command, tool_path, params)
+        start_time = time.time()
+        timeout = timeout or self.settings['MAX_EXECUTION_TIME']
+
+        # Use the caller's workspace, the configured directory or a fresh workspace
+        pooled = None
+        if workspace:
+            working_dir = workspace
+        elif self.settings['WORKING_DIR']:
+            working_dir = self.settings['WORKING_DIR']
+        else:
+            pooled = working_dir = self.workspaces.acquire()
+
+        try:
+            sandboxed_cmd = self._sandbox_command(cmd, working_dir) if self.settings['SANDBOX_ENABLED'] else None
+            if sandboxed_cmd is not None:
+                cmd = sandboxed_cmd
+
+            logger.info(f"Executing (async): {self._describe_command(cmd)}")
+            result = await self._execute_subprocess(cmd, working_dir, timeout, sandboxed_cmd is not None)
+            return self._build_result(result, cmd_display, start_time, timeout)
+
+        except Exception as e:
+            logger.error(f"Error during execution: {e}", exc_info=True)
+            return self._create_error_result(str(e))
+
+        finally:
+            self.workspaces.release(pooled)
+
+    async def _execute_subprocess(self, cmd, working_dir, timeout, sandboxed=False):
+        """Run a command and stream its output until it exits or times out"""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE if self.settings['CAPTURE_STDERR'] else None,
+            cwd=working_dir,
+            env=self._prepare_environment(working_dir, sandboxed),
+            start_new_session=PROCESS_GROUPS_SUPPORTED
+        )
+        if PROCESS_GROUPS_SUPPORTED:
+            self.workspaces.track(working_dir, process.pid)
+
+        # Complete output goes to the output store as it arrives
+        record = self.outputs.create() if self.outputs is not None else None
+        stdout_buffer = bytearray()
+        stderr_buffer = bytearray()
+        state = {'lock': threading.Lock(), 'closed': False}
+        readers = [asyncio.ensure_future(self._read_stream(
+            process.stdout, stdout_buffer, record.writer('stdout') if record else None, state))]
+        if process.stderr is not None:
+            readers.append(asyncio.ensure_future(self._read_stream(
+                process.stderr, stderr_buffer, record.writer('stderr') if record else None, state)))
+
+        label = os.path.basename(self._command_script(cmd))
+        timeout_occurred = False
+
+        try:
+            await asyncio.wait_for(self._wait_for_exit(process), timeout=timeout)
+        except asyncio.TimeoutError:
+            timeout_occurred = True
+            logger.warning(f"Execution timed out, terminating process group {process.pid}")
+            self._kill_async_process(process, label)
+            await self._wait_for_exit(process)
+
+        # Descendants may still hold the pipes open after the tool itself exited
+        done, pending = await asyncio.wait(readers, timeout=self.settings['REAPER_INTERVAL'])
+        if pending:
+            if PROCESS_GROUPS_SUPPORTED:
+                self.reaper.reap(process.pid, label)
+            await asyncio.wait(pending, timeout=self.settings['KILL_GRACE_PERIOD'] + 1)
+            for reader in pending:
+                reader.cancel()
+
+        if PROCESS_GROUPS_SUPPORTED:
+            self.reaper.watch(process.pid, label)
+
+        # Compressing the last chunks and writing the index stays off the loop too
+        output_id, output_info = (None, None)
+        if record:
+            loop = asyncio.get_running_loop()
+            output_id, output_info = await loop.run_in_executor(None, self._close_output, record, state)
+
+        return {
+            'stdout': stdout_buffer.decode('utf-8', errors='replace'),
+            'stderr': stderr_buffer.decode('utf-8', errors='replace'),
+            'exit_code': -1 if timeout_occurred else process.returncode,
+            'timeout': timeout_occurred,
+            'output_id': output_id,
+            'output_info': output_info
+        }
+
+    async def _wait_for_exit(self, process):
+        """Wait for the tool process itself to exit"""
+        # Process.wait() also waits for the pipes to close, which never happens
+        # while a leaked descendant holds them, so watch the return code as well
+        waiter = asyncio.ensure_future(process.wait())
+        try:
+            while not waiter.done() and process.returncode is None:
+                await asyncio.wait([waiter], timeout=EXIT_POLL_INTERVAL)
+        finally:
+            waiter.cancel()
+        return process.returncode
+
+    async def _read_stream(self, stream, buffer, writer=None, state=None):
+        """Read a pipe to EOF, keeping at most one byte past the output limit in memory"""
+        limit = self.settings['MAX_OUTPUT_SIZE'] + 1
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            if len(buffer) < limit:
+                buffer.extend(chunk[:limit - len(buffer)])
+            if writer is not None:
+                # Chunks are compressed as they fill up, which must not block the loop
+                await loop.run_in_executor(None, self._store_output, writer, chunk, state)
+
+    def _store_output(self, writer, chunk, state):
+        """Append a chunk to an output record that is still open"""
+        with state['lock']:
+            if not state['closed']:
+                writer.write(chunk)
+
+    def _kill_async_process(self, process, label):
+        """Kill a timed-out asyncio process along with its process group"""
+        try:
+            if PROCESS_GROUPS_SUPPORTED:
+                self.reaper.terminate(process.pid, label)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+        except Exception as e:
+            logger.error(f"Error killing process: {e}")
+
+class AsyncExecutionEngine:
+    """Runs an AsyncExecutionManager on a dedicated event loop thread"""
+
+    def __init__(self, settings=None):
+        self.manager = AsyncExecutionManager(settings)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="pysnip-async-executor", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, tool_path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+               workspace: Optional[str] = None):
+        """
+        Schedule an execution on the engine loop.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the execution result
+        """
+        return asyncio.run_coroutine_threadsafe(self.manager.execute_async(tool_path, params, timeout, workspace),
+                                                self.loop)
+
+    def execute(self, tool_path: str, params: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None, workspace: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a tool on the engine loop and wait for the result"""
+        return self.submit(tool_path, params, timeout, workspace).result()
+
+# Global engine instance
+_engine = None
+
+def get_async_engine(settings=None) -> AsyncExecutionEngine:
+    """
+    Get the shared asyncio execution engine.
+    Uses a singleton engine instance.
+
+    Args:
+        settings (dict): Settings used when the engine is first created
+
+    Returns:
+        AsyncExecutionEngine: The shared engine
+    """
+    global _engine
+    if _engine is None:
+        _engine = AsyncExecutionEngine(settings)
+
+    return _engine
+
+async def execute_tool_async(tool_path, params=None, timeout=None):
+    """
+    Execute a PySnip tool from a coroutine running on any event loop.
+
+    Args:
+        tool_path (str): Path to the PySnip tool
+        params (dict): Parameters to pass to the tool
+        timeout (float): Time limit for this run (None = MAX_EXECUTION_TIME)
+
+    Returns:
+        dict: Execution results including stdout, stderr, and execution info
+    """
+    future = get_async_engine().submit(tool_path, params, timeout)
+    return await asyncio.wrap_future(future)
+
+def execute_tool_on_engine(tool_path, params=None, timeout=None, workspace=None):
+    """
+    Execute a PySnip tool on the shared asyncio engine.
+    Blocking counterpart of execute_tool_async() for WSGI request threads.
+
+    Args:
+        tool_path (str): Path to the PySnip tool
+        params (dict): Parameters to pass to the tool
+        timeout (float): Time limit for this run (None = MAX_EXECUTION_TIME)
+        workspace (str): Pool workspace owned by the caller (None = fresh workspace)
+
+    Returns:
+        dict: Execution results including stdout, stderr, and execution info
+    """
+    return get_async_engine().execute(tool_path, params, timeout, workspace)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bytecode module for PySnip Web Interface
+----------------------------------------
+Precompiles tool scripts into a bytecode cache keyed by content hash.
+Python never caches the bytecode of the script it is started with, so main
+scripts are launched through a small bootstrap that executes the cached
+code object. Helper modules are found through PYTHONPYCACHEPREFIX.
+Bytecode of scripts that left the catalog is pruned after each scan.
+"""
+
+import os
+import sys
+import hashlib
+import py_compile
+import importlib.util
+import threading
+import logging
+from typing import Dict, List, Optional, Set
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default bytecode cache settings
+DEFAULT_SETTINGS = {
+    'CACHE_DIR': None,  # Root of the bytecode cache (None = cache/bytecode in the app directory)
+}
+
+# Runs a cached main script as __main__, falling back to the source if the
+# bytecode is missing or was written by a different interpreter version.
+# Invoked as: python -c BOOTSTRAP <pyc> <script> [args...]
+BOOTSTRAP = """\
+def _pysnip_load():
+    import os, sys, marshal, importlib.util
+    pyc, path = sys.argv[1], sys.argv[2]
+    del sys.argv[:2]
+    sys.path[0] = os.path.dirname(os.path.realpath(path))
+    code = None
+    try:
+        with open(pyc, 'rb') as f:
+            data = f.read()
+        if data[:4] == importlib.util.MAGIC_NUMBER:
+            code = marshal.loads(data[16:])
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    if code is None:
+        with open(path, 'rb') as f:
+            code = compile(f.read(), path, 'exec')
+        pyc = None
+    globals().update(__file__=path, __cached__=pyc)
+    del globals()['_pysnip_load']
+    return code
+exec(_pysnip_load())
+"""
+
+class BytecodeCache:
+    """Content-addressed bytecode cache for tool scripts"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.root = self.settings['CACHE_DIR'] or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "cache",
+            "bytecode"
+        )
+        self.scripts_dir = os.path.join(self.root, "scripts")
+        self.prefix = os.path.join(self.root, "modules")
+        os.makedirs(self.scripts_dir, exist_ok=True)
+        os.makedirs(self.prefix, exist_ok=True)
+
+        self._hashes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def content_hash(self, path: str) -> str:
+        """
+        Hash the content of a file, memoized by its size and modification time.
+
+        Args:
+            path (str): Path of the file
+
+        Returns:
+            str: SHA-256 hex digest of the file content
+        """
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            self._hashes[path] = (signature, digest)
+        return digest
+
+    def script_pyc(self, path: str, content_hash: Optional[str] = None) -> str:
+        """Location of the cached bytecode of a main script"""
+        content_hash = content_hash or self.content_hash(path)
+        tag = sys.implementation.cache_tag
+        return os.path.join(self.scripts_dir, f"{content_hash}.{tag}.pyc")
+
+    def module_pyc(self, path: str) -> str:
+        """Location of a helper module's bytecode under the PYTHONPYCACHEPREFIX tree"""
+        head, name = os.path.split(os.path.realpath(path))
+        base = os.path.splitext(name)[0]
+        tag = sys.implementation.cache_tag
+        return os.path.join(self.prefix, head.lstrip(os.sep), f"{base}.{tag}.pyc")
+
+    def compile_tool(self, tool_dir: str, main_script: str, scripts: List[str]) -> int:
+        """
+        Precompile the main script and helper modules of a tool.
+
+        Args:
+            tool_dir (str): Directory of the tool
+            main_script (str): File name of the main script
+            scripts (list): File names of all Python files in the tool directory
+
+        Returns:
+            int: Number of files compiled (up-to-date files are skipped)
+        """
+        compiled = 0
+        for script in scripts:
+            path = os.path.join(tool_dir, script)
+            try:
+                if script == main_script:
+                    pyc = self.script_pyc(path)
+                    if os.path.exists(pyc):
+                        continue
+                    # The file name already carries the content hash
+                    mode = py_compile.PycInvalidationMode.UNCHECKED_HASH
+                else:
+                    pyc = self.module_pyc(path)
+                    if self._module_is_fresh(path, pyc):
+                        continue
+                    mode = py_compile.PycInvalidationMode.CHECKED_HASH
+
+                py_compile.compile(path, cfile=pyc, dfile=path, doraise=True, invalidation_mode=mode)
+                compiled += 1
+            except py_compile.PyCompileError as e:
+                logger.debug(f"Not precompiling {path}: {e.msg}")
+            except OSError as e:
+                logger.warning(f"Error precompiling {path}: {e}")
+
+        return compiled
+
+    def prune(self, scripts: Set[str], source_root: str) -> int:
+        """
+        Delete bytecode the catalog no longer needs: main scripts that changed
+        or left the catalog, and helper modules whose source was removed.
+
+        Args:
+            scripts (set): Paths of the main script bytecode to keep (from script_pyc)
+            source_root (str): Root directory of the catalog
+
+        Returns:
+            int: Number of files deleted
+        """
+        stale = []
+        with os.scandir(self.scripts_dir) as entries:
+            stale += [entry.path for entry in entries if entry.name.endswith('.pyc') and entry.path not in scripts]
+
+        # Only the catalog's part of the prefix tree, which also holds bytecode of other code
+        modules_root = os.path.join(self.prefix, os.path.realpath(source_root).lstrip(os.sep))
+        for dirpath, _, filenames in os.walk(modules_root):
+            source_dir = os.sep + os.path.relpath(dirpath, self.prefix)
+            for name in filenames:
+                if name.endswith('.pyc') and not os.path.exists(os.path.join(source_dir, name.split('.')[0] + '.py')):
+                    stale.append(os.path.join(dirpath, name))
+
+        removed = 0
+        for path in stale:
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Error removing stale bytecode {path}: {e}")
+        return removed
+
+    def launch_args(self, tool_path: str) -> List[str]:
+        """
+        Interpreter arguments that run a tool, from bytecode when it is cached.
+
+        Args:
+            tool_path (str): Path of the main script
+
+        Returns:
+            list: Arguments to follow the interpreter on the command line
+        """
+        try:
+            pyc = self.script_pyc(tool_path)
+            if os.path.exists(pyc):
+                with self._lock:
+                    self.hits += 1
+                return ['-c', BOOTSTRAP, pyc, tool_path]
+        except OSError:
+            pass
+
+        with self._lock:
+            self.misses += 1
+        return [tool_path]
+
+    def stats(self) -> Dict[str, int]:
+        """Get launch counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _module_is_fresh(self, path, pyc):
+        """Check whether a checked-hash pyc matches the current source"""
+        try:
+            with open(pyc, 'rb') as f:
+                header = f.read(16)
+            with open(path, 'rb') as f:
+                source_hash = importlib.util.source_hash(f.read())
+        except OSError:
+            return False
+        return (header[:4] == importlib.util.MAGIC_NUMBER
+                and int.from_bytes(header[4:8], 'little') == 0b11  # hash-based, checked
+                and header[8:16] == source_hash)
+
+def is_bootstrap_command(cmd: List[str]) -> bool:
+    """Check whether a command line launches a script through BOOTSTRAP"""
+    return len(cmd) > 4 and cmd[1] == '-c' and cmd[2] == BOOTSTRAP
+
+# Global cache instance
+_cache = None
+
+def get_bytecode_cache(settings=None) -> BytecodeCache:
+    """
+    Get the shared bytecode cache.
+    Uses a singleton cache instance.
+
+    Args:
+        settings (dict): Settings used when the cache is first created
+
+    Returns:
+        BytecodeCache: The shared cache
+    """
+    global _cache
+    if _cache is None:
+        _cache = BytecodeCache(settings)
+
+    return _cache
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catalog Index module for PySnip Web Interface
+---------------------------------------------
+Sorted indexes over the tools of one catalog generation, built once per
+scan for every combination of the category, complete and guide filters,
+so the catalog API filters, sorts and pages through large collections
+without sorting or walking the whole catalog per request.
+Pages use keyset cursors (sort key and path of the last tool returned),
+which stay valid across rescans.
+"""
+
+import json
+import base64
+import hashlib
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default catalog index settings
+DEFAULT_SETTINGS = {
+    'DEFAULT_PAGE_SIZE': 50,    # Tools per page when no limit is given
+    'MAX_PAGE_SIZE': 500,       # Maximum number of tools returned by one query
+}
+
+# Sort orders of the tool listing and the key each one sorts by
+SORT_KEYS = {
+    'name': lambda tool: tool.get('name', '').lower(),
+    'category': lambda tool: tool.get('category', ''),
+    'size': lambda tool: tool.get('file_size') or 0,
+    'mod_date': lambda tool: tool.get('timestamp') or 0,
+    'complete': lambda tool: int(bool(tool.get('complete'))),
+}
+SORT_ORDERS = ('asc', 'desc')
+
+def _encode_cursor(sort, order, key, path):
+    raw = json.dumps([sort, order, key, path], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, order, key, path = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return sort, order, key, path
+
+class CatalogIndex:
+    """Tools of one catalog generation with a sorted index per filter combination and sort order"""
+
+    def __init__(self, catalog: Dict[str, Any], settings=None):
+        """Build the indexes of a catalog with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.catalog = catalog
+        self.tools = [tool for category in catalog.get('categories', []) for tool in category.get('tools', [])]
+        self.fields = sorted({field for tool in self.tools for field in tool})
+
+        # The generation only changes when a tool does, so ETags survive no-op rescans
+        identity = json.dumps(
+            [(tool.get('relative_path'), tool.get('hash'), tool.get('guide_hash'), tool.get('timestamp'))
+             for tool in self.tools] + [catalog.get('name'), catalog.get('description')],
+            default=str
+        )
+        self.generation = hashlib.md5(identity.encode('utf-8')).hexdigest()
+
+        # (category, complete, guide) with None = any -> sort -> [(key, path, position)] in ascending order
+        self._indexes: Dict[tuple, Dict[str, List[tuple]]] = {}
+        groups: Dict[Optional[str], List[int]] = {None: list(range(len(self.tools)))}
+        for position, tool in enumerate(self.tools):
+            groups.setdefault(tool.get('category'), []).append(position)
+        self._categories = {category for category in groups if category is not None}
+        flags = [(bool(tool.get('complete')), bool(tool.get('guide'))) for tool in self.tools]
+
+        for category, positions in groups.items():
+            for sort, key in SORT_KEYS.items():
+                entries = sorted((key(self.tools[p]), self.tools[p].get('relative_path', ''), p) for p in positions)
+                self._indexes.setdefault((category, None, None), {})[sort] = entries
+
+                # Filtered indexes share the entries of the unfiltered one, in the same order
+                filtered: Dict[tuple, List[tuple]] = {}
+                for entry in entries:
+                    complete, guide = flags[entry[2]]
+                    for combination in ((complete, guide), (complete, None), (None, guide)):
+                        filtered.setdefault(combination, []).append(entry)
+                for combination in ((True, True), (True, False), (False, True), (False, False),
+                                    (True, None), (False, None), (None, True), (None, False)):
+                    self._indexes.setdefault((category,) + combination, {})[sort] = filtered.get(combination, [])
+
+    def categories(self) -> List[Dict[str, Any]]:
+        """Summary of every category, without its tools"""
+        return [
+            {
+                "name": category.get("name"),
+                "display_name": category.get("display_name"),
+                "description": category.get("description"),
+                "tools_count": len(category.get("tools", []))
+            }
+            for category in self.catalog.get('categories', [])
+        ]
+
+    def has_category(self, name: str) -> bool:
+        """Whether the catalog has a category of that name"""
+        return name in self._categories
+
+    def query(self, category: Optional[str] = None, complete: Optional[bool] = None,
+              guide: Optional[bool] = None, search: Optional[str] = None,
+              sort: str = 'name', order: str = 'asc', cursor: Optional[str] = None,
+              limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Query tools in a sort order with keyset pagination.
+
+        Args:
+            category (str): Only tools of this category
+            complete (bool): Only complete (True) or incomplete (False) tools
+            guide (bool): Only tools with (True) or without (False) a guide
+            search (str): Only tools whose name or directory contains this text
+            sort (str): One of SORT_KEYS
+            order (str): 'asc' or 'desc'
+            cursor (str): Continue after the last tool of a previous page
+            limit (int): Page size
+            fields (list): Tool fields to return (None = all)
+
+        Returns:
+            dict: Items, the cursor of the next page (None on the last page) and the generation
+
+        Raises:
+            ValueError: If a sort order, field or cursor is invalid
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+        if order not in SORT_ORDERS:
+            raise ValueError(f"order must be one of: {', '.join(SORT_ORDERS)}")
+        unknown = [field for field in fields or [] if field not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        limit = max(1, min(int(limit or self.settings['DEFAULT_PAGE_SIZE']), self.settings['MAX_PAGE_SIZE']))
+
+        entries = self._indexes.get((category, complete, guide), {}).get(sort, [])
+        if cursor:
+            cursor_sort, cursor_order, key, path = _decode_cursor(cursor)
+            if (cursor_sort, cursor_order) != (sort, order):
+                raise ValueError("Cursor belongs to a different sort order")
+            try:
+                if order == 'asc':
+                    positions = range(bisect_right(entries, (key, path, len(self.tools))), len(entries))
+                else:
+                    positions = range(bisect_left(entries, (key, path)) - 1, -1, -1)
+            except TypeError:
+                raise ValueError("Invalid cursor")
+        else:
+            positions = range(len(entries)) if order == 'asc' else range(len(entries) - 1, -1, -1)
+
+        # Only the text search is not indexed
+        search = search.lower() if search else None
+        matches = []
+        for index in positions:
+            tool = self.tools[entries[index][2]]
+            if search and search not in tool.get('name', '').lower() and search not in tool.get('directory', '').lower():
+                continue
+            matches.append(index)
+            if len(matches) > limit:
+                break
+
+        next_cursor = None
+        if len(matches) > limit:
+            key, path, _ = entries[matches[limit - 1]]
+            next_cursor = _encode_cursor(sort, order, key, path)
+
+        items = []
+        for index in matches[:limit]:
+            tool = self.tools[entries[index][2]]
+            items.append({field: tool.get(field) for field in fields} if fields else dict(tool))
+
+        return {"items": items, "next_cursor": next_cursor, "generation": self.generation}
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dispatcher module for PySnip Web Interface
+------------------------------------------
+Hands tool executions to remote worker processes (see worker.py).
+Workers register over HTTP, long-poll for jobs and post results back.
+Jobs go to the least loaded waiting worker, and jobs held by a worker
+that stops sending heartbeats are requeued.
+"""
+
+import time
+import uuid
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default dispatcher settings
+DEFAULT_SETTINGS = {
+    'HEARTBEAT_INTERVAL': 5,    # How often workers report in (in seconds)
+    'HEARTBEAT_TIMEOUT': 15,    # Silence after which a worker is considered lost (in seconds)
+    'POLL_TIMEOUT': 20,         # Longest a poll request is held open (in seconds)
+    'ASSIGN_TIMEOUT': 60,       # Longest a job waits for a worker (in seconds)
+    'LEASE_MARGIN': 30,         # Time past its own timeout a running job may take before it is requeued
+    'MAX_ATTEMPTS': 3,          # Dispatch attempts per job before giving up
+    'DEFAULT_TIMEOUT': 60,      # Job timeout when none is given (in seconds)
+}
+
+class NoWorkersException(Exception):
+    """Exception raised when no worker picks up a job in time."""
+    pass
+
+def worker_error_result(error_message: str) -> Dict[str, Any]:
+    """Error result in the same schema as ExecutionManager results"""
+    return {
+        "success": False,
+        "return_code": 1,
+        "cmd": "",
+        "stdout": "",
+        "stderr": f"ERROR: {error_message}",
+        "execution_time": 0,
+        "timeout": False,
+        "error": error_message,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+class _Job:
+    """A tool execution waiting for or running on a worker"""
+
+    def __init__(self, tool_path, tool_hash, params, timeout):
+        self.id = uuid.uuid4().hex
+        self.tool_path = tool_path
+        self.tool_hash = tool_hash
+        self.params = params or {}
+        self.timeout = timeout
+        self.attempts = 0
+        self.enqueued = time.time()
+        self.worker_id = None
+        self.lease_deadline = None
+        self.result = None
+        self.event = threading.Event()
+
+    def to_message(self):
+        return {
+            "job_id": self.id,
+            "tool_path": self.tool_path,
+            "tool_hash": self.tool_hash,
+            "params": self.params,
+            "timeout": self.timeout,
+            "attempt": self.attempts
+        }
+
+class _Worker:
+    """Dispatcher-side state of a registered worker"""
+
+    def __init__(self, name, capacity, info):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.info = info or {}
+        self.registered = time.time()
+        self.last_seen = self.registered
+        self.load = 0.0
+        self.jobs = set()
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def utilization(self):
+        return len(self.jobs) / self.capacity
+
+class WorkerDispatcher:
+    """Job queue shared between the web app and remote workers"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self._workers: Dict[str, _Worker] = {}
+        self._jobs: Dict[str, _Job] = {}
+        self._queue = deque()
+        self._offers: Dict[str, deque] = {}
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._monitor, name="pysnip-dispatcher", daemon=True)
+        self._thread.start()
+
+    def run(self, tool_path: str, tool_hash: Optional[str] = None,
+            params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute a tool on a worker and wait for its result.
+
+        Args:
+            tool_path (str): Path of the tool relative to the PySnip root
+            tool_hash (str): Catalog hash of the tool, checked by the worker
+            params (dict): Parameters to pass to the tool
+            timeout (float): Time limit for the run (None = DEFAULT_TIMEOUT)
+
+        Returns:
+            dict: Execution results, same schema as ExecutionManager.execute()
+        """
+        job = _Job(tool_path, tool_hash, params, timeout or self.settings['DEFAULT_TIMEOUT'])
+        with self._cond:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._assign()
+
+        job.event.wait()
+        with self._cond:
+            self._jobs.pop(job.id, None)
+        if isinstance(job.result, Exception):
+            raise job.result
+        return job.result
+
+    def register(self, name: str, capacity: int = 1, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Register a worker.
+
+        Args:
+            name (str): Human-readable worker name
+            capacity (int): Jobs the worker runs at once
+            info (dict): Extra details shown in stats (host, pid, ...)
+
+        Returns:
+            dict: Worker id and the protocol timings the worker must follow
+        """
+        worker = _Worker(name, capacity, info)
+        with self._cond:
+            self._workers[worker.id] = worker
+            self._offers[worker.id] = deque()
+        logger.info(f"Worker {name} ({worker.id[:8]}) registered with capacity {worker.capacity}")
+        return {
+            "worker_id": worker.id,
+            "heartbeat_interval": self.settings['HEARTBEAT_INTERVAL'],
+            "poll_timeout": self.settings['POLL_TIMEOUT']
+        }
+
+    def heartbeat(self, worker_id: str, load: Optional[float] = None) -> bool:
+        """
+        Record that a worker is alive.
+
+        Returns:
+            bool: False if the worker is unknown and must register again
+        """
+        with self._cond:
+            worker = self._workers.get(worker_id)
+            if worker is None:
+                return False
+            worker.last_seen = time.time()
+            if load is not None:
+                worker.load = float(load)
+            return True
+
+    def poll(self, worker_id: str, wait: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a job for a worker.
+
+        Args:
+            worker_id (str): Worker asking for work
+            wait (float): Longest time to wait (capped at POLL_TIMEOUT)
+
+        Returns:
+            dict: The job, or None if nothing was assigned in time
+
+        Raises:
+            KeyError: If the worker is unknown and must register again
+        """
+        wait = min(wait if wait is not None else self.settings['POLL_TIMEOUT'], self.settings['POLL_TIMEOUT'])
+        deadline = time.time() + wait
+
+        with self._cond:
+            worker = self._worker(worker_id)
+            worker.waiting += 1
+            try:
+                self._assign()
+                while True:
+                    offers = self._offers.get(worker_id)
+                    if offers is None:
+                        raise KeyError(worker_id)  # Dropped while waiting
+                    if offers:
+                        return offers.popleft().to_message()
+
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+                    worker.last_seen = time.time()
+            finally:
+                worker.waiting -= 1
+
+    def complete(self, worker_id: str, job_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Accept the result of a job.
+
+        Returns:
+            bool: False if the job is no longer assigned to this worker
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            worker = self._workers.get(worker_id)
+            if worker is not None:
+                worker.last_seen = time.time()
+                worker.jobs.discard(job_id)
+            if job is None or job.worker_id != worker_id or job.event.is_set():
+                return False
+
+            if worker is not None:
+                if result.get('success'):
+                    worker.completed += 1
+                else:
+                    worker.failed += 1
+            result['worker'] = worker.name if worker is not None else worker_id
+            job.result = result
+            job.event.set()
+            self._assign()
+            return True
+
+    def has_workers(self) -> bool:
+        """Check whether any worker is registered"""
+        with self._cond:
+            return bool(self._workers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get a snapshot of workers and queued jobs"""
+        now = time.time()
+        with self._cond:
+            workers: List[Dict[str, Any]] = [{
+                "id": worker.id,
+                "name": worker.name,
+                "capacity": worker.capacity,
+                "running": len(worker.jobs),
+                "load": worker.load,
+                "completed": worker.completed,
+                "failed": worker.failed,
+                "last_seen": now - worker.last_seen,
+                "info": worker.info
+            } for worker in self._workers.values()]
+            return {"workers": workers, "queued": len(self._queue), "jobs": len(self._jobs)}
+
+    def _worker(self, worker_id):
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            raise KeyError(worker_id)
+        worker.last_seen = time.time()
+        return worker
+
+    def _assign(self):
+        """Offer queued jobs to the least loaded waiting workers (caller must hold the lock)"""
+        assigned = False
+        while self._queue:
+            candidates = [
+                worker for worker in self._workers.values()
+                if worker.waiting > len(self._offers[worker.id]) and len(worker.jobs) < worker.capacity
+            ]
+            if not candidates:
+                break
+
+            worker = min(candidates, key=lambda w: (w.utilization(), w.load))
+            job = self._queue.popleft()
+            job.attempts += 1
+            job.worker_id = worker.id
+            job.lease_deadline = time.time() + job.timeout + self.settings['LEASE_MARGIN']
+            worker.jobs.add(job.id)
+            self._offers[worker.id].append(job)
+            assigned = True
+
+        if assigned:
+            self._cond.notify_all()
+
+    def _requeue(self, job, reason):
+        """Put a job back at the front of the queue, or fail it (caller must hold the lock)"""
+        job.worker_id = None
+        job.lease_deadline = None
+        if job.attempts >= self.settings['MAX_ATTEMPTS']:
+            logger.error(f"Giving up on job {job.id[:8]} ({job.tool_path}) after {job.attempts} attempts: {reason}")
+            job.result = worker_error_result(f"Execution failed on {job.attempts} workers: {reason}")
+            job.event.set()
+        else:
+            logger.warning(f"Requeueing job {job.id[:8]} ({job.tool_path}): {reason}")
+            job.enqueued = time.time()
+            self._queue.appendleft(job)
+
+    def _drop_worker(self, worker, reason):
+        """Forget a worker and requeue its jobs (caller must hold the lock)"""
+        logger.warning(f"Worker {worker.name} ({worker.id[:8]}) lost: {reason}")
+        del self._workers[worker.id]
+        self._offers.pop(worker.id, None)
+        for job_id in list(worker.jobs):
+            job = self._jobs.get(job_id)
+            if job is not None and not job.event.is_set():
+                self._requeue(job, f"worker {worker.name} lost")
+        self._cond.notify_all()
+
+    def _monitor(self):
+        """Drop silent workers, requeue expired leases and fail unassigned jobs"""
+        while True:
+            time.sleep(1)
+            now = time.time()
+            with self._cond:
+                for worker in list(self._workers.values()):
+                    if now - worker.last_seen > self.settings['HEARTBEAT_TIMEOUT']:
+                        self._drop_worker(worker, "heartbeat timeout")
+
+                for job in list(self._jobs.values()):
+                    if job.event.is_set() or job.lease_deadline is None or now <= job.lease_deadline:
+                        continue
+                    worker = self._workers.get(job.worker_id)
+                    if worker is not None:
+                        worker.jobs.discard(job.id)
+                        offers = self._offers.get(worker.id)
+                        if offers and job in offers:
+                            offers.remove(job)
+                    self._requeue(job, "lease expired")
+
+                expired = [job for job in self._queue if now - job.enqueued > self.settings['ASSIGN_TIMEOUT']]
+                for job in expired:
+                    self._queue.remove(job)
+                    job.result = NoWorkersException(
+                        f"No worker picked up the job within {self.settings['ASSIGN_TIMEOUT']} seconds"
+                    )
+                    job.event.set()
+
+                self._assign()
+
+# Global dispatcher instance
+_dispatcher = None
+
+def get_dispatcher(settings=None) -> WorkerDispatcher:
+    """
+    Get the shared worker dispatcher.
+    Uses a singleton dispatcher instance.
+
+    Args:
+        settings (dict): Settings used when the dispatcher is first created
+
+    Returns:
+        WorkerDispatcher: The shared dispatcher
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = WorkerDispatcher(settings)
+
+    return _dispatcher
@@ -10,14 +10,480 @@ usage examples, and parameter information.
 import os
 import re
 import ast
+import io
+import copy
+import hashlib
+import tokenize
 import inspect
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Union, Any
 import json
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Default extraction engine settings
+DEFAULT_SETTINGS = {
+    'MAX_ENTRIES': 2048,        # Most file versions kept in the parse cache
+    'STORE_DB': None,           # SQLite parse store kept across restarts (None = memory only)
+    'STORE_MAX_ROWS': 10000,    # Most entries kept in the parse store
+}
+
+# Bump whenever parse results change shape or content, so stored results are discarded
+PARSER_VERSION = 2
+
+# Documentation detail levels: the docstring alone, or with examples and parameters
+DETAIL_SUMMARY = 'summary'
+DETAIL_FULL = 'full'
+DETAIL_LEVELS = (DETAIL_SUMMARY, DETAIL_FULL)
+
+def _literal(node):
+    """Value of a literal keyword argument as the parameter schema stores it"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.List):
+        return [elt.value for elt in node.elts if isinstance(elt, ast.Constant)]
+    return None
+
+def _parameter_info(name, kwargs):
+    """Parameter dictionary of an add_argument() call"""
+    return {
+        "name": name,
+        "clean_name": name.lstrip('-'),
+        "help": kwargs.get('help', ''),
+        "type": kwargs.get('type', 'str'),
+        "default": kwargs.get('default'),
+        "choices": kwargs.get('choices', []),
+        "required": kwargs.get('required', False)
+    }
+
+class ToolVisitor(ast.NodeVisitor):
+    """
+    Collects the docstring and the argparse parameters of a tool in one traversal.
+
+    The docstring is the module docstring, or else the docstring of the first
+    top-level class or function that has one. Parameters come from every
+    add_argument() call with a literal first argument, in source order.
+    """
+    
+    def __init__(self):
+        self.docstring = None
+        self.parameters = []
+    
+    def visit_Module(self, node):
+        self.docstring = ast.get_docstring(node)
+        if not self.docstring:
+            for child in node.body:
+                if isinstance(child, (ast.ClassDef, ast.FunctionDef)):
+                    self.docstring = ast.get_docstring(child)
+                    if self.docstring:
+                        break
+        self.generic_visit(node)
+    
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute) and node.func.attr == 'add_argument' and node.args:
+            arg_node = node.args[0]
+            if isinstance(arg_node, ast.Constant) and isinstance(arg_node.value, str):
+                kwargs = {}
+                for keyword in node.keywords:
+                    if isinstance(keyword.value, (ast.Constant, ast.Name, ast.List)):
+                        kwargs[keyword.arg] = _literal(keyword.value)
+                
+                self.parameters.append(_parameter_info(arg_node.value, kwargs))
+        self.generic_visit(node)
+
+def read_header_docstring(content):
+    """
+    Read the module docstring from the first tokens of a file.
+    Tokenizing stops right after the docstring statement, so the cost does not
+    grow with the size of the file.
+    
+    Args:
+        content (str): Source code of the tool
+        
+    Returns:
+        str: The cleaned docstring, as ast.get_docstring() would return it, or
+             None if the file does not start with one (or it cannot be told
+             without parsing the whole file)
+    """
+    strings = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            if token.type in (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING):
+                continue
+            if token.type == tokenize.STRING:
+                strings.append(token.string)
+                continue
+            if strings and (token.type in (tokenize.NEWLINE, tokenize.ENDMARKER)
+                            or (token.type == tokenize.OP and token.string == ';')):
+                break
+            return None
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    
+    try:
+        value = ast.literal_eval(' '.join(strings))
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(value, str):
+        return None
+    return inspect.cleandoc(value)
+
+# Section headers of each docstring format, matched against stripped lines
+PYSNIP_HEADER = re.compile(r'(?:✒ )?[A-Za-z ]+:')     # fullmatch: "Description:", "✒ Key Features:"
+GOOGLE_HEADER = re.compile(r'[A-Za-z]+:')             # match: "Args:", "Note: ..."
+NUMPY_TITLE = re.compile(r'[A-Za-z]+ *')              # fullmatch on the unstripped line above an underline
+NUMPY_UNDERLINE = re.compile(r'-+')                   # fullmatch: "----------"
+
+def _key_sections(description, sections, features, usage, arguments, notes):
+    """Map format-specific section names onto the sections the UI shows"""
+    return {
+        "Description": description,
+        "Key Features": sections.get(features, ""),
+        "Usage Instructions": usage,
+        "Examples": sections.get("Examples", ""),
+        "Command-Line Arguments": arguments,
+        "Other Important Information": notes
+    }
+
+def _collect_sections(headers, names, lines, first_content_offset):
+    """
+    Join the lines between consecutive headers into sections.
+    A section is stored when another header follows it, or when it is the
+    last one and has at least one line after its header.
+    """
+    sections = {}
+    for k, index in enumerate(headers):
+        name = names[k]
+        start = index + first_content_offset
+        end = headers[k + 1] if k + 1 < len(headers) else len(lines)
+        if name and (k + 1 < len(headers) or start < end):
+            sections[name] = '\n'.join(lines[start:end]).strip()
+    return sections
+
+def parse_docstring_sections(docstring):
+    """
+    Split a cleaned docstring into title, summary and sections.
+    
+    One scan over the lines detects the format (PySnip, Google, NumPy or
+    plain) and records the header candidates of each format, so only the
+    detected format's headers are joined into sections afterwards. Output is
+    identical to the per-format DocstringParser._parse_*_format() parsers.
+    
+    Args:
+        docstring (str): Docstring after inspect.cleandoc()
+        
+    Returns:
+        dict: raw, title, summary, sections and key_sections
+    """
+    lines = docstring.split('\n')
+    title = lines[0].strip()
+    
+    is_pysnip = "✒ Metadata" in docstring or "✒ Description" in docstring
+    if not is_pysnip and 'Args:' not in docstring and 'Parameters' not in docstring:
+        # None of the structured formats can match, so there are no sections to look for
+        summary = docstring.partition('\n')[2].strip()
+        return {
+            "raw": docstring,
+            "title": title,
+            "summary": summary,
+            "sections": {},
+            "key_sections": _key_sections(summary, {}, "Features", "", "", "")
+        }
+    
+    count = len(lines)
+    stripped = [line.strip() for line in lines]
+    is_google = is_numpy = False
+    numpy_pending = False       # Saw a "Parameters" line, waiting for the next non-blank line
+    first_blank = count         # End of the PySnip summary paragraph
+    google_headers = []
+    pysnip_headers = []
+    underlines = []
+    
+    for index in range(1, count):
+        line = stripped[index]
+        if not line:
+            if first_blank == count:
+                first_blank = index
+            continue
+        
+        if numpy_pending:
+            is_numpy = is_numpy or line[0] == '-'
+            numpy_pending = False
+        if line[0] == '-':
+            if NUMPY_UNDERLINE.fullmatch(line):
+                underlines.append(index)
+            continue
+        if line == 'Parameters' and lines[index].lstrip() == 'Parameters':
+            numpy_pending = True
+        
+        if ':' in line:
+            if GOOGLE_HEADER.match(line):
+                google_headers.append(index)
+                is_google = is_google or line.startswith('Args:')
+            if line[-1] == ':' and PYSNIP_HEADER.fullmatch(line):
+                pysnip_headers.append(index)
+    
+    if is_pysnip:
+        # Summary is the paragraph after the title; sections keep their indentation
+        summary = ' '.join(stripped[1:first_blank]).strip()
+        headers = [index for index in pysnip_headers if index >= first_blank]
+        names = [stripped[index].rstrip(':').replace('✒ ', '') for index in headers]
+        sections = _collect_sections(headers, names, lines, 1)
+        key_sections = {name: sections.get(name, "") for name in (
+            "Description", "Key Features", "Usage Instructions", "Examples",
+            "Command-Line Arguments", "Other Important Information")}
+    
+    elif is_google:
+        first = google_headers[0] if google_headers else count
+        summary = ' '.join(line for line in stripped[1:first] if line).strip()
+        names = [stripped[index].rstrip(':') for index in google_headers]
+        sections = _collect_sections(google_headers, names, stripped, 1)
+        key_sections = _key_sections(
+            summary, sections, "Features",
+            sections.get("Usage", "") or sections.get("Examples", ""),
+            sections.get("Args", "") or sections.get("Arguments", ""),
+            sections.get("Notes", "") or sections.get("Note", ""))
+    
+    elif is_numpy:
+        # The summary ends at a title line directly followed by a line starting with a dash
+        first = next((index for index in range(1, count - 1)
+                      if lines[index + 1].startswith('-') and NUMPY_TITLE.fullmatch(lines[index])), count)
+        summary = ' '.join(line for line in stripped[1:first] if line).strip()
+        
+        # A header is any line above an underline, unless it is itself the previous header's underline
+        headers = []
+        for underline in underlines:
+            index = underline - 1
+            if index >= first and not (headers and index == headers[-1] + 1):
+                headers.append(index)
+        names = [stripped[index] for index in headers]
+        sections = _collect_sections(headers, names, stripped, 2)
+        key_sections = _key_sections(
+            summary, sections, "Features",
+            sections.get("Usage", "") or sections.get("Examples", ""),
+            sections.get("Parameters", ""),
+            sections.get("Notes", "") or sections.get("Note", ""))
+    
+    else:
+        summary = docstring.partition('\n')[2].strip()
+        sections = {}
+        key_sections = _key_sections(summary, sections, "Features", "", "", "")
+    
+    return {
+        "raw": docstring,
+        "title": title,
+        "summary": summary,
+        "sections": sections,
+        "key_sections": key_sections
+    }
+
+def summary_of(doc_info):
+    """Summary detail level of full documentation: everything but examples and parameters"""
+    return {key: value for key, value in doc_info.items() if key not in ('examples', 'parameters')}
+
+# Token-level stand-ins for the AST node kinds ToolVisitor accepts as argument values
+_CONSTANT_NAMES = {'True': True, 'False': False, 'None': None}
+_OPENING = {'(': ')', '[': ']', '{': '}'}
+# Keywords that cannot appear inside a call; seeing one means a call was never closed
+_STATEMENT_KEYWORDS = {'def', 'class', 'import', 'return', 'with', 'try', 'except', 'while', 'elif'}
+
+class _NotLiteral(Exception):
+    """Raised when argument tokens are not a value ToolVisitor would record"""
+    pass
+
+def _encloses(tokens, opening):
+    """Check whether the tokens are one bracketed group opened by the given bracket"""
+    if len(tokens) < 2 or tokens[0].type != tokenize.OP or tokens[0].string != opening \
+            or tokens[-1].type != tokenize.OP or tokens[-1].string != _OPENING[opening]:
+        return False
+    depth = 0
+    for token in tokens[:-1]:
+        if token.type == tokenize.OP and token.string in _OPENING:
+            depth += 1
+        elif token.type == tokenize.OP and token.string in (')', ']', '}'):
+            depth -= 1
+        if depth == 0:
+            return False  # The first bracket closes before the end
+    return True
+
+def _unwrap(tokens):
+    """Strip the parentheses around an expression, which the AST does not keep"""
+    while _encloses(tokens, '('):
+        tokens = tokens[1:-1]
+    return tokens
+
+def _constant_value(tokens):
+    """Value of a constant (string, number, True/False/None), as ast.Constant would hold it"""
+    tokens = _unwrap(tokens)
+    if tokens and all(token.type == tokenize.STRING for token in tokens):
+        try:
+            return ast.literal_eval(' '.join(token.string for token in tokens))
+        except (ValueError, SyntaxError):
+            raise _NotLiteral()
+    if len(tokens) == 1:
+        token = tokens[0]
+        if token.type == tokenize.NUMBER:
+            try:
+                return ast.literal_eval(token.string)
+            except (ValueError, SyntaxError):
+                raise _NotLiteral()
+        if token.type == tokenize.NAME and token.string in _CONSTANT_NAMES:
+            return _CONSTANT_NAMES[token.string]
+    raise _NotLiteral()
+
+def _split_arguments(tokens):
+    """Split the tokens between a pair of brackets at their top-level commas"""
+    parts = [[]]
+    depth = 0
+    for token in tokens:
+        if token.type == tokenize.OP and token.string in _OPENING:
+            depth += 1
+        elif token.type == tokenize.OP and token.string in (')', ']', '}'):
+            depth -= 1
+        elif depth == 0 and token.type == tokenize.OP and token.string == ',':
+            parts.append([])
+            continue
+        parts[-1].append(token)
+    if not parts[-1]:
+        parts.pop()  # Trailing comma
+    return parts
+
+def _argument_value(tokens):
+    """Value of a keyword argument: a constant, a bare name or a list of constants"""
+    tokens = _unwrap(tokens)
+    if len(tokens) == 1 and tokens[0].type == tokenize.NAME and tokens[0].string not in _CONSTANT_NAMES:
+        return tokens[0].string
+    if _encloses(tokens, '['):
+        items = []
+        for element in _split_arguments(tokens[1:-1]):
+            try:
+                items.append(_constant_value(element))
+            except _NotLiteral:
+                continue  # Like ToolVisitor, keep only the constant elements
+        return items
+    return _constant_value(tokens)
+
+def _parameter_from_tokens(arguments):
+    """Parameter dictionary of an add_argument() call split into argument token lists"""
+    if not arguments:
+        return None
+    try:
+        name = _constant_value(arguments[0])
+    except _NotLiteral:
+        return None
+    if not isinstance(name, str):
+        return None
+    
+    kwargs = {}
+    for argument in arguments[1:]:
+        if (len(argument) >= 2 and argument[0].type == tokenize.NAME
+                and argument[1].type == tokenize.OP and argument[1].string == '='):
+            try:
+                kwargs[argument[0].string] = _argument_value(argument[2:])
+            except _NotLiteral:
+                continue
+    return _parameter_info(name, kwargs)
+
+def _scan_add_argument_calls(tokens, parameters):
+    """Append the parameters of every add_argument() call in a token stream"""
+    previous = (None, None)     # The two significant tokens before the current one
+    call = None                 # Tokens of the call being read, None outside a call
+    depth = 0
+    
+    for token in tokens:
+        if token.type in (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT,
+                          tokenize.NEWLINE, tokenize.ENDMARKER):
+            continue
+        
+        opens_call = (token.type == tokenize.OP and token.string == '('
+                      and previous[1] is not None and previous[1].string == 'add_argument'
+                      and previous[0] is not None and previous[0].string == '.')
+        previous = (previous[1], token)
+        
+        if call is not None:
+            if opens_call or (token.type == tokenize.NAME and token.string in _STATEMENT_KEYWORDS):
+                # The call was never closed; keep the arguments read so far
+                if opens_call:
+                    # Drop the next call's "receiver.add_argument" from the end
+                    del call[-2:]
+                    if call and call[-1].type == tokenize.NAME:
+                        call.pop()
+                        while len(call) >= 2 and call[-1].string == '.' and call[-2].type == tokenize.NAME:
+                            del call[-2:]
+                arguments = _split_arguments(call)
+                parameter = _parameter_from_tokens(arguments[:-1] if depth else arguments)
+                if parameter:
+                    parameters.append(parameter)
+                call = None
+            elif token.type == tokenize.OP and token.string in _OPENING:
+                depth += 1
+                call.append(token)
+                continue
+            elif token.type == tokenize.OP and token.string in (')', ']', '}'):
+                if depth == 0:
+                    parameter = _parameter_from_tokens(_split_arguments(call))
+                    if parameter:
+                        parameters.append(parameter)
+                    call = None
+                else:
+                    depth -= 1
+                    call.append(token)
+                continue
+            else:
+                call.append(token)
+                continue
+        
+        if opens_call:
+            call = []
+            depth = 0
+
+def extract_parameters_tokens(content):
+    """
+    Extract command-line parameters from the token stream of a file.
+    Used when the file does not parse or ToolVisitor finds nothing.
+    
+    Each add_argument() call is bracket-matched and its arguments are read
+    exactly, with the same rules as ToolVisitor. The file is tokenized once;
+    after a tokenize error, scanning resumes on the line that follows it, so
+    broken code elsewhere in the file does not hide the calls around it.
+    
+    Args:
+        content (str): Source code of the tool
+        
+    Returns:
+        list: A list of parameter dictionaries
+    """
+    parameters = []
+    if 'add_argument' not in content:
+        return parameters
+    
+    lines = content.splitlines(keepends=True)
+    start = 0
+    
+    while start < len(lines):
+        consumed = [0]
+        
+        def readline(offset=start):
+            index = offset + consumed[0]
+            if index >= len(lines):
+                return ''
+            consumed[0] += 1
+            return lines[index]
+        
+        try:
+            _scan_add_argument_calls(tokenize.generate_tokens(readline), parameters)
+            break
+        except (tokenize.TokenError, SyntaxError):
+            # Resume after the lines already read; never revisit them
+            start += max(consumed[0], 1)
+    
+    return parameters
+
 class DocstringParser:
     """Class for parsing Python docstrings"""
     
@@ -27,6 +493,7 @@ class DocstringParser:
         self.content = content
         self.docstring = None
         self.ast_tree = None
+        self.parameters = []
     
     def parse(self):
         """Parse the docstring and return structured information"""
@@ -45,17 +512,11 @@ class DocstringParser:
             # Try to parse the file content as AST
             self.ast_tree = ast.parse(self.content)
             
-            # Extract the module docstring
-            self.docstring = ast.get_docstring(self.ast_tree)
-            
-            if not self.docstring:
-                # Try to find a docstring in the first class or function
-                for node in self.ast_tree.body:
-                    if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
-                        class_docstring = ast.get_docstring(node)
-                        if class_docstring:
-                            self.docstring = class_docstring
-                            break
+            # One traversal finds the docstring and the command-line parameters
+            visitor = ToolVisitor()
+            visitor.visit(self.ast_tree)
+            self.docstring = visitor.docstring
+            self.parameters = visitor.parameters or extract_parameters_tokens(self.content)
             
             if not self.docstring:
                 return self._create_empty_result()
@@ -68,16 +529,16 @@ class DocstringParser:
             if examples:
                 doc_info["examples"] = examples
             
-            # Find command-line parameters
-            params = self._extract_parameters()
-            if params:
-                doc_info["parameters"] = params
+            # Add command-line parameters
+            if self.parameters:
+                doc_info["parameters"] = self.parameters
             
             return doc_info
         
         except SyntaxError:
-            # If AST parsing fails, try to extract docstring with regex
+            # If AST parsing fails, try to extract docstring and parameters with regex
             logger.warning(f"AST parsing failed for {self.file_path}, trying regex fallback")
+            self.parameters = extract_parameters_tokens(self.content)
             return self._parse_with_regex()
         
         except Exception as e:
@@ -132,6 +593,16 @@ class DocstringParser:
         if not docstring:
             return self._create_empty_result()
         
+        return parse_docstring_sections(inspect.cleandoc(docstring))
+    
+    def _parse_docstring_reference(self, docstring):
+        """
+        Parse a docstring with the per-format parsers below.
+        Reference implementation that parse_docstring_sections() is checked against.
+        """
+        if not docstring:
+            return self._create_empty_result()
+        
         # Clean up the docstring
         docstring = inspect.cleandoc(docstring)
         
@@ -408,138 +879,398 @@ class DocstringParser:
                         examples.append(block.strip())
         
         return examples
+
+class ExtractionEngine:
+    """
+    Parses each version of a tool file once and serves its documentation
+    and parameters from the result.
+
+    Results are keyed by the MD5 of the file content (the same hash the
+    scanner stores in the catalog), so /docs and /parameters for a tool share
+    one parse, and an edited file is parsed again on its next request. With a
+    parse store, results also survive restarts.
+
+    The summary detail level only needs the module docstring, which is read
+    from the first tokens of the file; the whole file is parsed only when the
+    module has no leading docstring.
+    """
+    
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+        
+        self._results = OrderedDict()   # content hash -> {"doc", "parameters"}
+        self._summaries = OrderedDict() # content hash -> summary-level doc
+        self._versions = {}             # path -> (mtime_ns, size, content hash)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.store_hits = 0
+        self.parses = 0
+        self.header_reads = 0
+        
+        self.store = None
+        if self.settings['STORE_DB']:
+            from utils.parse_store import ParseStore  # Imported here so this file still runs as a script
+            self.store = ParseStore(self.settings['STORE_DB'], PARSER_VERSION,
+                                    {'MAX_ROWS': self.settings['STORE_MAX_ROWS']})
     
-    def _extract_parameters(self):
+    def extract(self, file_path: str) -> Dict[str, Any]:
         """
-        Extract command-line parameters from file content.
+        Get the documentation and parameters of a tool.
         
+        Args:
+            file_path (str): Path to the Python file
+            
         Returns:
-            list: A list of parameter dictionaries
+            dict: {"hash", "doc", "parameters"} - content hash (None if the file
+                  could not be read), parsed docstring information and parameters
         """
-        parameters = []
+        content_hash = self._known_hash(file_path)
+        if content_hash is not None:
+            result = self._lookup(content_hash)
+            if result is not None:
+                return result
         
-        # Try AST-based extraction first
-        if self.ast_tree:
-            try:
-                parameters = self._extract_parameters_ast()
-            except Exception as e:
-                logger.warning(f"AST parameter extraction failed: {e}")
+        try:
+            content_hash, content = self._read(file_path)
+        except Exception as e:
+            return self._read_error(file_path, e)
         
-        # Fall back to regex if needed
-        if not parameters:
-            parameters = self._extract_parameters_regex()
+        result = self._lookup(content_hash)
+        if result is not None:
+            return result
         
-        return parameters
+        entry = self.store.get(content_hash) if self.store else None
+        if entry is not None:
+            with self._lock:
+                self.store_hits += 1
+        else:
+            parser = DocstringParser(file_path=file_path, content=content)
+            # Round-trip through JSON so fresh and stored results look the same
+            entry = json.loads(json.dumps({"doc": parser.parse(), "parameters": parser.parameters}, default=str))
+            with self._lock:
+                self.parses += 1
+            if self.store:
+                self.store.put(content_hash, entry)
+        
+        self._remember(self._results, content_hash, entry)
+        return dict(copy.deepcopy(entry), hash=content_hash)
     
-    def _extract_parameters_ast(self):
-        """Extract parameters using AST parsing"""
-        parameters = []
+    def summary(self, file_path: str) -> Dict[str, Any]:
+        """
+        Get the documentation of a tool without usage examples and parameters.
         
-        for node in ast.walk(self.ast_tree):
-            # Look for add_argument calls
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'add_argument':
-                if not node.args:
-                    continue
-                
-                # Get parameter name from first argument
-                arg_node = node.args[0]
-                if isinstance(arg_node, ast.Str):
-                    param_name = arg_node.s
-                elif hasattr(ast, 'Constant') and isinstance(arg_node, ast.Constant) and isinstance(arg_node.value, str):
-                    param_name = arg_node.value
-                else:
-                    continue
-                
-                # Extract keyword arguments
-                kwargs = {}
-                for keyword in node.keywords:
-                    if isinstance(keyword.value, ast.Str) or (hasattr(ast, 'Constant') and isinstance(keyword.value, ast.Constant)):
-                        value = keyword.value.s if hasattr(keyword.value, 's') else keyword.value.value
-                        kwargs[keyword.arg] = value
-                    elif isinstance(keyword.value, ast.Name):
-                        kwargs[keyword.arg] = keyword.value.id
-                    elif isinstance(keyword.value, ast.List):
-                        items = []
-                        for elt in keyword.value.elts:
-                            if isinstance(elt, ast.Str) or (hasattr(ast, 'Constant') and isinstance(elt, ast.Constant)):
-                                items.append(elt.s if hasattr(elt, 's') else elt.value)
-                        kwargs[keyword.arg] = items
-                
-                # Create parameter info
-                param_info = {
-                    "name": param_name,
-                    "clean_name": param_name.lstrip('-'),
-                    "help": kwargs.get('help', ''),
-                    "type": kwargs.get('type', 'str'),
-                    "default": kwargs.get('default'),
-                    "choices": kwargs.get('choices', []),
-                    "required": kwargs.get('required', False)
-                }
-                
-                parameters.append(param_info)
+        Args:
+            file_path (str): Path to the Python file
+            
+        Returns:
+            dict: Parsed docstring information (raw, title, summary, sections)
+        """
+        content_hash = self._known_hash(file_path)
+        if content_hash is not None:
+            doc = self._lookup_summary(content_hash)
+            if doc is not None:
+                return doc
         
-        return parameters
+        try:
+            content_hash, content = self._read(file_path)
+        except Exception as e:
+            return self._read_error(file_path, e)["doc"]
+        
+        doc = self._lookup_summary(content_hash)
+        if doc is not None:
+            return doc
+        
+        docstring = read_header_docstring(content)
+        if not docstring:
+            # No leading module docstring; only a full parse can tell what to show
+            return summary_of(self.extract(file_path)["doc"])
+        
+        doc = json.loads(json.dumps(DocstringParser(file_path=file_path)._parse_docstring(docstring), default=str))
+        with self._lock:
+            self.header_reads += 1
+        self._remember(self._summaries, content_hash, doc)
+        return copy.deepcopy(doc)
     
-    def _extract_parameters_regex(self):
-        """Extract parameters using regex"""
-        parameters = []
+    def prewarm(self, catalog: Dict[str, Any]):
+        """
+        Parse every catalog tool that has no stored result yet.
+        Tools whose catalog hash is already in the parse store are not read at all.
+        """
+        root_path = catalog.get('root_path', '')
+        tools = [tool for category in catalog.get('categories', []) for tool in category.get('tools', [])]
         
-        # Look for add_argument patterns
-        arg_pattern = r'\.add_argument\([\'"](-{1,2}[a-zA-Z0-9_-]+)[\'"]'
-        help_pattern = r'help=[\'"]([^\'"]+)[\'"]'
-        type_pattern = r'type=([a-zA-Z0-9_\.]+)'
-        default_pattern = r'default=([a-zA-Z0-9_\.\'"-]+)'
-        required_pattern = r'required=(True|False)'
-        choices_pattern = r'choices=\[([^\]]+)\]'
+        known = set()
+        if self.store:
+            known = self.store.known(tool['hash'] for tool in tools if tool.get('hash'))
+        with self._lock:
+            known.update(self._results)
         
-        for match in re.finditer(arg_pattern, self.content):
-            param_name = match.group(1)
-            
-            # Find the help text in the surrounding context
-            context = self.content[max(0, match.start() - 50):min(len(self.content), match.end() + 150)]
-            help_match = re.search(help_pattern, context)
-            help_text = help_match.group(1) if help_match else ""
-            
-            # Extract other parameter info
-            type_match = re.search(type_pattern, context)
-            param_type = type_match.group(1) if type_match else "str"
-            
-            default_match = re.search(default_pattern, context)
-            default_value = default_match.group(1) if default_match else None
-            
-            required_match = re.search(required_pattern, context)
-            required = required_match and required_match.group(1) == 'True'
-            
-            choices_match = re.search(choices_pattern, context)
-            choices = choices_match.group(1).split(',') if choices_match else []
-            
-            parameters.append({
-                "name": param_name,
-                "clean_name": param_name.lstrip('-'),
-                "help": help_text,
-                "type": param_type,
-                "default": default_value,
-                "choices": choices,
-                "required": required
-            })
+        parsed = 0
+        for tool in tools:
+            if tool.get('hash') in known:
+                continue
+            self.extract(os.path.join(root_path, tool['relative_path']))
+            parsed += 1
         
-        return parameters
+        if self.store:
+            self.store.trim()
+        if parsed:
+            logger.info(f"Parsed documentation of {parsed} tools")
+    
+    def docs(self, file_path: str, detail: str = DETAIL_FULL) -> Dict[str, Any]:
+        """Get the parsed docstring information of a tool at a detail level"""
+        if detail == DETAIL_SUMMARY:
+            return self.summary(file_path)
+        return self.extract(file_path)["doc"]
+    
+    def parameters(self, file_path: str) -> List[Dict[str, Any]]:
+        """Get the command-line parameters of a tool"""
+        return self.extract(file_path)["parameters"]
+    
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters"""
+        with self._lock:
+            stats = {"entries": len(self._results), "summaries": len(self._summaries), "hits": self.hits,
+                     "store_hits": self.store_hits, "parses": self.parses, "header_reads": self.header_reads}
+        if self.store:
+            stats["store_rows"] = self.store.stats()["rows"]
+        return stats
+    
+    def _read(self, file_path):
+        """Read a file and record its content hash as (hash, text)"""
+        st = os.stat(file_path)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # Same newline handling as reading the file in text mode
+        content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        
+        content_hash = hashlib.md5(data).hexdigest()
+        with self._lock:
+            self._versions[file_path] = (st.st_mtime_ns, st.st_size, content_hash)
+        return content_hash, content
+    
+    def _read_error(self, file_path, error):
+        logger.error(f"Error reading file {file_path}: {error}")
+        parser = DocstringParser(file_path=file_path)
+        return {
+            "hash": None,
+            "doc": parser._create_error_result(f"Error reading file: {str(error)}"),
+            "parameters": []
+        }
+    
+    def _known_hash(self, file_path):
+        """Content hash of a file seen before with the same mtime and size"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            version = self._versions.get(file_path)
+        if version and version[:2] == (st.st_mtime_ns, st.st_size):
+            return version[2]
+        return None
+    
+    def _remember(self, results, content_hash, entry):
+        with self._lock:
+            results[content_hash] = entry
+            results.move_to_end(content_hash)
+            while len(results) > self.settings['MAX_ENTRIES']:
+                results.popitem(last=False)
+    
+    def _lookup(self, content_hash):
+        with self._lock:
+            entry = self._results.get(content_hash)
+            if entry is None:
+                return None
+            self._results.move_to_end(content_hash)
+            self.hits += 1
+        return dict(copy.deepcopy(entry), hash=content_hash)
+    
+    def _lookup_summary(self, content_hash):
+        """Summary from a cached summary or a cached full result"""
+        with self._lock:
+            doc = self._summaries.get(content_hash)
+            if doc is not None:
+                self._summaries.move_to_end(content_hash)
+                self.hits += 1
+                return copy.deepcopy(doc)
+        entry = self._lookup(content_hash)
+        return summary_of(entry["doc"]) if entry is not None else None
+
+# Global engine instance
+_engine = None
+
+def get_extraction_engine(settings=None) -> ExtractionEngine:
+    """
+    Get the shared extraction engine.
+    Uses a singleton engine instance.
+    
+    Args:
+        settings (dict): Settings used when the engine is first created
+        
+    Returns:
+        ExtractionEngine: The shared engine
+    """
+    global _engine
+    if _engine is None:
+        _engine = ExtractionEngine(settings)
+    
+    return _engine
 
-def extract_docstring(file_path):
+def extract_docstring(file_path, detail=DETAIL_FULL):
     """
     Extract the docstring from a Python file.
     
     Args:
         file_path (str): Path to the Python file
+        detail (str): DETAIL_FULL, or DETAIL_SUMMARY to skip usage examples and
+                      parameters and read only the head of the file
         
     Returns:
         dict: A dictionary containing the parsed docstring information
     """
-    parser = DocstringParser(file_path=file_path)
-    return parser.parse()
+    return get_extraction_engine().docs(file_path, detail)
+
+# Docstrings of every supported format, used by the section parser benchmark
+SAMPLE_DOCSTRINGS = [
+    """Image Resizer
+
+    Resizes images in bulk while keeping their aspect ratio.
+
+    ✒ Metadata:
+        Author: PySnip
+        Version: 1.2
+
+    ✒ Description:
+        Walks a directory and writes resized copies of every image.
+
+    ✒ Key Features:
+        - Keeps aspect ratio
+        - Skips files that are not images
+
+    ✒ Usage Instructions:
+        Run with --input and --width.
+
+    Examples:
+        python resize.py --input photos --width 800
+
+    ✒ Command-Line Arguments:
+        --input: Source directory
+        --width: Target width in pixels
+    """,
+    """Fetch a web page.
+
+    Downloads a page and prints its title, following redirects.
+
+    Args:
+        url (str): Page to fetch
+        timeout (int): Seconds to wait
+
+    Returns:
+        str: The page title
+
+    Examples:
+        fetch("https://example.com")
+
+    Note: requires network access
+    """,
+    """Compute moving averages.
+
+    Smooths a series with a sliding window.
+
+    Parameters
+    ----------
+    values : list of float
+        Input series
+    window : int
+        Window length
+
+    Returns
+    -------
+    list of float
+        Smoothed series
+
+    Notes
+    -----
+    The first window - 1 values are dropped.
+    """,
+    """Print a greeting.
+
+    Prints "Hello" followed by the given name.
+    Nothing else happens.
+    """,
+    """Title only""",
+    """Mixed: header-like lines
+
+    Key: value in the summary
+    -----
+    Parameters
+    """,
+]
+
+def _harvest_docstrings(paths):
+    """Module, class and function docstrings of the Python files below the given paths"""
+    docstrings = []
+    for path in paths:
+        files = [path] if os.path.isfile(path) else [
+            os.path.join(root, name) for root, _, names in os.walk(path) for name in names if name.endswith('.py')
+        ]
+        for file_path in files:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    tree = ast.parse(f.read())
+            except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                    docstring = ast.get_docstring(node, clean=False)
+                    if docstring:
+                        docstrings.append(docstring)
+    return docstrings
+
+def run_section_benchmark(paths, repeat=5):
+    """
+    Check that the single-pass section parser matches the per-format parsers
+    on a corpus, and time both.
+    
+    Args:
+        paths (list): Files or directories whose docstrings join the built-in samples
+        repeat (int): Timed passes over the corpus per parser
+        
+    Returns:
+        int: Number of docstrings with different results
+    """
+    import time
+    
+    corpus = SAMPLE_DOCSTRINGS + _harvest_docstrings(paths)
+    parser = DocstringParser()
+    
+    mismatches = 0
+    for docstring in corpus:
+        expected = json.dumps(parser._parse_docstring_reference(docstring))
+        if json.dumps(parser._parse_docstring(docstring)) != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"Mismatch: {docstring[:60]!r}")
+    
+    timings = {}
+    for name, parse in (("per-format", parser._parse_docstring_reference), ("single-pass", parser._parse_docstring)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for docstring in corpus:
+                parse(docstring)
+        timings[name] = (time.perf_counter() - start) / repeat
+    
+    print(f"{len(corpus)} docstrings, {mismatches} mismatches")
+    for name, seconds in timings.items():
+        print(f"  {name:12} {seconds * 1000:8.1f} ms per pass")
+    return mismatches
 
 if __name__ == "__main__":
-    # Test the docstring parser with a sample file
+    # Test the docstring parser with a sample file, or benchmark the section parser
     import sys
     
     # Configure logging
@@ -548,9 +1279,12 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        sys.exit(1 if run_section_benchmark(sys.argv[2:]) else 0)
+    elif len(sys.argv) > 1 and (len(sys.argv) < 3 or sys.argv[2] in DETAIL_LEVELS):
         file_path = sys.argv[1]
-        doc_info = extract_docstring(file_path)
+        doc_info = extract_docstring(file_path, sys.argv[2] if len(sys.argv) > 2 else DETAIL_FULL)
         print(json.dumps(doc_info, indent=2))
     else:
-        print("Usage: doc_parser.py <file_path>")
+        print(f"Usage: doc_parser.py <file_path> [{'|'.join(DETAIL_LEVELS)}]")
+        print("       doc_parser.py --benchmark [path ...]")
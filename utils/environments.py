@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Environments module for PySnip Web Interface
+--------------------------------------------
+Gives tools with third-party dependencies their own virtual environment.
+Requirements are read from a requirements.txt next to the tool or detected
+from its imports. Environments are installed offline from a local wheelhouse,
+cached by a hash of the dependency set and shared by every tool that needs
+the same packages.
+"""
+
+import os
+import sys
+import ast
+import json
+import shutil
+import hashlib
+import sysconfig
+import tempfile
+import threading
+import subprocess
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default environment settings
+DEFAULT_SETTINGS = {
+    'ENVS_DIR': None,               # Where environments are built (None = cache/envs in the app directory)
+    'WHEELHOUSE': None,             # Local directory of wheels to install from (no index is used)
+    'BASE_PYTHON': sys.executable,  # Interpreter environments are created from
+    'BUILD_TIMEOUT': 600,           # Maximum time (in seconds) to build one environment
+    'BUILD_WORKERS': 2,             # Environments built in parallel
+    'PACKAGE_NAMES': {},            # Extra import name -> distribution name mappings
+}
+
+# Import names that differ from the distribution that provides them
+PACKAGE_NAMES = {
+    'yaml': 'PyYAML',
+    'PIL': 'Pillow',
+    'cv2': 'opencv-python',
+    'sklearn': 'scikit-learn',
+    'skimage': 'scikit-image',
+    'bs4': 'beautifulsoup4',
+    'dateutil': 'python-dateutil',
+    'dotenv': 'python-dotenv',
+    'docx': 'python-docx',
+    'pptx': 'python-pptx',
+    'magic': 'python-magic',
+    'Crypto': 'pycryptodome',
+    'OpenSSL': 'pyOpenSSL',
+    'jwt': 'PyJWT',
+    'serial': 'pyserial',
+    'usb': 'pyusb',
+    'win32api': 'pywin32',
+    'fitz': 'PyMuPDF',
+    'attr': 'attrs',
+}
+
+REQUIREMENTS_FILE = 'requirements.txt'
+MARKER_FILE = 'pysnip-env.json'
+
+class EnvironmentBuildingException(Exception):
+    """Exception raised when a tool's environment is still being built."""
+    pass
+
+def _stdlib_modules():
+    """Names of standard library top-level modules"""
+    if hasattr(sys, 'stdlib_module_names'):  # Python 3.10+
+        return set(sys.stdlib_module_names) | set(sys.builtin_module_names)
+
+    names = set(sys.builtin_module_names)
+    stdlib_dir = sysconfig.get_paths()['stdlib']
+    for entry in os.listdir(stdlib_dir):
+        name, ext = os.path.splitext(entry)
+        if ext in ('.py', '') and name.isidentifier():
+            names.add(name)
+    dynload = os.path.join(stdlib_dir, 'lib-dynload')
+    if os.path.isdir(dynload):
+        names.update(entry.split('.', 1)[0] for entry in os.listdir(dynload))
+    return names
+
+STDLIB_MODULES = _stdlib_modules()
+
+class _ImportCollector(ast.NodeVisitor):
+    """Collects absolute top-level imports, skipping optional ones"""
+
+    def __init__(self):
+        self.modules = set()
+        self._optional = 0
+
+    def visit_Try(self, node):
+        # Imports guarded by "except ImportError" are optional dependencies
+        guarded = any(self._catches_import_error(handler) for handler in node.handlers)
+        self._optional += guarded
+        for child in node.body:
+            self.visit(child)
+        self._optional -= guarded
+        for child in node.handlers + node.orelse + node.finalbody:
+            self.visit(child)
+
+    def visit_Import(self, node):
+        if not self._optional:
+            for alias in node.names:
+                self.modules.add(alias.name.split('.', 1)[0])
+
+    def visit_ImportFrom(self, node):
+        if not self._optional and node.level == 0 and node.module:
+            self.modules.add(node.module.split('.', 1)[0])
+
+    @staticmethod
+    def _catches_import_error(handler):
+        if handler.type is None:
+            return True
+        names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        return any(isinstance(name, ast.Name) and name.id in ('ImportError', 'ModuleNotFoundError', 'Exception')
+                   for name in names)
+
+def detect_imports(paths: List[str]) -> List[str]:
+    """
+    Find third-party modules imported by a set of scripts.
+
+    Args:
+        paths (list): Paths of the scripts of one tool
+
+    Returns:
+        list: Sorted top-level module names that are neither stdlib nor local
+    """
+    local = {os.path.splitext(os.path.basename(path))[0] for path in paths}
+    collector = _ImportCollector()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                collector.visit(ast.parse(f.read(), filename=path))
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.debug(f"Cannot scan imports of {path}: {e}")
+
+    return sorted(module for module in collector.modules
+                  if module not in STDLIB_MODULES and module not in local and module != '__future__')
+
+def read_requirements(path: str) -> List[str]:
+    """Read requirement specifiers from a requirements file, ignoring comments and options"""
+    requirements = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line and not line.startswith('-'):
+                requirements.append(line)
+    return requirements
+
+class EnvironmentManager:
+    """Builds, caches and shares per-tool virtual environments"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.root = self.settings['ENVS_DIR'] or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "cache",
+            "envs"
+        )
+        os.makedirs(self.root, exist_ok=True)
+
+        self.package_names = dict(PACKAGE_NAMES)
+        self.package_names.update(self.settings['PACKAGE_NAMES'])
+
+        self._requirements: Dict[str, tuple] = {}
+        self._builds: Dict[str, Any] = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(self.settings['BUILD_WORKERS'])),
+                                        thread_name_prefix="pysnip-envs")
+
+    def tool_requirements(self, tool_path: str) -> List[str]:
+        """
+        Get the requirements of a tool, memoized until its files change.
+
+        Args:
+            tool_path (str): Path of the tool's main script
+
+        Returns:
+            list: Sorted requirement specifiers (empty if the tool only needs the stdlib)
+        """
+        tool_dir = os.path.dirname(os.path.abspath(tool_path))
+        scripts = sorted(f for f in os.listdir(tool_dir) if f.endswith('.py'))
+        requirements_file = os.path.join(tool_dir, REQUIREMENTS_FILE)
+
+        signature = []
+        for name in scripts + [REQUIREMENTS_FILE]:
+            try:
+                st = os.stat(os.path.join(tool_dir, name))
+                signature.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                pass
+        signature = tuple(signature)
+
+        with self._lock:
+            cached = self._requirements.get(tool_dir)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        if os.path.exists(requirements_file):
+            requirements = sorted(set(read_requirements(requirements_file)))
+        else:
+            modules = detect_imports([os.path.join(tool_dir, name) for name in scripts])
+            requirements = sorted({self.package_names.get(module, module) for module in modules})
+
+        with self._lock:
+            self._requirements[tool_dir] = (signature, requirements)
+        return requirements
+
+    def environment_hash(self, requirements: List[str]) -> str:
+        """Hash identifying the environment for a dependency set"""
+        key_data = json.dumps([
+            sorted(requirement.lower() for requirement in requirements),
+            os.path.realpath(self.settings['BASE_PYTHON']),
+            sys.version
+        ])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()[:16]
+
+    def python_for(self, tool_path: str, wait: bool = True) -> Optional[str]:
+        """
+        Get the interpreter a tool should run with.
+
+        Args:
+            tool_path (str): Path of the tool's main script
+            wait (bool): Wait for the environment if it is still being built
+
+        Returns:
+            str: Interpreter of the tool's environment, or None to use the server interpreter
+        """
+        requirements = self.tool_requirements(tool_path)
+        if not requirements:
+            return None
+
+        env_hash = self.environment_hash(requirements)
+        python = self._env_python(os.path.join(self.root, env_hash))
+        if self._is_ready(env_hash):
+            return python
+
+        future = self._submit(env_hash, requirements)
+        if future is None or not wait:
+            return None
+        try:
+            return python if future.result(timeout=self.settings['BUILD_TIMEOUT']) else None
+        except Exception as e:
+            logger.error(f"Error waiting for environment {env_hash}: {e}")
+            return None
+
+    def building(self, tool_path: str) -> bool:
+        """Check whether the environment of a tool is being built right now"""
+        requirements = self.tool_requirements(tool_path)
+        if not requirements:
+            return False
+
+        env_hash = self.environment_hash(requirements)
+        with self._lock:
+            future = self._builds.get(env_hash)
+        return future is not None and not future.done() and not self._is_ready(env_hash)
+
+    def prewarm(self, catalog: Dict[str, Any]):
+        """Start building the environments of every catalog tool in the background"""
+        with self._lock:
+            self._failed.clear()  # Give failed builds another chance after a rescan
+
+        root_path = catalog.get('root_path', '')
+        for category in catalog.get('categories', []):
+            for tool in category.get('tools', []):
+                try:
+                    self.python_for(os.path.join(root_path, tool['relative_path']), wait=False)
+                except OSError as e:
+                    logger.warning(f"Error preparing environment for {tool.get('relative_path')}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Get environment counters"""
+        with self._lock:
+            building = sum(1 for future in self._builds.values() if not future.done())
+            failed = len(self._failed)
+        ready = sum(1 for name in os.listdir(self.root) if self._is_ready(name))
+        return {"ready": ready, "building": building, "failed": failed}
+
+    def _env_python(self, env_dir):
+        if os.name == 'nt':
+            return os.path.join(env_dir, 'Scripts', 'python.exe')
+        return os.path.join(env_dir, 'bin', 'python')
+
+    def _is_ready(self, env_hash):
+        return os.path.exists(os.path.join(self.root, env_hash, MARKER_FILE))
+
+    def _submit(self, env_hash, requirements):
+        """Start a build unless one is running or already failed"""
+        with self._lock:
+            if env_hash in self._failed:
+                return None
+            future = self._builds.get(env_hash)
+            if future is None or (future.done() and not self._is_ready(env_hash)):
+                future = self._builds[env_hash] = self._pool.submit(self._build, env_hash, requirements)
+            return future
+
+    def _build(self, env_hash, requirements):
+        """Create an environment in a temporary directory and move it into place"""
+        if self._is_ready(env_hash):
+            return True
+
+        wheelhouse = self.settings['WHEELHOUSE']
+        if not wheelhouse or not os.path.isdir(wheelhouse):
+            logger.warning(f"No wheelhouse configured, cannot install {', '.join(requirements)}")
+            with self._lock:
+                self._failed.add(env_hash)
+            return False
+
+        logger.info(f"Building environment {env_hash} with {', '.join(requirements)}")
+        build_dir = tempfile.mkdtemp(prefix=f".{env_hash}-", dir=self.root)
+        try:
+            timeout = self.settings['BUILD_TIMEOUT']
+            subprocess.run([self.settings['BASE_PYTHON'], '-m', 'venv', build_dir],
+                           check=True, capture_output=True, timeout=timeout)
+            subprocess.run([self._env_python(build_dir), '-m', 'pip', 'install',
+                            '--no-index', '--find-links', wheelhouse,
+                            '--disable-pip-version-check', '--no-input', '--quiet'] + requirements,
+                           check=True, capture_output=True, timeout=timeout)
+
+            with open(os.path.join(build_dir, MARKER_FILE), 'w') as f:
+                json.dump({"requirements": requirements}, f)
+
+            try:
+                os.rename(build_dir, os.path.join(self.root, env_hash))
+            except OSError:
+                # Another process finished the same environment first
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+            logger.info(f"Environment {env_hash} ready")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            output = (e.stderr or e.stdout or b'').decode('utf-8', errors='replace').strip()
+            logger.error(f"Error building environment {env_hash}: {output[-2000:]}")
+        except Exception as e:
+            logger.error(f"Error building environment {env_hash}: {e}")
+
+        shutil.rmtree(build_dir, ignore_errors=True)
+        with self._lock:
+            self._failed.add(env_hash)
+        return False
+
+# Global manager instance
+_manager = None
+
+def get_environment_manager(settings=None) -> EnvironmentManager:
+    """
+    Get the shared environment manager.
+    Uses a singleton manager instance.
+
+    Args:
+        settings (dict): Settings used when the manager is first created
+
+    Returns:
+        EnvironmentManager: The shared manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = EnvironmentManager(settings)
+
+    return _manager
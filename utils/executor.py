@@ -12,20 +12,25 @@ import sys
 import json
 import subprocess
 import shlex
-import tempfile
 import time
 import signal
 import logging
-import re
 import resource
 import threading
 from datetime import datetime
 import platform
-import ast
 import inspect
 from io import StringIO
 from typing import Dict, List, Optional, Tuple, Union, Any
 
+from utils.process_control import get_timeout_scheduler, get_reaper, PROCESS_GROUPS_SUPPORTED
+from utils.workspace import get_workspace_pool
+from utils.bytecode import get_bytecode_cache, is_bootstrap_command
+from utils.environments import get_environment_manager, EnvironmentBuildingException
+from utils.sandbox import get_sandbox, unwrap_command
+from utils.output_store import get_output_store
+from utils.doc_parser import get_extraction_engine
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -35,15 +40,30 @@ DEFAULT_SETTINGS = {
     'MAX_OUTPUT_SIZE': 1024 * 1024,     # Maximum output size (in bytes) (1 MB)
     'MAX_MEMORY': 512 * 1024 * 1024,    # Maximum memory usage (in bytes) (512 MB)
     'MAX_CPU_TIME': 30,                 # Maximum CPU time (in seconds)
-    'SANDBOX_ENABLED': True,            # Enable process isolation sandbox
-    'WORKING_DIR': None,                # Working directory for execution (None = use temp dir)
+    'KILL_GRACE_PERIOD': 3,             # Time between SIGTERM and SIGKILL on timeout (in seconds)
+    'REAPER_INTERVAL': 5,               # Interval between sweeps for leaked descendants (in seconds)
+    'SANDBOX_ENABLED': True,            # Run tools in Linux namespaces when unshare is usable
+    'SANDBOX_ISOLATE_NETWORK': True,    # Give sandboxed tools no network access
+    'WORKING_DIR': None,                # Working directory for execution (None = fresh workspace per run)
+    'WORKSPACE_BASE_DIR': None,         # Parent of the workspace pool (None = tmpfs if available)
+    'WORKSPACE_POOL_SIZE': 8,           # Number of clean workspaces kept ready
     'ENV_VARS': {},                     # Additional environment variables
     'CAPTURE_STDERR': True,             # Capture stderr output
     'OUTPUT_STREAMING': False,          # Enable output streaming for long-running processes
-    'USE_VENV': False,                  # Use virtual environment if available
+    'USE_VENV': False,                  # Run tools with third-party imports in their own environment
+    'VENV_DIR': None,                   # Where tool environments are built (None = cache/envs)
+    'WHEELHOUSE': None,                 # Local wheel directory environments are installed from
+    'BYTECODE_CACHE': True,             # Launch tools from precompiled bytecode when available
+    'BYTECODE_CACHE_DIR': None,         # Bytecode cache location (None = cache/bytecode)
+    'STORE_OUTPUT': False,              # Keep full outputs in the output store, results carry a preview
+    'OUTPUT_DIR': None,                 # Output store location (None = cache/outputs)
+    'OUTPUT_PREVIEW_SIZE': 64 * 1024,   # Inline output per stream when the full output is stored
     'PYTHON_PATH': sys.executable,      # Path to Python interpreter
 }
 
+# Size of each read from a tool's output pipes
+READ_CHUNK_SIZE = 64 * 1024
+
 class TimeoutException(Exception):
     """Exception raised when a script execution times out."""
     pass
@@ -61,28 +81,40 @@ class ExecutionManager:
         if settings:
             self.settings.update(settings)
         
-        # Create a specific temp directory for this instance
-        self.temp_dir = None
-    
-    def __del__(self):
-        """Clean up resources"""
-        self._cleanup_temp_dir()
-    
-    def _create_temp_dir(self):
-        """Create a temporary directory for execution"""
-        if not self.temp_dir:
-            self.temp_dir = tempfile.mkdtemp(prefix="pysnip_exec_")
-        return self.temp_dir
-    
-    def _cleanup_temp_dir(self):
-        """Clean up the temporary directory"""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            import shutil
-            try:
-                shutil.rmtree(self.temp_dir)
-            except Exception as e:
-                logger.warning(f"Error cleaning up temp directory: {e}")
-            self.temp_dir = None
+        # Pool of per-execution working directories
+        self.workspaces = get_workspace_pool({
+            'BASE_DIR': self.settings['WORKSPACE_BASE_DIR'],
+            'POOL_SIZE': self.settings['WORKSPACE_POOL_SIZE']
+        })
+        
+        # Shared timeout thread and leaked-process reaper
+        self.timeouts = get_timeout_scheduler()
+        self.reaper = get_reaper(self.settings['REAPER_INTERVAL'], self.settings['KILL_GRACE_PERIOD'])
+        
+        # Cached bytecode only matches the interpreter that compiled it
+        self.bytecode = None
+        if (self.settings['BYTECODE_CACHE'] and
+                os.path.realpath(self.settings['PYTHON_PATH']) == os.path.realpath(sys.executable)):
+            self.bytecode = get_bytecode_cache({'CACHE_DIR': self.settings['BYTECODE_CACHE_DIR']})
+        
+        # Namespace sandbox, probed on first use
+        self.sandbox = None
+        if self.settings['SANDBOX_ENABLED']:
+            self.sandbox = get_sandbox({'ISOLATE_NETWORK': self.settings['SANDBOX_ISOLATE_NETWORK']})
+        
+        # On-disk store for complete outputs
+        self.outputs = None
+        if self.settings['STORE_OUTPUT']:
+            self.outputs = get_output_store({'OUTPUT_DIR': self.settings['OUTPUT_DIR']})
+        
+        # Per-tool virtual environments
+        self.environments = None
+        if self.settings['USE_VENV']:
+            self.environments = get_environment_manager({
+                'ENVS_DIR': self.settings['VENV_DIR'],
+                'WHEELHOUSE': self.settings['WHEELHOUSE'],
+                'BASE_PYTHON': self.settings['PYTHON_PATH']
+            })
     
     def _set_resource_limits(self):
         """Set resource limits for the current process"""
@@ -93,40 +125,142 @@ class ExecutionManager:
             # Set memory limit
             resource.setrlimit(resource.RLIMIT_AS, (self.settings['MAX_MEMORY'], self.settings['MAX_MEMORY']))
     
-    def _prepare_environment(self) -> Dict[str, str]:
+    def _prepare_environment(self, working_dir: str, sandboxed: bool = False) -> Dict[str, str]:
         """Prepare the execution environment"""
         env = os.environ.copy()
         
         # Add custom environment variables
         env.update(self.settings['ENV_VARS'])
         
-        # Set PYTHONPATH to include the directory of the tool
-        if 'PYTHONPATH' in env:
-            env['PYTHONPATH'] = f"{self.temp_dir}:{env['PYTHONPATH']}"
-        else:
-            env['PYTHONPATH'] = self.temp_dir
+        # The workspace holds uploaded files, so it must never be importable
+        # (tools still import their own helpers from the script's directory)
+        
+        # Let helper modules load their precompiled bytecode. Inside the sandbox
+        # the cache is read-only, and the prefix would also hide the stdlib's
+        # own bytecode, so sandboxed tools compile their helpers instead.
+        if self.bytecode and not sandboxed:
+            env['PYTHONPYCACHEPREFIX'] = self.bytecode.prefix
         
         return env
     
-    def execute(self, tool_path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def execute(self, tool_path: str, params: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None, workspace: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a PySnip tool with the provided parameters.
         
         Args:
             tool_path (str): Path to the PySnip tool
             params (dict): Parameters to pass to the tool
+            timeout (float): Time limit for this run (None = MAX_EXECUTION_TIME)
+            workspace (str): Pool workspace prepared and released by the caller
+                             (None = a fresh workspace released after the run)
             
         Returns:
             dict: Execution results including stdout, stderr, and execution info
+            
+        Raises:
+            EnvironmentBuildingException: If the tool's environment is still being built
         """
         if not os.path.exists(tool_path):
             return self._create_error_result(f"Tool not found at: {tool_path}")
         
-        # Create or get the temporary directory
-        working_dir = self.settings['WORKING_DIR'] or self._create_temp_dir()
-        
         # Prepare the command
-        cmd = [self.settings['PYTHON_PATH'], tool_path]
+        cmd, cmd_display = self._build_command(tool_path, params)
+        
+        # Set up process execution
+        start_time = time.time()
+        timeout = timeout or self.settings['MAX_EXECUTION_TIME']
+        
+        # Use the caller's workspace, the configured directory or a fresh workspace
+        pooled = None
+        if workspace:
+            working_dir = workspace
+        elif self.settings['WORKING_DIR']:
+            working_dir = self.settings['WORKING_DIR']
+        else:
+            pooled = working_dir = self.workspaces.acquire()
+        
+        try:
+            logger.info(f"Executing: {self._describe_command(cmd)}")
+            
+            # Execute in sandbox if enabled
+            if self.settings['SANDBOX_ENABLED']:
+                result = self._execute_sandboxed(cmd, working_dir, timeout)
+            else:
+                result = self._execute_direct(cmd, working_dir, timeout)
+            
+            return self._build_result(result, cmd_display, start_time, timeout)
+        
+        except Exception as e:
+            logger.error(f"Error during execution: {e}", exc_info=True)
+            return self._create_error_result(str(e))
+        
+        finally:
+            self.workspaces.release(pooled)
+    
+    def _command_script(self, cmd):
+        """Path of the script a command line runs"""
+        cmd = unwrap_command(cmd)
+        if is_bootstrap_command(cmd):
+            return cmd[4]
+        return cmd[1] if len(cmd) > 1 else ""
+    
+    def _describe_command(self, cmd):
+        """Command line for log messages, without the sandbox and bytecode bootstraps"""
+        inner = unwrap_command(cmd)
+        notes = []
+        if inner is not cmd:
+            notes.append("sandboxed")
+        if is_bootstrap_command(inner):
+            inner = [inner[0]] + inner[4:]
+            notes.append("cached bytecode")
+        return ' '.join(inner) + (f" ({', '.join(notes)})" if notes else "")
+    
+    def _sandbox_command(self, cmd, working_dir):
+        """
+        Wrap a command line for the namespace sandbox.
+        
+        Returns:
+            list: The sandboxed command line, or None if the sandbox is unavailable
+        """
+        if not self.sandbox or not self.sandbox.available():
+            return None
+        
+        # The app itself, including the bytecode and environment caches, is read-only
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        readonly = [app_dir]
+        if self.bytecode:
+            readonly.append(self.bytecode.root)
+        if self.environments:
+            readonly.append(self.environments.root)
+        
+        # Other executions' workspaces are hidden when this one comes from the pool
+        pool_root = self.workspaces.root
+        from_pool = os.path.dirname(os.path.abspath(working_dir)) == pool_root
+        
+        return self.sandbox.wrap(
+            cmd,
+            os.path.dirname(os.path.abspath(self._command_script(cmd))),
+            working_dir,
+            os.path.join(pool_root, ".sandbox"),
+            pool_root if from_pool else None,
+            readonly
+        )
+    
+    def _build_command(self, tool_path, params):
+        """Build the command line and its display form for a tool run"""
+        python = self.settings['PYTHON_PATH']
+        if self.environments:
+            # Never hold an execution slot (or the event loop) while an environment builds
+            env_python = self.environments.python_for(tool_path, wait=False)
+            if env_python is None and self.environments.building(tool_path):
+                raise EnvironmentBuildingException("Environment for this tool is still being built, try again shortly")
+            python = env_python or python
+        
+        if self.bytecode:
+            cmd = [python] + self.bytecode.launch_args(tool_path)
+        else:
+            cmd = [python, tool_path]
         cmd_display = f"{os.path.basename(tool_path)}"
         
         # Add parameters
@@ -150,133 +284,179 @@ class ExecutionManager:
             if param_strs:
                 cmd_display += " " + " ".join(param_strs)
         
-        # Set up process execution
-        start_time = time.time()
-        process = None
-        stdout_data = ""
-        stderr_data = ""
-        exit_code = 1
-        timeout_occurred = False
-        error_message = None
-        
-        try:
-            logger.info(f"Executing: {' '.join(cmd)}")
-            
-            # Execute in sandbox if enabled
-            if self.settings['SANDBOX_ENABLED']:
-                result = self._execute_sandboxed(cmd, working_dir)
-            else:
-                result = self._execute_direct(cmd, working_dir)
-            
-            stdout_data = result.get('stdout', '')
-            stderr_data = result.get('stderr', '')
-            exit_code = result.get('exit_code', 1)
-            timeout_occurred = result.get('timeout', False)
-            error_message = result.get('error', None)
-            
-            # Check for special error conditions
-            if timeout_occurred:
-                error_message = f"Execution timed out after {self.settings['MAX_EXECUTION_TIME']} seconds"
-            
-            # Truncate output if too large
-            if len(stdout_data) > self.settings['MAX_OUTPUT_SIZE']:
-                stdout_data = stdout_data[:self.settings['MAX_OUTPUT_SIZE']] + "\n... [OUTPUT TRUNCATED] ..."
-            if len(stderr_data) > self.settings['MAX_OUTPUT_SIZE']:
-                stderr_data = stderr_data[:self.settings['MAX_OUTPUT_SIZE']] + "\n... [OUTPUT TRUNCATED] ..."
-            
-            # Calculate execution time
-            execution_time = time.time() - start_time
-            
-            return {
-                "success": exit_code == 0 and not timeout_occurred and not error_message,
-                "return_code": exit_code,
-                "cmd": cmd_display,
-                "stdout": stdout_data,
-                "stderr": stderr_data,
-                "execution_time": execution_time,
-                "timeout": timeout_occurred,
-                "error": error_message,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        
-        except Exception as e:
-            logger.error(f"Error during execution: {e}", exc_info=True)
-            return self._create_error_result(str(e))
+        return cmd, cmd_display
+    
+    def _build_result(self, result, cmd_display, start_time, timeout):
+        """Turn raw process output into the execution result dictionary"""
+        stdout_data = result.get('stdout') or ''
+        stderr_data = result.get('stderr') or ''
+        exit_code = result.get('exit_code', 1)
+        timeout_occurred = result.get('timeout', False)
+        error_message = result.get('error', None)
+        
+        # Check for special error conditions
+        if timeout_occurred:
+            error_message = f"Execution timed out after {timeout:g} seconds"
+        
+        # Keep the complete output on disk and return only its beginning
+        output_id = result.get('output_id')
+        output_info = result.get('output_info')
+        if output_id is None and self.outputs is not None and (stdout_data or stderr_data):
+            try:
+                output_id, output_info = self.outputs.save({'stdout': stdout_data, 'stderr': stderr_data})
+            except OSError as e:
+                logger.warning(f"Cannot store execution output: {e}")
+        limit = self.settings['OUTPUT_PREVIEW_SIZE'] if output_id else self.settings['MAX_OUTPUT_SIZE']
+        
+        # Truncate output if too large
+        if len(stdout_data) > limit:
+            stdout_data = stdout_data[:limit] + "\n... [OUTPUT TRUNCATED] ..."
+        if len(stderr_data) > limit:
+            stderr_data = stderr_data[:limit] + "\n... [OUTPUT TRUNCATED] ..."
+        
+        # Calculate execution time
+        execution_time = time.time() - start_time
+        
+        execution_result = {
+            "success": exit_code == 0 and not timeout_occurred and not error_message,
+            "return_code": exit_code,
+            "cmd": cmd_display,
+            "stdout": stdout_data,
+            "stderr": stderr_data,
+            "execution_time": execution_time,
+            "timeout": timeout_occurred,
+            "error": error_message,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if output_id:
+            execution_result["output_id"] = output_id
+            execution_result["output"] = output_info
+        return execution_result
     
-    def _execute_direct(self, cmd, working_dir):
+    def _execute_direct(self, cmd, working_dir, timeout, sandboxed=False):
         """Execute command directly using subprocess"""
-        env = self._prepare_environment()
+        env = self._prepare_environment(working_dir, sandboxed)
         
-        # Create process
+        # Create process in its own session so the whole tree can be killed
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE if self.settings['CAPTURE_STDERR'] else None,
-            text=True,
-            universal_newlines=True,
             cwd=working_dir,
-            env=env
+            env=env,
+            start_new_session=PROCESS_GROUPS_SUPPORTED
+        )
+        if PROCESS_GROUPS_SUPPORTED:
+            self.workspaces.track(working_dir, process.pid)
+        
+        # Complete output goes to the output store as it arrives, only the
+        # beginning of each stream is kept in memory
+        record = self.outputs.create() if self.outputs is not None else None
+        buffers = {'stdout': bytearray(), 'stderr': bytearray()}
+        state = {'lock': threading.Lock(), 'closed': False}
+        readers = []
+        for stream, pipe in (('stdout', process.stdout), ('stderr', process.stderr)):
+            if pipe is None:
+                continue
+            reader = threading.Thread(
+                target=self._drain,
+                args=(pipe, buffers[stream], record.writer(stream) if record else None, state),
+                name=f"pysnip-{stream}",
+                daemon=True
+            )
+            reader.start()
+            readers.append(reader)
+        
+        # Set up timeout mechanism on the shared timeout thread
+        timeout_state = {'occurred': False}
+        handle = self.timeouts.schedule(
+            timeout, self._kill_process, process, timeout_state
         )
         
-        # Set up timeout mechanism
-        timer = threading.Timer(self.settings['MAX_EXECUTION_TIME'], self._kill_process, args=[process])
-        timer.start()
-        
+        label = os.path.basename(self._command_script(cmd))
         try:
-            stdout, stderr = process.communicate()
-            exit_code = process.returncode
-            timeout_occurred = False
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout, stderr = process.communicate()
-            exit_code = -1
-            timeout_occurred = True
+            process.wait()
         finally:
-            timer.cancel()
+            self.timeouts.cancel(handle)
+        
+        # Descendants may still hold the pipes open after the tool itself exited
+        if not self._join_readers(readers, self.settings['REAPER_INTERVAL']):
+            if PROCESS_GROUPS_SUPPORTED:
+                self.reaper.reap(process.pid, label)
+            self._join_readers(readers, self.settings['KILL_GRACE_PERIOD'] + 1)
+        
+        # Anything still in the group now outlived its tool
+        if PROCESS_GROUPS_SUPPORTED:
+            self.reaper.watch(process.pid, label)
+        
+        output_id, output_info = self._close_output(record, state) if record else (None, None)
+        
+        timeout_occurred = timeout_state['occurred']
+        exit_code = -1 if timeout_occurred else process.returncode
         
         return {
-            'stdout': stdout,
-            'stderr': stderr,
+            'stdout': buffers['stdout'].decode('utf-8', errors='replace'),
+            'stderr': buffers['stderr'].decode('utf-8', errors='replace'),
             'exit_code': exit_code,
-            'timeout': timeout_occurred
+            'timeout': timeout_occurred,
+            'output_id': output_id,
+            'output_info': output_info
         }
     
-    def _execute_sandboxed(self, cmd, working_dir):
+    def _join_readers(self, readers, interval):
+        """Wait up to interval seconds in total for all readers, returning whether they finished"""
+        deadline = time.monotonic() + interval
+        for reader in readers:
+            reader.join(max(0, deadline - time.monotonic()))
+        return not any(reader.is_alive() for reader in readers)
+    
+    def _drain(self, pipe, buffer, writer, state):
+        """Read a pipe to EOF, keeping at most one byte past the output limit in memory"""
+        limit = self.settings['MAX_OUTPUT_SIZE'] + 1
+        with pipe:
+            while True:
+                chunk = pipe.read1(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                with state['lock']:
+                    if state['closed']:
+                        continue
+                    if len(buffer) < limit:
+                        buffer.extend(chunk[:limit - len(buffer)])
+                    if writer is not None:
+                        writer.write(chunk)
+    
+    def _close_output(self, record, state):
+        """Finish an output record; output still arriving from leaked processes is dropped"""
+        with state['lock']:
+            state['closed'] = True
+        return record.close()
+    
+    def _execute_sandboxed(self, cmd, working_dir, timeout):
         """Execute command in a sandboxed environment"""
-        # For now, this is a thin wrapper around _execute_direct
-        # In a real-world application, you might use containerization solutions
-        # like Docker, or OS-specific sandboxing mechanisms here
-        return self._execute_direct(cmd, working_dir)
+        sandboxed_cmd = self._sandbox_command(cmd, working_dir)
+        if sandboxed_cmd is None:
+            return self._execute_direct(cmd, working_dir, timeout)
+        
+        return self._execute_direct(sandboxed_cmd, working_dir, timeout, sandboxed=True)
     
-    def _kill_process(self, process):
-        """Kill a process that has timed out"""
+    def _kill_process(self, process, timeout_state=None):
+        """Kill a process that has timed out, along with its process group"""
         try:
             if process.poll() is None:  # Process is still running
-                process.kill()
+                if timeout_state is not None:
+                    timeout_state['occurred'] = True
+                if PROCESS_GROUPS_SUPPORTED:
+                    logger.warning(f"Execution timed out, terminating process group {process.pid}")
+                    self.reaper.terminate(process.pid, f"timed out pid {process.pid}")
+                else:
+                    process.kill()
         except Exception as e:
             logger.error(f"Error killing process: {e}")
     
     def _prepare_parameters(self, params):
         """Convert parameter dictionary to command line arguments"""
-        cmd_params = []
-        
-        for key, value in params.items():
-            if key.startswith('--'):
-                # It's already a flag
-                param = key
-            else:
-                # Add -- prefix for flags
-                param = f"--{key}"
-            
-            if value is True:
-                # Boolean flag without value
-                cmd_params.append(param)
-            elif value not in (None, "", False):
-                # Regular parameter with value
-                cmd_params.append(param)
-                cmd_params.append(str(value))
-        
-        return cmd_params
+        return prepare_parameters(params)
     
     def _create_error_result(self, error_message):
         """Create an error result dictionary"""
@@ -292,10 +472,40 @@ class ExecutionManager:
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
+def prepare_parameters(params):
+    """
+    Convert a parameter dictionary to command-line arguments.
+    
+    Args:
+        params (dict): Parameters to pass to the tool
+        
+    Returns:
+        list: Command-line arguments in the order they are passed to the tool
+    """
+    cmd_params = []
+    
+    for key, value in params.items():
+        if key.startswith('--'):
+            # It's already a flag
+            param = key
+        else:
+            # Add -- prefix for flags
+            param = f"--{key}"
+        
+        if value is True:
+            # Boolean flag without value
+            cmd_params.append(param)
+        elif value not in (None, "", False):
+            # Regular parameter with value
+            cmd_params.append(param)
+            cmd_params.append(str(value))
+    
+    return cmd_params
+
 # Global executor instance
 _executor = None
 
-def execute_tool(tool_path, params=None):
+def execute_tool(tool_path, params=None, timeout=None, workspace=None):
     """
     Execute a PySnip tool with the provided parameters.
     Uses a singleton executor instance.
@@ -303,20 +513,36 @@ def execute_tool(tool_path, params=None):
     Args:
         tool_path (str): Path to the PySnip tool
         params (dict): Parameters to pass to the tool
+        timeout (float): Time limit for this run (None = MAX_EXECUTION_TIME)
+        workspace (str): Pool workspace owned by the caller (None = fresh workspace)
         
     Returns:
         dict: Execution results including stdout, stderr, and execution info
     """
+    return get_executor().execute(tool_path, params, timeout, workspace)
+
+def get_executor(settings=None):
+    """
+    Get the shared execution manager.
+    Uses a singleton executor instance.
+    
+    Args:
+        settings (dict): Settings used when the executor is first created
+        
+    Returns:
+        ExecutionManager: The shared executor
+    """
     global _executor
     if _executor is None:
-        _executor = ExecutionManager()
+        _executor = ExecutionManager(settings)
     
-    return _executor.execute(tool_path, params)
+    return _executor
 
 def extract_parameters_from_script(script_path):
     """
     Extract command-line parameters from a script.
-    Uses AST parsing for more accurate extraction.
+    Uses the shared extraction engine, so the script is parsed once per
+    version together with its documentation.
     
     Args:
         script_path (str): Path to the script
@@ -327,125 +553,7 @@ def extract_parameters_from_script(script_path):
     if not os.path.exists(script_path):
         return []
     
-    parameters = []
-    
-    try:
-        # First try using AST parsing for more accurate extraction
-        with open(script_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        parameters = _extract_parameters_ast(content)
-        
-        # If AST parsing didn't find parameters, fall back to regex
-        if not parameters:
-            parameters = _extract_parameters_regex(content)
-        
-        return parameters
-    
-    except Exception as e:
-        logger.error(f"Error extracting parameters: {e}", exc_info=True)
-        return []
-
-def _extract_parameters_ast(content):
-    """Extract parameters using AST parsing"""
-    parameters = []
-    
-    try:
-        tree = ast.parse(content)
-        
-        for node in ast.walk(tree):
-            # Look for add_argument calls
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'add_argument':
-                if not node.args:
-                    continue
-                
-                # Get parameter name from first argument
-                arg_node = node.args[0]
-                if isinstance(arg_node, ast.Str):
-                    param_name = arg_node.s
-                elif isinstance(arg_node, ast.Constant) and isinstance(arg_node.value, str):
-                    param_name = arg_node.value
-                else:
-                    continue
-                
-                # Extract keyword arguments
-                kwargs = {}
-                for keyword in node.keywords:
-                    if isinstance(keyword.value, ast.Str) or (hasattr(ast, 'Constant') and isinstance(keyword.value, ast.Constant)):
-                        value = keyword.value.s if hasattr(keyword.value, 's') else keyword.value.value
-                        kwargs[keyword.arg] = value
-                    elif isinstance(keyword.value, ast.Name):
-                        kwargs[keyword.arg] = keyword.value.id
-                    elif isinstance(keyword.value, ast.List):
-                        items = []
-                        for elt in keyword.value.elts:
-                            if isinstance(elt, ast.Str) or (hasattr(ast, 'Constant') and isinstance(elt, ast.Constant)):
-                                items.append(elt.s if hasattr(elt, 's') else elt.value)
-                        kwargs[keyword.arg] = items
-                
-                # Create parameter info
-                param_info = {
-                    "name": param_name,
-                    "clean_name": param_name.lstrip('-'),
-                    "help": kwargs.get('help', ''),
-                    "type": kwargs.get('type', 'str'),
-                    "default": kwargs.get('default'),
-                    "choices": kwargs.get('choices', []),
-                    "required": kwargs.get('required', False)
-                }
-                
-                parameters.append(param_info)
-        
-        return parameters
-    
-    except Exception as e:
-        logger.warning(f"AST parameter extraction failed: {e}")
-        return []
-
-def _extract_parameters_regex(content):
-    """Extract parameters using regex as a fallback"""
-    parameters = []
-    
-    # Look for add_argument patterns
-    arg_pattern = r'\.add_argument\([\'"](-{1,2}[a-zA-Z0-9_-]+)[\'"]'
-    help_pattern = r'help=[\'"]([^\'"]+)[\'"]'
-    type_pattern = r'type=([a-zA-Z0-9_\.]+)'
-    default_pattern = r'default=([a-zA-Z0-9_\.\'"-]+)'
-    required_pattern = r'required=(True|False)'
-    choices_pattern = r'choices=\[([^\]]+)\]'
-    
-    for match in re.finditer(arg_pattern, content):
-        param_name = match.group(1)
-        
-        # Find the help text in the surrounding context
-        context = content[max(0, match.start() - 50):min(len(content), match.end() + 150)]
-        help_match = re.search(help_pattern, context)
-        help_text = help_match.group(1) if help_match else ""
-        
-        # Extract other parameter info
-        type_match = re.search(type_pattern, context)
-        param_type = type_match.group(1) if type_match else "str"
-        
-        default_match = re.search(default_pattern, context)
-        default_value = default_match.group(1) if default_match else None
-        
-        required_match = re.search(required_pattern, context)
-        required = required_match and required_match.group(1) == 'True'
-        
-        choices_match = re.search(choices_pattern, context)
-        choices = choices_match.group(1).split(',') if choices_match else []
-        
-        parameters.append({
-            "name": param_name,
-            "clean_name": param_name.lstrip('-'),
-            "help": help_text,
-            "type": param_type,
-            "default": default_value,
-            "choices": choices,
-            "required": required
-        })
-    
-    return parameters
+    return get_extraction_engine().parameters(script_path)
 
 if __name__ == "__main__":
     # Test the executor with a sample script
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Guide Renderer module for PySnip Web Interface
+----------------------------------------------
+Renders the Markdown guides shipped with tools to sanitized HTML. Rendered
+guides are cached by the content hash the catalog records for them, so a
+guide page is served without reading or converting the file, and every
+catalog scan drops the renderings of guides that changed or went away.
+Uses the markdown package when it is installed and a small built-in
+converter otherwise; both outputs pass through the same allowlist sanitizer.
+"""
+
+import os
+import re
+import html
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional
+
+try:
+    import markdown
+    MARKDOWN_AVAILABLE = True
+except ImportError:
+    MARKDOWN_AVAILABLE = False
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default guide renderer settings
+DEFAULT_SETTINGS = {
+    'MAX_ENTRIES': 64,                  # Rendered guides kept in memory
+    'MAX_SIZE': 1024 * 1024,            # Larger guides are not rendered (served raw instead)
+}
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'sane_lists', 'toc']
+
+# Tags kept by the sanitizer, with the attributes each may carry
+ALLOWED_TAGS = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title'},
+    'code': {'class'},
+    'th': {'align'},
+    'td': {'align'},
+    'ol': {'start'},
+    **{tag: {'id'} for tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')},
+    **{tag: set() for tag in (
+        'p', 'br', 'hr', 'pre', 'blockquote', 'ul', 'li', 'strong', 'em', 'b', 'i',
+        'del', 'sup', 'sub', 'table', 'thead', 'tbody', 'tr', 'dl', 'dt', 'dd', 'div', 'span'
+    )},
+}
+VOID_TAGS = frozenset(('br', 'hr', 'img'))
+DROPPED_CONTENT_TAGS = frozenset(('script', 'style', 'iframe', 'object', 'embed', 'template'))
+URL_ATTRIBUTES = frozenset(('href', 'src'))
+SAFE_URL = re.compile(r'^(?:https?:|mailto:|#|/|\.{0,2}[^:/?#]*(?:[/?#]|$))', re.IGNORECASE)
+
+class _Sanitizer(HTMLParser):
+    """Rebuilds HTML from allowed tags and attributes only, escaping all text"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+        self.open_tags = []
+        self.dropping = 0  # Depth inside tags whose content is removed
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+
+        kept = []
+        for name, value in attrs:
+            if name not in ALLOWED_TAGS[tag] or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not SAFE_URL.match(value.strip()):
+                continue
+            if name == 'class' and not re.fullmatch(r'language-[\w+-]+', value):
+                continue
+            kept.append(f' {name}="{html.escape(value)}"')
+        if tag == 'a' and any(name == 'href' and value and value.startswith(('http:', 'https:'))
+                              for name, value in attrs):
+            kept.append(' rel="noopener noreferrer"')
+
+        self.output.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return  # Unmatched end tags are ignored
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.output.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.output.append(html.escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.output.append(f"</{self.open_tags.pop()}>")
+
+def sanitize_html(markup: str) -> str:
+    """
+    Remove everything but allowed tags and attributes from HTML.
+
+    Args:
+        markup (str): Untrusted HTML
+
+    Returns:
+        str: HTML with balanced, allowlisted tags, safe URLs and escaped text
+    """
+    sanitizer = _Sanitizer()
+    sanitizer.feed(markup)
+    sanitizer.close()
+    return ''.join(sanitizer.output)
+
+# Built-in converter patterns
+FENCE = re.compile(r'^(```|~~~)\s*([\w+-]*)\s*$')
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE = re.compile(r'^\s{0,3}([-*_])(\s*\1){2,}\s*$')
+LIST_ITEM = re.compile(r'^\s{0,3}([-*+]|\d+[.)])\s+(.*)$')
+CODE_SPAN = re.compile(r'(`+)(.+?)\1')
+IMAGE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"([^"]*)")?\)')
+LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+"([^"]*)")?\)')
+STRONG = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+EMPHASIS = re.compile(r'(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])')
+
+def _slug(text):
+    return re.sub(r'[^\w]+', '-', text.lower()).strip('-') or 'section'
+
+def _inline(text):
+    """Inline Markdown of one block; code spans are kept literal"""
+    parts = []
+    position = 0
+    for match in CODE_SPAN.finditer(text):
+        parts.append(_inline_text(text[position:match.start()]))
+        parts.append(f"<code>{html.escape(match.group(2).strip(), quote=False)}</code>")
+        position = match.end()
+    parts.append(_inline_text(text[position:]))
+    return ''.join(parts)
+
+def _inline_text(text):
+    text = html.escape(text, quote=False)
+    text = IMAGE.sub(lambda m: f'<img src="{m.group(2)}" alt="{m.group(1)}"'
+                               + (f' title="{m.group(3)}"' if m.group(3) else '') + '>', text)
+    text = LINK.sub(lambda m: f'<a href="{m.group(2)}"'
+                              + (f' title="{m.group(3)}"' if m.group(3) else '') + f'>{m.group(1)}</a>', text)
+    text = STRONG.sub(r'<strong>\2</strong>', text)
+    text = EMPHASIS.sub(r'<em>\2</em>', text)
+    return text.replace('  \n', '<br>\n')
+
+def markdown_to_html(text: str) -> str:
+    """
+    Convert the common subset of Markdown to HTML: headings, paragraphs,
+    fenced and indented code, lists, block quotes, rules, links, images
+    and emphasis. Used when the markdown package is not installed.
+
+    Args:
+        text (str): Markdown source
+
+    Returns:
+        str: HTML (not yet sanitized)
+    """
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    blocks = []
+    paragraph = []
+    slugs = {}
+    index = 0
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(f"<p>{_inline(chr(10).join(paragraph))}</p>")
+            paragraph.clear()
+
+    while index < len(lines):
+        line = lines[index]
+        fence = FENCE.match(line)
+
+        if fence:
+            flush_paragraph()
+            code = []
+            index += 1
+            while index < len(lines) and not lines[index].startswith(fence.group(1)):
+                code.append(lines[index])
+                index += 1
+            language = f' class="language-{fence.group(2)}"' if fence.group(2) else ''
+            blocks.append(f"<pre><code{language}>{html.escape(chr(10).join(code), quote=False)}</code></pre>")
+        elif line.startswith(('    ', '\t')) and not paragraph:
+            code = []
+            while index < len(lines) and (lines[index].startswith(('    ', '\t')) or not lines[index].strip()):
+                code.append(lines[index][4:] if lines[index].startswith('    ') else lines[index][1:])
+                index += 1
+            while code and not code[-1].strip():
+                code.pop()
+            blocks.append(f"<pre><code>{html.escape(chr(10).join(code), quote=False)}</code></pre>")
+            continue
+        elif HEADING.match(line):
+            flush_paragraph()
+            level, title = HEADING.match(line).groups()
+            slug = _slug(title)
+            slugs[slug] = slugs.get(slug, 0) + 1
+            if slugs[slug] > 1:
+                slug = f"{slug}_{slugs[slug] - 1}"
+            blocks.append(f'<h{len(level)} id="{slug}">{_inline(title)}</h{len(level)}>')
+        elif RULE.match(line):
+            flush_paragraph()
+            blocks.append("<hr>")
+        elif line.lstrip().startswith('>'):
+            flush_paragraph()
+            quoted = []
+            while index < len(lines) and lines[index].lstrip().startswith('>'):
+                quoted.append(re.sub(r'^\s*>\s?', '', lines[index]))
+                index += 1
+            blocks.append(f"<blockquote>{markdown_to_html(chr(10).join(quoted))}</blockquote>")
+            continue
+        elif LIST_ITEM.match(line) and (not paragraph or not LIST_ITEM.match(line).group(1)[0].isdigit()):
+            flush_paragraph()
+            ordered = LIST_ITEM.match(line).group(1)[0].isdigit()
+            items = []
+            while index < len(lines):
+                item = LIST_ITEM.match(lines[index])
+                if item and item.group(1)[0].isdigit() == ordered:
+                    items.append([item.group(2)])
+                elif items and lines[index].startswith(' ') and lines[index].strip():
+                    items[-1].append(lines[index].strip())  # Continuation of the item
+                else:
+                    break
+                index += 1
+            tag = 'ol' if ordered else 'ul'
+            blocks.append(f"<{tag}>" + ''.join(f"<li>{_inline(chr(10).join(item))}</li>" for item in items) + f"</{tag}>")
+            continue
+        elif not line.strip():
+            flush_paragraph()
+        else:
+            paragraph.append(line)
+        index += 1
+
+    flush_paragraph()
+    return '\n'.join(blocks)
+
+class GuideRenderer:
+    """Renders Markdown guides to sanitized HTML, cached by content hash"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self._rendered = OrderedDict()  # content hash -> rendered guide
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def render(self, file_path: str, content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the rendered HTML of a Markdown guide.
+
+        Args:
+            file_path (str): Path to the guide
+            content_hash (str): MD5 of the guide recorded by the catalog; a cached
+                                rendering of it is returned without reading the file
+
+        Returns:
+            dict: hash, title (first heading or None) and html,
+                  or None if the guide is larger than MAX_SIZE
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        if content_hash:
+            with self._lock:
+                rendered = self._rendered.get(content_hash)
+                if rendered is not None:
+                    self._rendered.move_to_end(content_hash)
+                    self.hits += 1
+                    return rendered
+
+        if os.path.getsize(file_path) > self.settings['MAX_SIZE']:
+            return None
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # Key by what was actually read, in case the file changed after the scan
+        content_hash = hashlib.md5(data).hexdigest()
+
+        with self._lock:
+            rendered = self._rendered.get(content_hash)
+            if rendered is not None:
+                self._rendered.move_to_end(content_hash)
+                self.hits += 1
+                return rendered
+
+        rendered = self._convert(data.decode('utf-8', errors='replace'), content_hash)
+        with self._lock:
+            self.renders += 1
+            self._rendered[content_hash] = rendered
+            while len(self._rendered) > self.settings['MAX_ENTRIES']:
+                self._rendered.popitem(last=False)
+        return rendered
+
+    def prewarm(self, catalog: Dict[str, Any]) -> int:
+        """
+        Render the Markdown guides of a catalog and drop renderings of guides
+        the catalog no longer has, such as earlier versions of edited guides.
+
+        Args:
+            catalog (dict): The PySnip catalog
+
+        Returns:
+            int: Number of guides rendered
+        """
+        root_path = catalog.get('root_path', '')
+        guides = {}
+        for category in catalog.get('categories', []):
+            for tool in category.get('tools', []):
+                if tool.get('guide_hash') and tool['guide_path'].endswith('.md'):
+                    guides[tool.get('guide_hash')] = os.path.join(root_path, tool['guide_path'])
+
+        with self._lock:
+            for content_hash in [h for h in self._rendered if h not in guides]:
+                del self._rendered[content_hash]
+            missing = {h: path for h, path in guides.items() if h not in self._rendered}
+
+        rendered = 0
+        for content_hash, path in list(missing.items())[:self.settings['MAX_ENTRIES']]:
+            try:
+                if self.render(path, content_hash) is not None:
+                    rendered += 1
+            except Exception as e:
+                logger.warning(f"Error rendering guide {path}: {e}")
+        if rendered:
+            logger.info(f"Rendered {rendered} guides")
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._rendered),
+                "hits": self.hits,
+                "renders": self.renders,
+                "renderer": "markdown" if MARKDOWN_AVAILABLE else "builtin"
+            }
+
+    def _convert(self, text, content_hash):
+        """Markdown source -> rendered guide"""
+        if MARKDOWN_AVAILABLE:
+            body = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+        else:
+            body = markdown_to_html(text)
+        body = sanitize_html(body)
+
+        title = re.search(r'<h1[^>]*>(.*?)</h1>', body, re.DOTALL)
+        return {
+            "hash": content_hash,
+            "title": html.unescape(re.sub(r'<[^>]+>', '', title.group(1))).strip() if title else None,
+            "html": body
+        }
+
+# Global renderer instance
+_renderer = None
+
+def get_guide_renderer(settings=None) -> GuideRenderer:
+    """
+    Get the shared guide renderer.
+    Uses a singleton renderer instance.
+
+    Args:
+        settings (dict): Settings used when the renderer is first created
+
+    Returns:
+        GuideRenderer: The shared renderer
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = GuideRenderer(settings)
+
+    return _renderer
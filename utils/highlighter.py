@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Highlighter module for PySnip Web Interface
+-------------------------------------------
+Server-side syntax highlighting of tool sources. Every line is rendered to
+HTML on its own, with highlight.js class names so the page theme styles it,
+and rendered files are cached by content hash, so any window of a long file
+is served without reading or highlighting it again. Uses Pygments when it
+is installed and the standard tokenize module otherwise.
+"""
+
+import io
+import os
+import html
+import keyword
+import hashlib
+import builtins
+import tokenize
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from pygments.lexers import PythonLexer
+    from pygments.token import Token
+    PYGMENTS_AVAILABLE = True
+except ImportError:
+    PYGMENTS_AVAILABLE = False
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default highlighter settings
+DEFAULT_SETTINGS = {
+    'MAX_ENTRIES': 128,                 # Rendered files kept in memory
+    'MAX_HIGHLIGHT_SIZE': 2 * 1024 * 1024,  # Larger files are escaped but not highlighted
+    'MAX_WINDOW': 2000,                 # Most lines returned by one window request
+}
+
+# highlight.js class of each Pygments token type; subtypes use their nearest listed parent
+if PYGMENTS_AVAILABLE:
+    PYGMENTS_CLASSES = {
+        Token.Keyword: 'hljs-keyword',
+        Token.Keyword.Constant: 'hljs-literal',
+        Token.Operator.Word: 'hljs-keyword',
+        Token.Name.Builtin: 'hljs-built_in',
+        Token.Name.Builtin.Pseudo: 'hljs-variable language_',
+        Token.Name.Function: 'hljs-title function_',
+        Token.Name.Function.Magic: 'hljs-title function_',
+        Token.Name.Class: 'hljs-title class_',
+        Token.Name.Decorator: 'hljs-meta',
+        Token.Name.Exception: 'hljs-built_in',
+        Token.Literal.String: 'hljs-string',
+        Token.Literal.String.Doc: 'hljs-string',
+        Token.Literal.String.Interpol: 'hljs-subst',
+        Token.Literal.Number: 'hljs-number',
+        Token.Comment: 'hljs-comment',
+    }
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+def _pygments_segments(source):
+    """(css class, text) segments of a source using Pygments"""
+    lexer = PythonLexer(stripnl=False, ensurenl=False)
+    for ttype, value in lexer.get_tokens(source):
+        while ttype not in PYGMENTS_CLASSES and ttype.parent is not None:
+            ttype = ttype.parent
+        yield PYGMENTS_CLASSES.get(ttype), value
+
+def _tokenize_segments(source):
+    """(css class, text) segments of a source using the tokenize module"""
+    line_starts = [0]
+    for line in io.StringIO(source):  # The same lines tokenize reads
+        line_starts.append(line_starts[-1] + len(line))
+
+    position = 0
+    previous = None
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type in (tokenize.ENDMARKER, tokenize.DEDENT):
+                continue
+            start = line_starts[token.start[0] - 1] + token.start[1]
+            end = line_starts[token.end[0] - 1] + token.end[1]
+            if start < position:
+                continue
+
+            css = None
+            if token.type == tokenize.STRING:
+                css = 'hljs-string'
+            elif token.type == tokenize.COMMENT:
+                css = 'hljs-comment'
+            elif token.type == tokenize.NUMBER:
+                css = 'hljs-number'
+            elif token.type == tokenize.NAME:
+                if previous in ('def', 'class'):
+                    css = 'hljs-title function_' if previous == 'def' else 'hljs-title class_'
+                elif token.string in ('True', 'False', 'None'):
+                    css = 'hljs-literal'
+                elif keyword.iskeyword(token.string):
+                    css = 'hljs-keyword'
+                elif token.string in BUILTIN_NAMES:
+                    css = 'hljs-built_in'
+                elif token.string == 'self':
+                    css = 'hljs-variable language_'
+
+            if start > position:
+                yield None, source[position:start]
+            yield css, source[start:end]
+            position = end
+            if token.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT, tokenize.INDENT):
+                previous = token.string
+    except (tokenize.TokenError, SyntaxError):
+        pass  # Leave the rest of a broken file unhighlighted
+
+    if position < len(source):
+        yield None, source[position:]
+
+def render_lines(source: str, highlight: bool = True) -> List[str]:
+    """
+    Render a source file to one HTML string per line.
+    Every line is self-contained: a token spanning several lines, like a
+    docstring, is closed at the end of each line and reopened on the next.
+
+    Args:
+        source (str): Source code with '\\n' line endings
+        highlight (bool): Add highlighting spans (False = escape only)
+
+    Returns:
+        list: HTML of each line, without the line break
+    """
+    if not highlight:
+        segments = [(None, source)]
+    elif PYGMENTS_AVAILABLE:
+        segments = _pygments_segments(source)
+    else:
+        segments = _tokenize_segments(source)
+
+    lines = []
+    current = []
+    for css, text in segments:
+        parts = text.split('\n')
+        for index, part in enumerate(parts):
+            if index:
+                lines.append(''.join(current))
+                current = []
+            if part:
+                escaped = html.escape(part, quote=False)
+                current.append(f'<span class="{css}">{escaped}</span>' if css else escaped)
+    lines.append(''.join(current))
+
+    if source.endswith('\n'):
+        lines.pop()  # No line after the final line break
+    return lines
+
+class SourceRenderer:
+    """Highlights tool sources and serves them in line windows"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self._rendered = OrderedDict()  # content hash -> (lines, highlighted)
+        self._versions = {}             # path -> (mtime_ns, size, content hash)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def window(self, file_path: str, start: int = 1, end: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get highlighted lines of a file.
+
+        Args:
+            file_path (str): Path to the source file
+            start (int): First line, counting from 1
+            end (int): Last line, inclusive (None = start + MAX_WINDOW - 1)
+
+        Returns:
+            dict: hash, start, end, total_lines, highlighted and lines (HTML strings).
+                  end is clamped to the file length and to MAX_WINDOW lines.
+
+        Raises:
+            OSError: If the file cannot be read
+            UnicodeDecodeError: If the file is not UTF-8
+        """
+        content_hash, lines, highlighted = self._render(file_path)
+
+        start = max(1, start)
+        last = start + self.settings['MAX_WINDOW'] - 1
+        end = min(end if end is not None else last, last, len(lines))
+
+        return {
+            "hash": content_hash,
+            "start": start,
+            "end": max(end, start - 1),
+            "total_lines": len(lines),
+            "highlighted": highlighted,
+            "lines": lines[start - 1:end]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._rendered),
+                "hits": self.hits,
+                "renders": self.renders,
+                "highlighter": "pygments" if PYGMENTS_AVAILABLE else "tokenize"
+            }
+
+    def _render(self, file_path) -> Tuple[str, List[str], bool]:
+        """Rendered lines of a file, from the cache when its content is known"""
+        st = os.stat(file_path)
+        with self._lock:
+            version = self._versions.get(file_path)
+            if version and version[:2] == (st.st_mtime_ns, st.st_size) and version[2] in self._rendered:
+                self._rendered.move_to_end(version[2])
+                self.hits += 1
+                return (version[2],) + self._rendered[version[2]]
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        content_hash = hashlib.md5(data).hexdigest()
+
+        with self._lock:
+            self._versions[file_path] = (st.st_mtime_ns, st.st_size, content_hash)
+            cached = self._rendered.get(content_hash)
+            if cached is not None:
+                self._rendered.move_to_end(content_hash)
+                self.hits += 1
+                return (content_hash,) + cached
+
+        source = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        highlighted = len(data) <= self.settings['MAX_HIGHLIGHT_SIZE']
+        lines = render_lines(source, highlighted)
+
+        with self._lock:
+            self.renders += 1
+            self._rendered[content_hash] = (lines, highlighted)
+            while len(self._rendered) > self.settings['MAX_ENTRIES']:
+                self._rendered.popitem(last=False)
+        return content_hash, lines, highlighted
+
+# Global renderer instance
+_renderer = None
+
+def get_source_renderer(settings=None) -> SourceRenderer:
+    """
+    Get the shared source renderer.
+    Uses a singleton renderer instance.
+
+    Args:
+        settings (dict): Settings used when the renderer is first created
+
+    Returns:
+        SourceRenderer: The shared renderer
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = SourceRenderer(settings)
+
+    return _renderer
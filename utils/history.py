@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+History module for PySnip Web Interface
+---------------------------------------
+Server-side record of tool executions. Results are written to SQLite by a
+background thread, which also expires old rows, and rolling per-tool
+latency and failure statistics are kept in memory for cheap lookups.
+Parameters and client addresses are not stored.
+"""
+
+import os
+import math
+import time
+import queue
+import sqlite3
+import threading
+import logging
+from collections import deque
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default history settings
+DEFAULT_SETTINGS = {
+    'STATS_WINDOW': 200,    # Number of recent runs per tool used for rolling statistics
+    'MAX_PAGE_SIZE': 200,   # Maximum number of rows returned by one query
+    'BATCH_SIZE': 100,      # Maximum rows written per transaction
+    'MAX_AGE': 30 * 86400,  # Seconds an execution is kept (0 = no age limit)
+    'MAX_ROWS': 100000,     # Most executions kept (0 = no row limit)
+    'PRUNE_INTERVAL': 600,  # Seconds between expiry passes of the writer thread
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    queue_wait REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    return_code INTEGER,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_executions_tool ON executions (tool, id);
+CREATE INDEX IF NOT EXISTS idx_executions_time ON executions (started_at);
+CREATE INDEX IF NOT EXISTS idx_executions_status ON executions (status, id);
+"""
+
+# Columns returned by queries (databases of earlier versions have more)
+COLUMNS = ('id', 'tool', 'started_at', 'duration', 'queue_wait', 'status', 'return_code', 'cached')
+
+def result_status(result: Dict[str, Any]) -> str:
+    """Classify an execution result as success, timeout or failed"""
+    if result.get('success'):
+        return 'success'
+    if result.get('timeout'):
+        return 'timeout'
+    return 'failed'
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class HistoryStore:
+    """SQLite-backed execution history with rolling per-tool aggregates"""
+
+    def __init__(self, db_path: str, settings=None):
+        """Initialize with the database path and custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._windows: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            self._scrub(conn)
+            self._prune(conn)
+        self._load_windows()
+
+        self._thread = threading.Thread(target=self._run, name="pysnip-history", daemon=True)
+        self._thread.start()
+
+    def record(self, tool: str, result: Dict[str, Any]):
+        """
+        Queue an execution for storage without blocking the caller.
+
+        Args:
+            tool (str): Relative path of the tool
+            result (dict): Execution result
+        """
+        # A cache hit reports the run time of the run it came from, not its own
+        duration = 0.0 if result.get('cached') else float(result.get('execution_time') or 0)
+        row = (
+            tool,
+            time.time() - duration,
+            duration,
+            float(result.get('queue_wait_time') or 0),
+            result_status(result),
+            result.get('return_code'),
+            1 if result.get('cached') else 0
+        )
+        self._queue.put(row)
+
+    def query(self, tool: Optional[str] = None, status: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[int] = None, limit: int = 50) -> Dict[str, Any]:
+        """
+        Query executions newest first with keyset pagination.
+
+        Args:
+            tool (str): Only executions of this tool
+            status (str): Only executions with this status
+            since (float): Only executions started at or after this timestamp
+            until (float): Only executions started before this timestamp
+            cursor (int): Continue after this execution id
+            limit (int): Page size
+
+        Returns:
+            dict: Items and the cursor for the next page (None on the last page)
+        """
+        limit = max(1, min(int(limit), self.settings['MAX_PAGE_SIZE']))
+        clauses = []
+        args: List[Any] = []
+        for clause, value in (("tool = ?", tool), ("status = ?", status),
+                              ("started_at >= ?", since), ("started_at < ?", until),
+                              ("id < ?", cursor)):
+            if value is not None:
+                clauses.append(clause)
+                args.append(value)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM executions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit + 1)
+
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(sql, args).fetchall()
+
+        items = [self._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = items[-1]['id'] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def tool_stats(self, tool: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Rolling duration percentiles and failure rates per tool.
+
+        Args:
+            tool (str): Only this tool (None = all tools)
+
+        Returns:
+            dict: Statistics keyed by tool path
+        """
+        with self._lock:
+            windows = {t: list(w) for t, w in self._windows.items() if tool is None or t == tool}
+
+        stats = {}
+        for tool_path, runs in windows.items():
+            durations = sorted(duration for duration, _ in runs)
+            failures = sum(1 for _, failed in runs if failed)
+            stats[tool_path] = {
+                "runs": len(runs),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "p99": percentile(durations, 99),
+                "mean": sum(durations) / len(durations) if durations else None,
+                "failure_rate": failures / len(runs) if runs else 0.0
+            }
+        return stats
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until queued records have been written"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _row_to_dict(self, row):
+        item = dict(row)
+        item['cached'] = bool(item['cached'])
+        return item
+
+    def _scrub(self, conn):
+        """Clear parameters and client addresses stored by earlier versions"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(executions)")}
+        for column in ('client', 'params'):
+            if column in columns:
+                with conn:
+                    conn.execute(f"UPDATE executions SET {column} = NULL WHERE {column} IS NOT NULL")
+
+    def _prune(self, conn):
+        """Delete executions past the age and row limits"""
+        try:
+            with conn:
+                if self.settings['MAX_AGE']:
+                    conn.execute("DELETE FROM executions WHERE started_at < ?",
+                                 (time.time() - self.settings['MAX_AGE'],))
+                if self.settings['MAX_ROWS']:
+                    conn.execute(
+                        "DELETE FROM executions WHERE id <= "
+                        "(SELECT id FROM executions ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.settings['MAX_ROWS'],)
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Error expiring execution history: {e}")
+
+    def _observe(self, tool, duration, status, cached):
+        """Add a run to the rolling window of its tool"""
+        if cached:
+            return
+        with self._lock:
+            window = self._windows.get(tool)
+            if window is None:
+                window = self._windows[tool] = deque(maxlen=self.settings['STATS_WINDOW'])
+            window.append((duration, status != 'success'))
+
+    def _load_windows(self):
+        """Rebuild rolling windows from the most recent stored runs"""
+        sql = """
+            SELECT tool, duration, status FROM (
+                SELECT tool, duration, status, id,
+                       ROW_NUMBER() OVER (PARTITION BY tool ORDER BY id DESC) AS rn
+                FROM executions WHERE cached = 0
+            ) WHERE rn <= ? ORDER BY id
+        """
+        try:
+            with closing(self._connect()) as conn:
+                for tool, duration, status in conn.execute(sql, (self.settings['STATS_WINDOW'],)):
+                    self._observe(tool, duration, status, False)
+        except sqlite3.Error as e:
+            logger.warning(f"Error loading execution history statistics: {e}")
+
+    def _run(self):
+        """Write queued records in batches and expire old ones"""
+        conn = self._connect()
+        last_prune = time.monotonic()
+        while True:
+            try:
+                items = [self._queue.get(timeout=self.settings['PRUNE_INTERVAL'])]
+            except queue.Empty:
+                items = []
+            while len(items) < self.settings['BATCH_SIZE']:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [item for item in items if isinstance(item, tuple)]
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO executions (tool, started_at, duration, queue_wait, status, "
+                            "return_code, cached) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            rows
+                        )
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing execution history: {e}")
+
+                for row in rows:
+                    self._observe(row[0], row[2], row[4], row[6])
+
+            if time.monotonic() - last_prune >= self.settings['PRUNE_INTERVAL']:
+                self._prune(conn)
+                last_prune = time.monotonic()
+
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+# Global store instance
+_store = None
+
+def get_history_store(db_path: Optional[str] = None, settings=None) -> HistoryStore:
+    """
+    Get the shared history store.
+    Uses a singleton store instance.
+
+    Args:
+        db_path (str): Database path used when the store is first created
+        settings (dict): Settings used when the store is first created
+
+    Returns:
+        HistoryStore: The shared store
+    """
+    global _store
+    if _store is None:
+        if db_path is None:
+            db_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "cache",
+                "history.sqlite"
+            )
+        _store = HistoryStore(db_path, settings)
+
+    return _store
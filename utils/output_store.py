@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Output Store module for PySnip Web Interface
+--------------------------------------------
+Keeps the full stdout and stderr of executions on disk so results only need
+to carry a preview. Each stream is split into fixed-size chunks compressed
+independently with zlib, with an index of chunk offsets and line counts, so
+any byte or line range is served by decompressing only the chunks it spans.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import shutil
+import bisect
+import threading
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default output store settings
+DEFAULT_SETTINGS = {
+    'OUTPUT_DIR': None,                 # Where outputs are kept (None = cache/outputs in the app directory)
+    'TTL': 3600,                        # Time (in seconds) outputs stay available
+    'CHUNK_SIZE': 256 * 1024,           # Uncompressed bytes per compressed chunk
+    'COMPRESSION_LEVEL': 6,             # zlib level (1 = fastest, 9 = smallest)
+    'MAX_SIZE': 64 * 1024 * 1024,       # Most bytes stored per stream, the rest is dropped
+    'MAX_PAGE_SIZE': 1024 * 1024,       # Most bytes returned by one read
+    'CLEANUP_INTERVAL': 60,             # Minimum time (in seconds) between expiry sweeps
+}
+
+STREAMS = ('stdout', 'stderr')
+
+OUTPUT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+def _utf8_boundary(data: bytes) -> int:
+    """Length of data without a UTF-8 sequence cut off at its end"""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            continue  # Continuation byte, keep looking for the lead byte
+        if byte >= 0xC0:
+            expected = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if back < expected:
+                return len(data) - back
+        break
+    return len(data)
+
+class OutputWriter:
+    """Appends one output stream to a chunked, compressed file"""
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.settings = settings
+        self.size = 0
+        self.lines = 0
+        self.truncated = False
+        self._last_byte = b''
+        self._buffer = bytearray()
+        self._chunks = []  # [raw offset, compressed offset, compressed length, newlines before]
+        self._compressed = 0
+        self._file = open(path + '.z', 'wb')
+
+    def write(self, data: Union[str, bytes]):
+        """Append output, dropping whatever exceeds MAX_SIZE"""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='replace')
+        room = self.settings['MAX_SIZE'] - self.size - len(self._buffer)
+        if len(data) > room:
+            data = data[:max(0, room)]
+            self.truncated = True
+        if not data:
+            return
+
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.settings['CHUNK_SIZE']:
+            self._flush(self.settings['CHUNK_SIZE'])
+
+    def close(self) -> Dict[str, Any]:
+        """Write the remaining data and the index, and return the stream summary"""
+        if self._buffer:
+            self._flush(len(self._buffer))
+        self._file.close()
+
+        info = {
+            "size": self.size,
+            # A last line without a newline still counts
+            "lines": self.lines + (1 if self.size and self._last_byte != b'\n' else 0),
+            "truncated": self.truncated
+        }
+        with open(self.path + '.idx', 'w') as f:
+            json.dump(dict(info, newlines=self.lines, chunks=self._chunks), f)
+        return info
+
+    def _flush(self, length):
+        chunk = bytes(self._buffer[:length])
+        del self._buffer[:length]
+
+        compressed = zlib.compress(chunk, self.settings['COMPRESSION_LEVEL'])
+        self._file.write(compressed)
+        self._chunks.append([self.size, self._compressed, len(compressed), self.lines])
+
+        self.size += len(chunk)
+        self.lines += chunk.count(b'\n')
+        self._compressed += len(compressed)
+        self._last_byte = chunk[-1:]
+
+class OutputRecord:
+    """Outputs of one execution being written"""
+
+    def __init__(self, store, output_id):
+        self.store = store
+        self.id = output_id
+        self.directory = os.path.join(store.root, output_id)
+        os.makedirs(self.directory)
+        self._writers: Dict[str, OutputWriter] = {}
+
+    def writer(self, stream: str) -> OutputWriter:
+        """Get the writer of one stream (stdout or stderr)"""
+        if stream not in self._writers:
+            self._writers[stream] = OutputWriter(os.path.join(self.directory, stream), self.store.settings)
+        return self._writers[stream]
+
+    def close(self) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Finish every stream.
+
+        Returns:
+            tuple: (output_id, info) - info maps each stream to its size, line count and
+                   truncation flag; output_id is None when nothing was written
+        """
+        info = {stream: writer.close() for stream, writer in self._writers.items()}
+        if not any(stream_info['size'] for stream_info in info.values()):
+            self.discard()
+            return None, {}
+        return self.id, info
+
+    def discard(self):
+        """Drop the record, e.g. after a failed execution"""
+        for writer in self._writers.values():
+            writer._file.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+class OutputStore:
+    """Chunked, compressed on-disk store for execution outputs"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.root = self.settings['OUTPUT_DIR'] or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "cache",
+            "outputs"
+        )
+        os.makedirs(self.root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def create(self) -> OutputRecord:
+        """Start storing the outputs of an execution"""
+        self._maybe_cleanup()
+        return OutputRecord(self, uuid.uuid4().hex)
+
+    def save(self, streams: Dict[str, Union[str, bytes]]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Store complete outputs in one call.
+
+        Args:
+            streams (dict): Stream name -> output text or bytes
+
+        Returns:
+            tuple: (output_id, info), as OutputRecord.close()
+        """
+        record = self.create()
+        try:
+            for stream, data in streams.items():
+                record.writer(stream).write(data or b'')
+            return record.close()
+        except Exception:
+            record.discard()
+            raise
+
+    def info(self, output_id: str, stream: str) -> Optional[Dict[str, Any]]:
+        """Get the size, line count and truncation flag of a stored stream (None if unknown)"""
+        index = self._index(output_id, stream)
+        if index is None:
+            return None
+        return {key: index[key] for key in ("size", "lines", "truncated")}
+
+    def read_bytes(self, output_id: str, stream: str, offset: int = 0,
+                   length: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read a byte range of a stored stream.
+
+        The range is shortened so it never ends inside a UTF-8 sequence;
+        next_offset tells where the following page starts.
+
+        Args:
+            output_id (str): Output to read
+            stream (str): stdout or stderr
+            offset (int): First byte to return
+            length (int): Bytes to return (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            dict: text, offset, next_offset, size and eof, or None if the output is unknown
+        """
+        index = self._index(output_id, stream)
+        if index is None:
+            return None
+
+        offset = max(0, int(offset))
+        length = min(int(length or self.settings['MAX_PAGE_SIZE']), self.settings['MAX_PAGE_SIZE'])
+        end = min(offset + length, index['size'])
+
+        data = bytearray()
+        if offset < end:
+            first = bisect.bisect_right([chunk[0] for chunk in index['chunks']], offset) - 1
+            for raw_offset, chunk in self._iter_chunks(output_id, stream, index, first):
+                data.extend(chunk[max(0, offset - raw_offset):end - raw_offset])
+                if raw_offset + len(chunk) >= end:
+                    break
+
+        if offset + len(data) < index['size']:
+            del data[_utf8_boundary(data):]
+
+        next_offset = offset + len(data)
+        return {
+            "text": bytes(data).decode('utf-8', errors='replace'),
+            "offset": offset,
+            "next_offset": next_offset,
+            "size": index['size'],
+            "eof": next_offset >= index['size']
+        }
+
+    def read_lines(self, output_id: str, stream: str, line: int = 0,
+                   count: int = 500) -> Optional[Dict[str, Any]]:
+        """
+        Read a range of lines of a stored stream.
+
+        Args:
+            output_id (str): Output to read
+            stream (str): stdout or stderr
+            line (int): First line to return (0-based)
+            count (int): Lines to return (fewer if MAX_PAGE_SIZE is reached first)
+
+        Returns:
+            dict: text, line, next_line, offset, next_offset, lines, partial (text ends
+                  inside an over-long line) and eof, or None if the output is unknown
+        """
+        index = self._index(output_id, stream)
+        if index is None:
+            return None
+
+        line = max(0, int(line))
+        count = max(1, int(count))
+        total_lines = index['lines']
+        chunks = index['chunks']
+
+        # The chunk holding the newline that ends line - 1
+        first = 0
+        if line:
+            first = max(0, bisect.bisect_left([chunk[3] for chunk in chunks], line) - 1)
+
+        limit = self.settings['MAX_PAGE_SIZE']
+        data = bytearray()
+        start = None
+        found = 0
+        whole = 0  # Length of data up to its last complete line
+        partial = full = False
+        for raw_offset, chunk in self._iter_chunks(output_id, stream, index, first):
+            position = 0
+            if start is None:
+                skip = line - chunks[first][3] if line else 0
+                while skip and position < len(chunk):
+                    newline = chunk.find(b'\n', position)
+                    if newline < 0:
+                        position = len(chunk)
+                        break
+                    position = newline + 1
+                    skip -= 1
+                if skip:
+                    first += 1
+                    continue  # Line starts in a later chunk
+                start = raw_offset + position
+
+            while position < len(chunk) and found < count and not (partial or full):
+                newline = chunk.find(b'\n', position)
+                piece_end = len(chunk) if newline < 0 else newline + 1
+                room = limit - len(data)
+                if piece_end - position > room:
+                    if not found:
+                        # A single line longer than a page: return its start,
+                        # the caller continues with read_bytes() from next_offset
+                        data.extend(chunk[position:position + room])
+                        del data[_utf8_boundary(data):]
+                        partial = True
+                    else:
+                        full = True  # Page is full, stop at the last whole line
+                        del data[whole:]
+                    break
+                data.extend(chunk[position:piece_end])
+                position = piece_end
+                if newline >= 0:
+                    found += 1
+                    whole = len(data)
+            if found >= count or partial or full:
+                break
+
+        if start is None:
+            start = index['size']
+        if data and not (partial or full) and not data.endswith(b'\n') and start + len(data) >= index['size']:
+            found += 1  # Last line without a trailing newline
+
+        next_line = min(line + found, total_lines)
+        next_offset = start + len(data)
+        return {
+            "text": bytes(data).decode('utf-8', errors='replace'),
+            "line": line,
+            "next_line": next_line,
+            "offset": start,
+            "next_offset": next_offset,
+            "lines": total_lines,
+            "partial": partial,
+            "eof": next_offset >= index['size']
+        }
+
+    def iter_raw(self, output_id: str, stream: str) -> Optional[Iterator[bytes]]:
+        """Iterate over the decompressed chunks of a stored stream (None if unknown)"""
+        index = self._index(output_id, stream)
+        if index is None:
+            return None
+        return (chunk for _, chunk in self._iter_chunks(output_id, stream, index, 0))
+
+    def stats(self) -> Dict[str, int]:
+        """Get store counters"""
+        outputs = stored = compressed = 0
+        for entry in os.scandir(self.root):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            outputs += 1
+            for stream in STREAMS:
+                index = self._index(entry.name, stream)
+                if index:
+                    stored += index['size']
+                    compressed += sum(chunk[2] for chunk in index['chunks'])
+        return {"outputs": outputs, "bytes": stored, "compressed_bytes": compressed}
+
+    def _stream_path(self, output_id, stream):
+        if not OUTPUT_ID_PATTERN.match(output_id or '') or stream not in STREAMS:
+            return None
+        return os.path.join(self.root, output_id, stream)
+
+    def _index(self, output_id, stream):
+        path = self._stream_path(output_id, stream)
+        if path is None:
+            return None
+        try:
+            if time.time() - os.stat(os.path.dirname(path)).st_mtime > self.settings['TTL']:
+                return None
+            with open(path + '.idx') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _iter_chunks(self, output_id, stream, index, first):
+        """Yield (raw offset, data) for the chunks of a stream starting at chunk number first"""
+        with open(self._stream_path(output_id, stream) + '.z', 'rb') as f:
+            for raw_offset, compressed_offset, compressed_length, _ in index['chunks'][first:]:
+                f.seek(compressed_offset)
+                yield raw_offset, zlib.decompress(f.read(compressed_length))
+
+    def _maybe_cleanup(self):
+        """Remove expired outputs, at most once per CLEANUP_INTERVAL"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_cleanup < self.settings['CLEANUP_INTERVAL']:
+                return
+            self._last_cleanup = now
+
+        for entry in os.scandir(self.root):
+            try:
+                if entry.is_dir(follow_symlinks=False) and now - entry.stat().st_mtime > self.settings['TTL']:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
+
+# Global store instance
+_store = None
+
+def get_output_store(settings=None) -> OutputStore:
+    """
+    Get the shared output store.
+    Uses a singleton store instance.
+
+    Args:
+        settings (dict): Settings used when the store is first created
+
+    Returns:
+        OutputStore: The shared store
+    """
+    global _store
+    if _store is None:
+        _store = OutputStore(settings)
+
+    return _store
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parse Store module for PySnip Web Interface
+-------------------------------------------
+Persistent record of parsed tool documentation and parameters. Entries are
+keyed by the content hash of the tool file and the parser version, so a
+restarted process serves /docs and /parameters without parsing anything,
+and a parser change invalidates every entry at once.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default parse store settings
+DEFAULT_SETTINGS = {
+    'MAX_ROWS': 10000,      # Most entries kept; the least recently written are trimmed first
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parses (
+    hash TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (hash, version)
+);
+CREATE INDEX IF NOT EXISTS idx_parses_created ON parses (created_at);
+"""
+
+class ParseStore:
+    """SQLite-backed parse results keyed by (content hash, parser version)"""
+
+    def __init__(self, db_path: str, version: int, settings=None):
+        """Initialize with the database path, the parser version and custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.db_path = db_path
+        self.version = version
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            with conn:
+                removed = conn.execute("DELETE FROM parses WHERE version != ?", (version,)).rowcount
+        if removed:
+            logger.info(f"Dropped {removed} parse results of other parser versions")
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the parse result of a file version.
+
+        Args:
+            content_hash (str): MD5 of the file content
+
+        Returns:
+            dict: {"doc", "parameters"}, or None if the version was never stored
+        """
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT doc, parameters FROM parses WHERE hash = ? AND version = ?",
+                    (content_hash, self.version)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot read parse store: {e}")
+            return None
+
+        if row is None:
+            return None
+        return {"doc": json.loads(row[0]), "parameters": json.loads(row[1])}
+
+    def put(self, content_hash: str, entry: Dict[str, Any]):
+        """
+        Store the parse result of a file version.
+
+        Args:
+            content_hash (str): MD5 of the file content
+            entry (dict): {"doc", "parameters"} as produced by the extraction engine
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO parses (hash, version, doc, parameters, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, self.version, json.dumps(entry["doc"]),
+                     json.dumps(entry["parameters"]), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot write parse store: {e}")
+
+    def known(self, hashes: Iterable[str]) -> Set[str]:
+        """Subset of the given content hashes that have a stored result"""
+        hashes = list(hashes)
+        found = set()
+        try:
+            with closing(self._connect()) as conn:
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT hash FROM parses WHERE version = ? AND hash IN ({','.join('?' * len(batch))})",
+                        [self.version] + batch
+                    ).fetchall()
+                    found.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot read parse store: {e}")
+        return found
+
+    def trim(self):
+        """Remove the oldest entries beyond MAX_ROWS"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM parses WHERE rowid IN "
+                    "(SELECT rowid FROM parses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.settings['MAX_ROWS'],)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot trim parse store: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Get store counters"""
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute("SELECT COUNT(*) FROM parses").fetchone()[0]
+        except sqlite3.Error:
+            rows = 0
+        return {"rows": rows}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Process Control module for PySnip Web Interface
+-----------------------------------------------
+Process-group lifecycle helpers for tool executions: a single shared timeout
+scheduler, SIGTERM-to-SIGKILL escalation for whole process groups, and a
+periodic reaper for descendants left behind by finished tools.
+"""
+
+import os
+import time
+import heapq
+import signal
+import itertools
+import threading
+import platform
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Process groups are only available on POSIX systems
+PROCESS_GROUPS_SUPPORTED = platform.system() != 'Windows'
+
+class TimeoutScheduler:
+    """Runs callbacks at deadlines from one shared thread"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, delay: float, callback: Callable, *args) -> List[Any]:
+        """
+        Schedule a callback to run after a delay.
+
+        Args:
+            delay (float): Delay in seconds
+            callback (callable): Function to call
+            *args: Arguments for the callback
+
+        Returns:
+            list: A handle that can be passed to cancel()
+        """
+        entry = [time.monotonic() + delay, next(self._counter), callback, args, False]
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pysnip-timeouts", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return entry
+
+    def cancel(self, entry: List[Any]):
+        """Cancel a scheduled callback"""
+        with self._condition:
+            entry[4] = True
+
+    def _run(self):
+        """Fire due callbacks until the process exits"""
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][4]:
+                    if self._heap:
+                        heapq.heappop(self._heap)
+                    else:
+                        self._condition.wait()
+
+                deadline, _, callback, args, _ = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                heapq.heappop(self._heap)
+
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Error in timeout callback: {e}", exc_info=True)
+
+def group_members(pgid: int) -> List[int]:
+    """
+    List the processes still in a process group.
+
+    Args:
+        pgid (int): Process group id
+
+    Returns:
+        list: PIDs of the group members (empty if none can be found)
+    """
+    members = []
+    if not os.path.isdir('/proc'):
+        return members
+
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                stat = f.read()
+            # Fields after the parenthesised command: state, ppid, pgrp, ...
+            fields = stat[stat.rindex(')') + 2:].split()
+            if int(fields[2]) == pgid and fields[0] != 'Z':
+                members.append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+
+    return members
+
+def group_alive(pgid: int) -> bool:
+    """Check whether any live (non-zombie) process remains in a process group"""
+    if os.path.isdir('/proc'):
+        return bool(group_members(pgid))
+
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def signal_group(pgid: int, sig: int) -> bool:
+    """
+    Send a signal to a whole process group.
+
+    Returns:
+        bool: True if the signal was delivered to at least one process
+    """
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except Exception as e:
+        logger.error(f"Error signalling process group {pgid}: {e}")
+        return False
+
+class ProcessReaper:
+    """Periodically kills descendants left behind by finished tool runs"""
+
+    def __init__(self, timeouts: TimeoutScheduler, interval: float = 5.0, grace_period: float = 3.0):
+        self.timeouts = timeouts
+        self.interval = interval
+        self.grace_period = grace_period
+        self._groups: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.reaped_count = 0
+
+    def terminate(self, pgid: int, label: str = ""):
+        """
+        Terminate a process group, escalating from SIGTERM to SIGKILL.
+
+        Args:
+            pgid (int): Process group id
+            label (str): Description used in log messages
+        """
+        if signal_group(pgid, signal.SIGTERM):
+            self.timeouts.schedule(self.grace_period, self._kill, pgid, label)
+
+    def watch(self, pgid: int, label: str = ""):
+        """Track a process group whose leader has exited"""
+        if not PROCESS_GROUPS_SUPPORTED:
+            return
+
+        with self._lock:
+            self._groups[pgid] = {"label": label, "since": time.time()}
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pysnip-reaper", daemon=True)
+                self._thread.start()
+
+    def stats(self) -> Dict[str, int]:
+        """Get reaper counters"""
+        with self._lock:
+            return {"watched_groups": len(self._groups), "reaped_groups": self.reaped_count}
+
+    def reap(self, pgid: int, label: str = ""):
+        """Report and terminate the leftover members of a process group"""
+        members = group_members(pgid)
+        logger.warning(
+            f"Reaping {len(members) or 'unknown number of'} leaked process(es) "
+            f"{members} from {label or f'group {pgid}'}"
+        )
+        self.terminate(pgid, label)
+        with self._lock:
+            self._groups.pop(pgid, None)
+            self.reaped_count += 1
+
+    def _kill(self, pgid, label):
+        """Force-kill whatever survived the SIGTERM grace period"""
+        if group_alive(pgid) and signal_group(pgid, signal.SIGKILL):
+            logger.warning(f"Process group {pgid} ({label}) ignored SIGTERM, sent SIGKILL")
+
+    def _run(self):
+        """Reap leaked descendants of watched groups"""
+        while True:
+            time.sleep(self.interval)
+
+            with self._lock:
+                groups = list(self._groups.items())
+
+            for pgid, info in groups:
+                if not group_alive(pgid):
+                    with self._lock:
+                        self._groups.pop(pgid, None)
+                    continue
+
+                self.reap(pgid, info['label'])
+
+# Global instances
+_timeouts = None
+_reaper = None
+
+def get_timeout_scheduler() -> TimeoutScheduler:
+    """Get the shared timeout scheduler"""
+    global _timeouts
+    if _timeouts is None:
+        _timeouts = TimeoutScheduler()
+    return _timeouts
+
+def get_reaper(interval: Optional[float] = None, grace_period: Optional[float] = None) -> ProcessReaper:
+    """
+    Get the shared process reaper.
+
+    Args:
+        interval (float): Seconds between reaper sweeps (first call only)
+        grace_period (float): Seconds between SIGTERM and SIGKILL (first call only)
+
+    Returns:
+        ProcessReaper: The shared reaper
+    """
+    global _reaper
+    if _reaper is None:
+        _reaper = ProcessReaper(
+            get_timeout_scheduler(),
+            interval=interval if interval is not None else 5.0,
+            grace_period=grace_period if grace_period is not None else 3.0
+        )
+    return _reaper
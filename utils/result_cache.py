@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Result Cache module for PySnip Web Interface
+--------------------------------------------
+Caches the results of deterministic tool runs so repeated identical
+executions are answered without spawning a process.
+"""
+
+import re
+import sys
+import copy
+import json
+import time
+import hashlib
+import platform
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default cache settings
+DEFAULT_SETTINGS = {
+    'TTL': 300,             # Lifetime of a cached result (in seconds)
+    'MAX_ENTRIES': 256,     # Maximum number of cached results
+    'CACHEABLE_TOOLS': [],  # Tool paths always treated as cacheable
+}
+
+# Docstring metadata line marking a tool as a pure function of its arguments,
+# e.g. "Cacheable: true" or "Deterministic: yes" in the Metadata section
+CACHEABLE_PATTERN = re.compile(r'^\s*(?:Cacheable|Deterministic)\s*:\s*(?:true|yes|1)\s*$', re.IGNORECASE | re.MULTILINE)
+
+def docstring_marks_cacheable(doc_info: Dict[str, Any]) -> bool:
+    """
+    Check whether parsed documentation declares a tool cacheable.
+
+    Args:
+        doc_info (dict): Result of extract_docstring()
+
+    Returns:
+        bool: True if the docstring metadata opts the tool into caching
+    """
+    raw = doc_info.get('raw') or ''
+    return CACHEABLE_PATTERN.search(raw) is not None
+
+class ResultCache:
+    """TTL and size-bounded LRU cache of tool execution results"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self._entries = OrderedDict()
+        self._cacheable = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, tool_hash: str, params: Optional[Dict[str, Any]], interpreter: str = sys.executable) -> str:
+        """
+        Build the cache key for one tool invocation.
+
+        Args:
+            tool_hash (str): Content hash of the tool from the catalog
+            params (dict): Parameters of the invocation, in any order
+            interpreter (str): Path of the interpreter running the tool
+
+        Returns:
+            str: Cache key
+        """
+        key_data = json.dumps([
+            tool_hash,
+            sorted((params or {}).items()),
+            interpreter,
+            platform.python_version()
+        ], default=str)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def is_cacheable(self, tool: Dict[str, Any], load_docs) -> bool:
+        """
+        Decide whether a tool may be served from the cache.
+
+        Args:
+            tool (dict): Tool entry from the catalog
+            load_docs (callable): Returns the parsed docs of the tool
+
+        Returns:
+            bool: True if results of the tool may be cached
+        """
+        if tool.get('relative_path') in self.settings['CACHEABLE_TOOLS']:
+            return True
+
+        tool_hash = tool.get('hash')
+        with self._lock:
+            if tool_hash in self._cacheable:
+                return self._cacheable[tool_hash]
+
+        try:
+            cacheable = docstring_marks_cacheable(load_docs())
+        except Exception as e:
+            logger.warning(f"Error reading cache metadata for {tool.get('relative_path')}: {e}")
+            cacheable = False
+
+        with self._lock:
+            self._cacheable[tool_hash] = cacheable
+        return cacheable
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached result, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry['time'] > self.settings['TTL']:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry['result'])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a successful result"""
+        if not result.get('success'):
+            return
+
+        with self._lock:
+            self._entries[key] = {'result': copy.deepcopy(result), 'time': time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings['MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters"""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# Global cache instance
+_cache = None
+
+def get_result_cache(settings=None) -> ResultCache:
+    """
+    Get the shared result cache.
+    Uses a singleton cache instance.
+
+    Args:
+        settings (dict): Settings used when the cache is first created
+
+    Returns:
+        ResultCache: The shared cache
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResultCache(settings)
+
+    return _cache
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sandbox module for PySnip Web Interface
+---------------------------------------
+Runs tools inside unprivileged Linux namespaces created with unshare(1).
+Each run gets its own mount, pid, ipc and (optionally) network namespace,
+a read-only view of the whole filesystem (the app, other tools and the
+home directory included), a private tmpfs /tmp, and a workspace root that
+only shows its own workspace, the only writable directory besides /tmp.
+No container runtime is involved, so the sandbox adds only a few
+milliseconds per run.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import threading
+import logging
+from typing import List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default sandbox settings
+DEFAULT_SETTINGS = {
+    'UNSHARE_PATH': 'unshare',  # unshare(1) from util-linux
+    'ISOLATE_NETWORK': True,    # Give tools an empty network namespace (loopback only, down)
+    'TMPFS_SIZE': '64m',        # Size limit of the private /tmp
+}
+
+# Runs as root of the new user namespace, in the interpreter of the tool, so
+# the mounts cost a few system calls instead of a chain of mount(8) processes.
+# Invoked as: python -c SANDBOX_BOOT pysnip-sandbox tool_dir workspace stage_dir hide_dir size
+#             [read-only paths...] -- <interpreter arguments of the tool>
+#
+# The private /tmp is assembled on stage_dir (an empty directory of our own)
+# together with bind mounts of the tool directory and the workspace, then
+# moved over /tmp. This keeps both reachable when they live under /tmp.
+SANDBOX_BOOT = r"""
+def _pysnip_sandbox():
+    import os, re, sys, ctypes, _signal
+
+    MS_RDONLY, MS_NOSUID, MS_NODEV, MS_NOEXEC = 1, 2, 4, 8
+    MS_REMOUNT, MS_NOATIME, MS_NODIRATIME = 32, 1024, 2048
+    MS_BIND, MS_MOVE, MS_RELATIME = 4096, 8192, 1 << 21
+    MNT_DETACH = 2
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.mount.argtypes = (ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_ulong, ctypes.c_char_p)
+
+    def mount(source, target, fstype=None, flags=0, data=None):
+        args = [os.fsencode(v) if v is not None else None for v in (source, target, fstype)]
+        if libc.mount(args[0], args[1], args[2], flags, os.fsencode(data) if data else None) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"mount {target}: {os.strerror(errno)}")
+
+    def make_readonly(target):
+        # Flags locked by the parent namespace must be repeated on remount
+        current = os.statvfs(target).f_flag
+        if current & os.ST_RDONLY:
+            return
+        flags = MS_REMOUNT | MS_BIND | MS_RDONLY
+        flags |= current & (MS_NOSUID | MS_NODEV | MS_NOEXEC | MS_NOATIME | MS_NODIRATIME)
+        if current & os.ST_RELATIME:
+            flags |= MS_RELATIME
+        mount(None, target, flags=flags)
+
+    def bind(source, target, readonly=False):
+        mount(source, target, flags=MS_BIND)
+        if readonly:
+            make_readonly(target)
+
+    def readonly_everywhere():
+        # Every mount, except the private /proc and /tmp with the staging binds on it
+        with open('/proc/self/mountinfo') as f:
+            points = {line.split()[4] for line in f}
+        for point in sorted(points):
+            point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), point)
+            if point in ('/tmp', '/proc') or point.startswith(('/proc/', '/tmp/.pysnip/')):
+                continue
+            try:
+                make_readonly(point)
+            except FileNotFoundError:
+                pass  # Below a mount point that was covered by another mount
+
+    args = sys.argv[2:]
+    tool_dir, workspace, stage, hide, size = args[:5]
+    separator = args.index('--', 5)
+    readonly, cmd = args[5:separator], args[separator + 1:]
+
+    try:
+        mount('tmpfs', stage, 'tmpfs', MS_NOSUID | MS_NODEV, f"size={size},mode=1777")
+        for name in ('tool', 'workspace'):
+            os.makedirs(os.path.join(stage, '.pysnip', name))
+        bind(tool_dir, os.path.join(stage, '.pysnip', 'tool'))
+        bind(workspace, os.path.join(stage, '.pysnip', 'workspace'))
+        mount(stage, '/tmp', flags=MS_MOVE)
+
+        for path in readonly:
+            if os.path.isdir(path):
+                bind(path, path, readonly=True)
+
+        if hide:
+            os.makedirs(hide, exist_ok=True)
+            mount('tmpfs', hide, 'tmpfs', MS_NOSUID | MS_NODEV, "mode=755")
+
+        os.makedirs(workspace, exist_ok=True)
+        os.makedirs(tool_dir, exist_ok=True)
+
+        # Nothing outside the workspace and the private /tmp stays writable
+        readonly_everywhere()
+
+        bind('/tmp/.pysnip/workspace', workspace)
+        bind('/tmp/.pysnip/tool', tool_dir, readonly=True)
+        for name in ('workspace', 'tool'):
+            libc.umount2(os.fsencode('/tmp/.pysnip/' + name), MNT_DETACH)
+            os.rmdir('/tmp/.pysnip/' + name)
+        os.rmdir('/tmp/.pysnip')
+        os.chdir(workspace)
+    except OSError as e:
+        sys.stderr.write(f"Sandbox setup failed: {e}\n")
+        sys.exit(125)
+
+    # As PID 1 of its namespace the tool would ignore SIGTERM without a handler
+    _signal.signal(_signal.SIGTERM, lambda signum, frame: os._exit(128 + signum))
+
+    if cmd and cmd[0] == '-c':
+        source, path = cmd[1], '<string>'
+        sys.argv = ['-c'] + cmd[2:]
+    else:
+        path = cmd[0]
+        sys.argv = cmd
+        sys.path[0] = os.path.dirname(os.path.realpath(path))
+        with open(path, 'rb') as f:
+            source = f.read()
+        globals()['__file__'] = path
+
+    del globals()['_pysnip_sandbox']
+    return compile(source, path, 'exec')
+exec(_pysnip_sandbox())
+"""
+
+# Marker argument used to recognize sandboxed command lines
+SCRIPT_NAME = 'pysnip-sandbox'
+
+def unwrap_command(cmd: List[str]) -> List[str]:
+    """
+    Get the tool command line from a sandboxed command line.
+
+    Args:
+        cmd (list): Command line, sandboxed or not
+
+    Returns:
+        list: The command executed inside the sandbox (cmd itself if not sandboxed)
+    """
+    if SCRIPT_NAME in cmd and '--' in cmd:
+        start = cmd.index(SCRIPT_NAME)
+        return [cmd[start - 3]] + cmd[cmd.index('--', start) + 1:]
+    return cmd
+
+class NamespaceSandbox:
+    """Wraps tool command lines so they run in fresh Linux namespaces"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.unshare = shutil.which(self.settings['UNSHARE_PATH'])
+        self._available = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Check once whether unprivileged namespaces can be created here"""
+        with self._lock:
+            if self._available is None:
+                self._available = self._probe()
+                if not self._available:
+                    logger.warning("Namespace sandbox unavailable, tools run without isolation")
+            return self._available
+
+    def wrap(self, cmd: List[str], tool_dir: str, working_dir: str, stage_dir: str,
+             hide_dir: Optional[str] = None, readonly_paths: Optional[List[str]] = None) -> List[str]:
+        """
+        Build the command line that runs a command inside the sandbox.
+
+        Args:
+            cmd (list): Command line of the tool, starting with its Python interpreter
+            tool_dir (str): Directory of the tool, mounted read-only
+            working_dir (str): Workspace of this run, the only writable directory besides /tmp
+            stage_dir (str): Empty directory used to assemble the private /tmp
+            hide_dir (str): Directory replaced by an empty tmpfs except for the workspace
+            readonly_paths (list): Additional directories mounted read-only
+
+        Returns:
+            list: The sandboxed command line
+        """
+        os.makedirs(stage_dir, exist_ok=True)
+
+        wrapped = [
+            self.unshare, '--user', '--map-root-user', '--mount', '--pid', '--fork',
+            '--kill-child', '--mount-proc', '--ipc'
+        ]
+        if self.settings['ISOLATE_NETWORK']:
+            wrapped.append('--net')
+
+        # The interpreter of the tool sets up the mounts, then runs the tool itself
+        wrapped += [cmd[0], '-c', SANDBOX_BOOT, SCRIPT_NAME,
+                    os.path.realpath(tool_dir), os.path.realpath(working_dir),
+                    os.path.realpath(stage_dir), os.path.realpath(hide_dir) if hide_dir else '',
+                    str(self.settings['TMPFS_SIZE'])]
+        wrapped += [os.path.realpath(path) for path in (readonly_paths or [])]
+        return wrapped + ['--'] + list(cmd[1:])
+
+    def _probe(self):
+        """Run a trivial command through the full sandbox setup"""
+        if not self.unshare or not sys.platform.startswith('linux'):
+            return False
+
+        root = tempfile.mkdtemp(prefix="pysnip_sandbox_probe_")
+        try:
+            tool_dir = os.path.join(root, "tool")
+            workspace = os.path.join(root, "workspaces", "ws")
+            os.makedirs(tool_dir)
+            os.makedirs(workspace)
+            cmd = self.wrap([sys.executable, '-c', 'pass'], tool_dir, workspace, os.path.join(root, "stage"),
+                            os.path.dirname(workspace))
+            result = subprocess.run(cmd, capture_output=True, timeout=10)
+            if result.returncode != 0:
+                logger.debug(f"Sandbox probe failed: {result.stderr.decode(errors='replace').strip()}")
+            return result.returncode == 0
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Sandbox probe failed: {e}")
+            return False
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+# Global sandbox instance
+_sandbox = None
+
+def get_sandbox(settings=None) -> NamespaceSandbox:
+    """
+    Get the shared namespace sandbox.
+    Uses a singleton sandbox instance.
+
+    Args:
+        settings (dict): Settings used when the sandbox is first created
+
+    Returns:
+        NamespaceSandbox: The shared sandbox
+    """
+    global _sandbox
+    if _sandbox is None:
+        _sandbox = NamespaceSandbox(settings)
+
+    return _sandbox
+
+def benchmark(runs=50):
+    """
+    Compare launch overhead of direct and sandboxed execution.
+
+    Args:
+        runs (int): Launches per mode
+
+    Returns:
+        dict: Median and p95 wall time (in milliseconds) per mode
+    """
+    sandbox = get_sandbox()
+    if not sandbox.available():
+        raise RuntimeError("Namespace sandbox is not available on this system")
+
+    root = tempfile.mkdtemp(prefix="pysnip_sandbox_bench_")
+    try:
+        tool_dir = os.path.join(root, "tool")
+        workspace = os.path.join(root, "workspaces", "ws")
+        os.makedirs(tool_dir)
+        os.makedirs(workspace)
+        script = os.path.join(tool_dir, "noop.py")
+        with open(script, 'w') as f:
+            f.write("pass\n")
+
+        modes = {
+            "direct": [sys.executable, script],
+            "sandboxed": sandbox.wrap([sys.executable, script], tool_dir, workspace,
+                                      os.path.join(root, "stage"), os.path.dirname(workspace)),
+        }
+
+        results = {}
+        for name, cmd in modes.items():
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(cmd, cwd=workspace, check=True, capture_output=True)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                "median_ms": timings[len(timings) // 2],
+                "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            }
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    # Benchmark sandbox overhead against direct execution
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    try:
+        results = benchmark(runs)
+        for name, timing in results.items():
+            print(f"{name:>10}: median {timing['median_ms']:.1f} ms, p95 {timing['p95_ms']:.1f} ms")
+        overhead = results["sandboxed"]["median_ms"] - results["direct"]["median_ms"]
+        print(f"  overhead: {overhead:.1f} ms per launch ({runs} runs each)")
+    except Exception as e:
+        print(f"Error: {e}")
@@ -15,14 +15,17 @@ from datetime import datetime
 import hashlib
 import time
 
+from utils.bytecode import get_bytecode_cache
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
 class DirectoryScanner:
     """Class for scanning directories and managing scan state"""
     
-    def __init__(self, root_path):
+    def __init__(self, root_path, precompile=True):
         self.root_path = root_path
+        self.precompile = precompile
         self.last_scan_time = 0
         self._catalog = None
         self._cache_file = os.path.join(
@@ -52,6 +55,7 @@ class DirectoryScanner:
                         logger.info(f"Using catalog from cache (created {datetime.fromtimestamp(cache_time)})")
                         self._catalog = cached_catalog
                         self.last_scan_time = time.time()
+                        self._precompile_tools(self._catalog)
                         return self._catalog
             except Exception as e:
                 logger.warning(f"Error loading catalog from cache: {e}")
@@ -60,6 +64,7 @@ class DirectoryScanner:
         logger.info(f"Performing fresh scan of {self.root_path}")
         self._catalog = self._scan_directory()
         self.last_scan_time = time.time()
+        self._precompile_tools(self._catalog)
         
         # Save to cache
         try:
@@ -72,6 +77,30 @@ class DirectoryScanner:
         
         return self._catalog
     
+    def _precompile_tools(self, catalog):
+        """Compile the scripts of every tool into the bytecode cache and prune what is left over"""
+        if not self.precompile:
+            return
+        
+        bytecode = get_bytecode_cache()
+        compiled = 0
+        scripts = set()
+        for category in catalog.get("categories", []):
+            for tool in category.get("tools", []):
+                tool_dir = os.path.join(self.root_path, category["name"], tool["directory"])
+                compiled += bytecode.compile_tool(tool_dir, tool["script"], tool.get("all_scripts", []))
+                try:
+                    scripts.add(bytecode.script_pyc(os.path.join(tool_dir, tool["script"])))
+                except OSError:
+                    pass
+        
+        if compiled:
+            logger.info(f"Precompiled {compiled} tool scripts")
+        
+        removed = bytecode.prune(scripts, self.root_path)
+        if removed:
+            logger.info(f"Removed {removed} stale bytecode files")
+    
     def _has_modified_files(self, dir_path, timestamp):
         """Check if any files in the directory have been modified since the timestamp"""
         if not os.path.exists(dir_path):
@@ -154,6 +183,7 @@ class DirectoryScanner:
                                   if any(f.endswith(ext) for ext in ['.pdf', '.md', '.txt', '.docx', '.html'])]
                     
                     guide_file = guide_files[0] if guide_files else None
+                    guide_hash = self._hash_file(os.path.join(tool_dir_path, guide_file)) if guide_file else None
                     
                     # Find additional resources
                     resource_files = [f for f in os.listdir(tool_dir_path)
@@ -179,6 +209,7 @@ class DirectoryScanner:
                         "script": main_script,
                         "guide": guide_file,
                         "guide_path": f"{item}/{tool_dir}/{guide_file}" if guide_file else None,
+                        "guide_hash": guide_hash,
                         "resources": resource_files,
                         "complete": is_complete,
                         "file_size": file_size,
@@ -258,7 +289,7 @@ class DirectoryScanner:
 # Global scanner instance
 _scanner = None
 
-def scan_pysnip_directory(root_path, force=False):
+def scan_pysnip_directory(root_path, force=False, precompile=True):
     """
     Scan the PySnip directory structure and build a catalog of available tools.
     Uses a singleton scanner instance for caching.
@@ -266,13 +297,14 @@ def scan_pysnip_directory(root_path, force=False):
     Args:
         root_path (str): Path to the PySnip root directory
         force (bool): Force a fresh scan even if cached results are available
+        precompile (bool): Compile tool scripts into the bytecode cache
         
     Returns:
         dict: A dictionary containing the catalog structure
     """
     global _scanner
     if _scanner is None or _scanner.root_path != root_path:
-        _scanner = DirectoryScanner(root_path)
+        _scanner = DirectoryScanner(root_path, precompile)
     
     return _scanner.scan(force=force)
 
@@ -385,6 +417,32 @@ def get_related_tools(catalog, category_name, count=5):
     
     return sorted_tools[:count]
 
+def get_catalog_files(catalog):
+    """
+    Get every file the catalog knows about, for serving tool files as-is.
+    
+    Args:
+        catalog (dict): The PySnip catalog
+        
+    Returns:
+        dict: Relative path of each script, guide and resource -> its kind
+    """
+    files = {}
+    if not catalog or not catalog.get('categories'):
+        return files
+    
+    for category in catalog["categories"]:
+        for tool in category["tools"]:
+            tool_dir = f"{tool['category']}/{tool['directory']}"
+            for script in tool.get("all_scripts", []):
+                files[f"{tool_dir}/{script}"] = "script"
+            for resource in tool.get("resources", []):
+                files[f"{tool_dir}/{resource}"] = "resource"
+            if tool.get("guide_path"):
+                files[tool["guide_path"]] = "guide"
+    
+    return files
+
 if __name__ == "__main__":
     # Test the scanner with a sample path
     import sys
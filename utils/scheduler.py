@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler module for PySnip Web Interface
+-----------------------------------------
+Bounds the number of tool processes running at once and shares the
+available execution slots fairly between clients, or shortest-expected-first
+using durations learned from the execution history.
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default scheduler settings
+DEFAULT_SETTINGS = {
+    'MAX_CONCURRENT': os.cpu_count() or 1,  # Maximum number of tools running at once
+    'MAX_QUEUE_SIZE': 100,                  # Maximum number of queued executions
+    'QUEUE_TIMEOUT': 120,                   # Maximum time (in seconds) a job may wait for a slot
+    'CLIENT_WEIGHTS': {},                   # Per-client share of the pool (default weight is 1.0)
+    'MODE': 'fair',                         # 'fair' (weighted fair queuing) or 'duration' (shortest expected first)
+    'AGING_RATE': 1.0,                      # Seconds of expected duration forgiven per second spent queued
+}
+
+# Default duration model settings
+DEFAULT_DURATION_SETTINGS = {
+    'DEFAULT_DURATION': 5.0,    # Expected duration (in seconds) of tools without enough history
+    'MIN_SAMPLES': 20,          # Runs needed before history is trusted
+    'TIMEOUT_HEADROOM': 2.0,    # Adaptive timeout is p99 multiplied by this factor
+    'MIN_TIMEOUT': 5.0,         # Lower bound for adaptive timeouts (in seconds)
+    'MAX_TIMEOUT': 60.0,        # Global maximum execution time (in seconds)
+}
+
+# Lanes in dispatch order - jobs in earlier lanes always run first
+LANES = ('short', 'normal')
+
+class QueueFullException(Exception):
+    """Exception raised when the execution queue is full."""
+    pass
+
+class QueueTimeoutException(Exception):
+    """Exception raised when a job waits too long for an execution slot."""
+    pass
+
+class _Ticket:
+    """A queued request for an execution slot"""
+
+    __slots__ = ('client_id', 'lane', 'tag', 'seq', 'expected', 'enqueued', 'event', 'granted', 'cancelled')
+
+    def __init__(self, client_id, lane, tag, seq, expected=None):
+        self.client_id = client_id
+        self.lane = lane
+        self.tag = tag
+        self.seq = seq
+        self.expected = expected
+        self.enqueued = time.time()
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+    def sort_key(self):
+        return (LANES.index(self.lane), self.tag, self.seq)
+
+    def __lt__(self, other):
+        return self.sort_key() < other.sort_key()
+
+    def duration_key(self, now, aging_rate):
+        """Shortest-expected-first order, aged so long jobs cannot starve"""
+        expected = self.expected if self.expected is not None else 0.0
+        return (LANES.index(self.lane), expected - aging_rate * (now - self.enqueued), self.seq)
+
+class ExecutionScheduler:
+    """
+    Global concurrency limiter with weighted fair queuing between clients.
+
+    Every execution must hold a slot while it runs. When all slots are busy,
+    jobs are queued and dispatched by lane first (short tools ahead of normal
+    ones) and then by start-time fair queuing tags, so a client submitting
+    many jobs only receives its weighted share of the pool. In 'duration'
+    mode the job with the shortest expected run time goes first instead,
+    with its expected time reduced the longer it has been waiting.
+    """
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        self.max_concurrent = max(1, int(self.settings['MAX_CONCURRENT']))
+        self.mode = self.settings['MODE'] if self.settings['MODE'] in ('fair', 'duration') else 'fair'
+        self._lock = threading.Lock()
+        self._queue = []
+        self._pending = 0
+        self._running = 0
+        self._virtual_time = 0.0
+        self._finish_tags = {}
+        self._counter = itertools.count()
+
+    def run(self, func: Callable[[], Any], client_id: str = 'anonymous',
+            lane: str = 'normal', weight: Optional[float] = None,
+            expected_duration: Optional[float] = None) -> Tuple[Any, float]:
+        """
+        Run a function once an execution slot is available.
+
+        Args:
+            func (callable): The work to run while holding the slot
+            client_id (str): Identifier of the client submitting the job
+            lane (str): Scheduling lane ('short' or 'normal')
+            weight (float): Client weight, overrides CLIENT_WEIGHTS
+            expected_duration (float): Predicted run time, used in 'duration' mode
+
+        Returns:
+            tuple: The function result and the time (in seconds) spent queued
+        """
+        ticket = self._enqueue(client_id, lane, weight, expected_duration)
+
+        if not ticket.event.wait(timeout=self.settings['QUEUE_TIMEOUT']):
+            with self._lock:
+                if not ticket.granted:
+                    ticket.cancelled = True
+                    self._pending -= 1
+                    raise QueueTimeoutException(
+                        f"No execution slot available after {self.settings['QUEUE_TIMEOUT']} seconds"
+                    )
+
+        wait_time = time.time() - ticket.enqueued
+        try:
+            return func(), wait_time
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get a snapshot of the scheduler state"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "queued": self._pending
+            }
+
+    def _enqueue(self, client_id, lane, weight, expected_duration=None):
+        """Create a ticket and grant it immediately if a slot is free"""
+        if lane not in LANES:
+            lane = 'normal'
+        if weight is None:
+            weight = self.settings['CLIENT_WEIGHTS'].get(client_id, 1.0)
+        weight = max(float(weight), 0.01)
+
+        with self._lock:
+            if self._pending >= self.settings['MAX_QUEUE_SIZE']:
+                logger.warning(f"Execution queue full, rejecting job from {client_id}")
+                raise QueueFullException("Execution queue is full")
+
+            # Start-time fair queuing: a client's next job starts where its
+            # previous one finished, or at the current virtual time if idle
+            start_tag = max(self._virtual_time, self._finish_tags.get(client_id, 0.0))
+            self._finish_tags[client_id] = start_tag + 1.0 / weight
+
+            ticket = _Ticket(client_id, lane, start_tag, next(self._counter), expected_duration)
+            heapq.heappush(self._queue, ticket)
+            self._pending += 1
+            self._dispatch()
+
+        return ticket
+
+    def _release(self):
+        """Release a slot and hand it to the next queued job"""
+        with self._lock:
+            self._running -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots to queued jobs (caller must hold the lock)"""
+        while self._running < self.max_concurrent and self._queue:
+            ticket = self._pop_next()
+            if ticket.cancelled:
+                continue
+
+            self._virtual_time = max(self._virtual_time, ticket.tag)
+            self._pending -= 1
+            self._running += 1
+            ticket.granted = True
+            ticket.event.set()
+
+        # Forget idle clients whose tags are already behind the virtual time
+        if not self._queue and len(self._finish_tags) > 1000:
+            self._finish_tags = {
+                client: tag for client, tag in self._finish_tags.items()
+                if tag > self._virtual_time
+            }
+
+    def _pop_next(self):
+        """Remove the next ticket to dispatch from the queue"""
+        if self.mode != 'duration':
+            return heapq.heappop(self._queue)
+
+        # Aged priorities change over time, so pick by scanning the queue
+        now = time.time()
+        aging_rate = self.settings['AGING_RATE']
+        index = min(range(len(self._queue)),
+                    key=lambda i: self._queue[i].duration_key(now, aging_rate))
+        ticket = self._queue[index]
+        self._queue[index] = self._queue[-1]
+        self._queue.pop()
+        heapq.heapify(self._queue)
+        return ticket
+
+class DurationModel:
+    """Per-tool run time predictions and timeouts learned from execution history"""
+
+    def __init__(self, history, settings=None):
+        """
+        Initialize with a history store and custom settings.
+
+        Args:
+            history (HistoryStore): Source of recent per-tool run times
+            settings (dict): Duration model settings
+        """
+        self.settings = DEFAULT_DURATION_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+        self.history = history
+
+    def expected_duration(self, tool: str) -> float:
+        """
+        Predict how long a tool will run.
+
+        Args:
+            tool (str): Relative path of the tool
+
+        Returns:
+            float: Median of recent runs, or DEFAULT_DURATION without enough history
+        """
+        stats = self._stats(tool)
+        if stats is None:
+            return float(self.settings['DEFAULT_DURATION'])
+        return stats['p50']
+
+    def timeout_for(self, tool: str) -> float:
+        """
+        Derive the time limit for a tool.
+
+        Args:
+            tool (str): Relative path of the tool
+
+        Returns:
+            float: p99 of recent runs plus headroom, clamped to MIN_TIMEOUT..MAX_TIMEOUT
+        """
+        max_timeout = float(self.settings['MAX_TIMEOUT'])
+        stats = self._stats(tool)
+        if stats is None:
+            return max_timeout
+
+        # Timed-out runs are recorded at the limit they hit, so with headroom
+        # above 1 a tool that legitimately slows down grows its own limit again
+        timeout = stats['p99'] * self.settings['TIMEOUT_HEADROOM']
+        return min(max_timeout, max(float(self.settings['MIN_TIMEOUT']), timeout))
+
+    def _stats(self, tool):
+        """Rolling statistics of a tool, or None if there are too few runs"""
+        stats = self.history.tool_stats(tool).get(tool)
+        if not stats or stats['runs'] < self.settings['MIN_SAMPLES']:
+            return None
+        return stats
+
+# Global scheduler instance
+_scheduler = None
+
+def get_scheduler(settings=None):
+    """
+    Get the shared execution scheduler.
+    Uses a singleton scheduler instance.
+
+    Args:
+        settings (dict): Settings used when the scheduler is first created
+
+    Returns:
+        ExecutionScheduler: The shared scheduler
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ExecutionScheduler(settings)
+
+    return _scheduler
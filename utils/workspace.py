@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Workspace module for PySnip Web Interface
+-----------------------------------------
+Provides every tool execution with its own empty working directory.
+Directories are kept in a recycled pool, preferably on tmpfs, and are
+cleaned in the background so no file deletion happens on the request path.
+A workspace whose processes outlived their run is deleted, not recycled.
+"""
+
+import os
+import stat
+import queue
+import shutil
+import atexit
+import tempfile
+import threading
+import logging
+from collections import deque
+from typing import Optional
+
+from utils.process_control import group_alive
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default workspace settings
+DEFAULT_SETTINGS = {
+    'BASE_DIR': None,   # Parent directory for workspaces (None = tmpfs if available, else system temp)
+    'POOL_SIZE': 8,     # Number of clean workspaces kept ready
+}
+
+# Memory-backed locations tried before the system temp directory
+TMPFS_CANDIDATES = ['/dev/shm', '/run/shm']
+
+def find_workspace_base(preferred: Optional[str] = None) -> str:
+    """
+    Pick the parent directory for execution workspaces.
+
+    Args:
+        preferred (str): Explicit directory to use if it is writable
+
+    Returns:
+        str: A writable directory, preferring tmpfs mounts
+    """
+    candidates = [preferred] if preferred else []
+    candidates += TMPFS_CANDIDATES + [tempfile.gettempdir()]
+
+    for candidate in candidates:
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK | os.X_OK):
+            return candidate
+
+    return tempfile.gettempdir()
+
+def _empty_directory(path):
+    """Remove everything inside a directory, keeping the directory itself"""
+    # Tools may have made the directory or its contents read-only
+    os.chmod(path, stat.S_IRWXU)
+
+    def _on_error(func, failed_path, exc_info):
+        os.chmod(failed_path, stat.S_IRWXU)
+        func(failed_path)
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, onerror=_on_error)
+            else:
+                os.unlink(entry.path)
+
+class WorkspacePool:
+    """Pool of recycled, isolated working directories for tool executions"""
+
+    def __init__(self, settings=None):
+        """Initialize with custom settings"""
+        self.settings = DEFAULT_SETTINGS.copy()
+        if settings:
+            self.settings.update(settings)
+
+        base = find_workspace_base(self.settings['BASE_DIR'])
+        self.root = tempfile.mkdtemp(prefix="pysnip_ws_", dir=base)
+        self._free = deque()
+        self._lock = threading.Lock()
+        self._dirty = queue.Queue()
+        self._groups = {}  # workspace -> process groups of the runs it hosted
+        self._counter = 0
+
+        logger.info(f"Execution workspaces under {self.root}")
+
+        self._thread = threading.Thread(target=self._run, name="pysnip-workspaces", daemon=True)
+        self._thread.start()
+        self._dirty.put(None)  # Fill the pool in the background
+
+        atexit.register(self.close)
+
+    def acquire(self) -> str:
+        """
+        Get a clean workspace for one execution.
+
+        Returns:
+            str: Path to an empty directory owned by the caller until release()
+        """
+        with self._lock:
+            if self._free:
+                path = self._free.popleft()
+                if len(self._free) < self.settings['POOL_SIZE'] // 2:
+                    self._dirty.put(None)  # Top the pool back up
+                return path
+
+        # Pool drained faster than the cleaner could refill it
+        logger.debug("Workspace pool empty, creating a workspace on the request path")
+        return self._create()
+
+    def track(self, path: str, pgid: int):
+        """Record a process group running in a workspace of this pool"""
+        if os.path.dirname(path) == self.root:
+            with self._lock:
+                self._groups.setdefault(path, []).append(pgid)
+
+    def release(self, path: str):
+        """Hand a used workspace back for background cleanup and reuse"""
+        if path:
+            self._dirty.put(path)
+
+    def stats(self):
+        """Get pool counters"""
+        with self._lock:
+            return {"root": self.root, "free": len(self._free), "pending_cleanup": self._dirty.qsize()}
+
+    def close(self):
+        """Remove every workspace"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _create(self):
+        """Create a new workspace directory"""
+        with self._lock:
+            self._counter += 1
+            name = f"ws_{self._counter:06d}"
+        path = os.path.join(self.root, name)
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        return path
+
+    def _run(self):
+        """Clean released workspaces and keep the pool filled"""
+        while True:
+            path = self._dirty.get()
+
+            if path is not None:
+                with self._lock:
+                    pgids = self._groups.pop(path, [])
+
+                # Leaked processes would see, and could change, the next run's files
+                if any(group_alive(pgid) for pgid in pgids):
+                    logger.debug(f"Processes still run in workspace {path}, deleting it")
+                    shutil.rmtree(path, ignore_errors=True)
+                    path = None
+
+            if path is not None:
+                try:
+                    _empty_directory(path)
+                    with self._lock:
+                        if len(self._free) < self.settings['POOL_SIZE']:
+                            self._free.append(path)
+                            path = None
+                    if path is not None:
+                        shutil.rmtree(path, ignore_errors=True)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Error cleaning workspace {path}: {e}")
+                    shutil.rmtree(path, ignore_errors=True)
+
+            # Replenish the pool, counting workspaces that are about to be recycled
+            try:
+                while True:
+                    with self._lock:
+                        if len(self._free) + self._dirty.qsize() >= self.settings['POOL_SIZE']:
+                            break
+                    new_path = self._create()
+                    with self._lock:
+                        self._free.append(new_path)
+            except Exception as e:
+                logger.warning(f"Error creating workspace: {e}")
+
+# Global pool instance
+_pool = None
+
+def get_workspace_pool(settings=None) -> WorkspacePool:
+    """
+    Get the shared workspace pool.
+    Uses a singleton pool instance.
+
+    Args:
+        settings (dict): Settings used when the pool is first created
+
+    Returns:
+        WorkspacePool: The shared pool
+    """
+    global _pool
+    if _pool is None:
+        _pool = WorkspacePool(settings)
+
+    return _pool
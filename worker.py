@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PySnip Worker
+-------------------
+Standalone worker that executes PySnip tools for a PySnip Web server.
+The worker registers with the server, long-polls for jobs, runs them with
+the regular ExecutionManager and posts the results back. Several workers
+can run on one machine or on others that share the PySnip tool directory.
+
+Usage:
+    WORKER_TOKEN=secret python worker.py --server http://127.0.0.1:5000 --capacity 2
+"""
+
+import os
+import sys
+import json
+import socket
+import hashlib
+import argparse
+import logging
+import threading
+import urllib.request
+import urllib.error
+
+from utils.executor import ExecutionManager
+from utils.environments import EnvironmentBuildingException
+
+# Set up logger
+logger = logging.getLogger("pysnip.worker")
+
+# Seconds to wait before retrying after the server could not be reached
+RETRY_DELAY = 2
+
+class ServerGoneException(Exception):
+    """Exception raised when the server no longer knows this worker."""
+    pass
+
+class Worker:
+    """Pulls jobs from a PySnip Web server and executes them locally"""
+
+    def __init__(self, server, token, pysnip_root, capacity=1, name=None, settings=None):
+        self.server = server.rstrip('/')
+        self.token = token
+        self.pysnip_root = os.path.realpath(pysnip_root)
+        self.capacity = max(1, int(capacity))
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.executor = ExecutionManager(settings)
+
+        self.worker_id = None
+        self.heartbeat_interval = 5
+        self.poll_timeout = 20
+        self.running = 0
+        self._lock = threading.Lock()
+        self._register_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        """Register and serve jobs until stop() is called"""
+        self._register()
+
+        threads = [threading.Thread(target=self._heartbeat_loop, name="heartbeat", daemon=True)]
+        threads += [threading.Thread(target=self._poll_loop, name=f"poll-{i}", daemon=True)
+                    for i in range(self.capacity)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        """Stop taking new jobs"""
+        self._stop.set()
+
+    def _request(self, path, payload=None, timeout=10):
+        """POST JSON to the server and return the status and decoded body"""
+        data = json.dumps(payload or {}).encode('utf-8')
+        request = urllib.request.Request(
+            self.server + path,
+            data=data,
+            headers={"Content-Type": "application/json", "X-Worker-Token": self.token},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise ServerGoneException(f"Worker unknown to the server ({path})")
+            raise
+
+    def _register(self, stale_id=None):
+        """Register with the server, retrying until it is reachable"""
+        with self._register_lock:
+            if stale_id is not None:
+                if self.worker_id != stale_id:
+                    return  # Another thread already registered again
+                logger.warning("Server lost track of this worker, registering again")
+
+            while not self._stop.is_set():
+                try:
+                    _, reply = self._request("/workers/register", {
+                        "name": self.name,
+                        "capacity": self.capacity,
+                        "info": {"host": socket.gethostname(), "pid": os.getpid()}
+                    })
+                    self.worker_id = reply["worker_id"]
+                    self.heartbeat_interval = reply.get("heartbeat_interval", self.heartbeat_interval)
+                    self.poll_timeout = reply.get("poll_timeout", self.poll_timeout)
+                    logger.info(f"Registered as {self.name} ({self.worker_id[:8]}) with {self.server}")
+                    return
+                except (OSError, ValueError, KeyError, urllib.error.HTTPError) as e:
+                    logger.warning(f"Cannot register with {self.server}: {e}")
+                    self._stop.wait(RETRY_DELAY)
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            worker_id = self.worker_id
+            try:
+                load = os.getloadavg()[0] / (os.cpu_count() or 1) if hasattr(os, 'getloadavg') else 0.0
+                self._request(f"/workers/{worker_id}/heartbeat", {"running": self.running, "load": load})
+            except ServerGoneException:
+                self._register(stale_id=worker_id)
+            except (OSError, urllib.error.HTTPError) as e:
+                logger.warning(f"Heartbeat failed: {e}")
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            worker_id = self.worker_id
+            try:
+                status, job = self._request(f"/workers/{worker_id}/poll", timeout=self.poll_timeout + 10)
+            except ServerGoneException:
+                self._register(stale_id=worker_id)
+                continue
+            except (OSError, ValueError, urllib.error.HTTPError) as e:
+                logger.warning(f"Poll failed: {e}")
+                self._stop.wait(RETRY_DELAY)
+                continue
+
+            if status == 200 and job:
+                self._run_job(worker_id, job)
+
+    def _run_job(self, worker_id, job):
+        """Execute one job and report its result"""
+        with self._lock:
+            self.running += 1
+        try:
+            logger.info(f"Running job {job['job_id'][:8]}: {job['tool_path']}")
+            result = self._execute(job)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+        for attempt in range(3):
+            try:
+                self._request(f"/workers/{worker_id}/jobs/{job['job_id']}/result", {"result": result})
+                return
+            except ServerGoneException:
+                logger.warning(f"Result of job {job['job_id'][:8]} was not accepted")
+                return
+            except (OSError, urllib.error.HTTPError) as e:
+                logger.warning(f"Cannot report result of job {job['job_id'][:8]}: {e}")
+                self._stop.wait(RETRY_DELAY)
+
+    def _execute(self, job):
+        """Resolve the tool locally, check it matches the server's version and run it"""
+        full_path = os.path.realpath(os.path.join(self.pysnip_root, job['tool_path']))
+        if os.path.commonpath([full_path, self.pysnip_root]) != self.pysnip_root:
+            return self.executor._create_error_result("Invalid tool path")
+        if not os.path.isfile(full_path):
+            return self.executor._create_error_result(f"Tool not found on worker {self.name}")
+
+        if job.get('tool_hash'):
+            with open(full_path, 'rb') as f:
+                if hashlib.md5(f.read()).hexdigest() != job['tool_hash']:
+                    return self.executor._create_error_result(
+                        f"Tool on worker {self.name} differs from the server's version"
+                    )
+
+        try:
+            return self.executor.execute(full_path, job.get('params') or {}, job.get('timeout'))
+        except EnvironmentBuildingException as e:
+            return self.executor._create_error_result(str(e))
+
+def main():
+    parser = argparse.ArgumentParser(description="PySnip execution worker")
+    parser.add_argument('--server', default=os.environ.get('PYSNIP_SERVER', 'http://127.0.0.1:5000'),
+                        help='Base URL of the PySnip Web server')
+    parser.add_argument('--token', default=os.environ.get('WORKER_TOKEN'),
+                        help='Shared worker token (default: $WORKER_TOKEN)')
+    parser.add_argument('--pysnip-root', default=os.environ.get('PYSNIP_ROOT', os.path.expanduser('~/pysnip')),
+                        help='Local copy of the PySnip tool directory')
+    parser.add_argument('--capacity', type=int, default=os.cpu_count() or 1,
+                        help='Number of jobs to run at once')
+    parser.add_argument('--name', help='Worker name shown by the server')
+    parser.add_argument('--no-sandbox', action='store_true', help='Run tools without the namespace sandbox')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if not args.token:
+        parser.error("a worker token is required (--token or $WORKER_TOKEN)")
+    if not os.path.isdir(args.pysnip_root):
+        parser.error(f"PySnip directory not found at: {args.pysnip_root}")
+
+    worker = Worker(args.server, args.token, args.pysnip_root, args.capacity, args.name,
+                    {'SANDBOX_ENABLED': not args.no_sandbox})
+    worker.start()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())